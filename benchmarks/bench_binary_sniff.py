@@ -0,0 +1,131 @@
+# Benchmark: detecção de binários e leitura de arquivos mistos
+#
+# Gera N arquivos mistos (texto ASCII/UTF-8/Latin-1, CRLF, binários com NUL,
+# binários sem NUL, vazios) e compara:
+#   1. o classificador antigo (bytearray montado a cada chamada + gerador
+#      Python byte a byte) com is_binary_chunk (bytes.translate em C);
+#   2. o caminho de leitura antigo (abre para detectar, reabre em modo texto
+#      por encoding) com _read_file_safely, contando as aberturas de arquivo.
+#
+# Uso:
+#   python benchmarks/bench_binary_sniff.py [--files 50000]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+
+OPEN_COUNT = [0]
+
+
+def _audit(event, args):
+    if event == 'open':
+        OPEN_COUNT[0] += 1
+
+
+def legacy_is_binary(chunk):
+    if not chunk: return False
+    if b'\x00' in chunk: return True
+    text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+    non_text = sum(1 for byte in chunk if byte not in text_chars)
+    return non_text / len(chunk) > 0.3
+
+
+def legacy_read(path):
+    """Caminho antigo: getsize, open para detectar binário e reabertura em modo texto."""
+    if os.path.getsize(path) == 0: return "", False
+    with open(path, 'rb') as f:
+        if legacy_is_binary(f.read(8192)): return "", False
+    for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'ascii']:
+        with open(path, 'r', encoding=encoding, errors='ignore') as f:
+            content = f.read()
+        if content and len(content.strip()) > 0:
+            content = ''.join(char for char in content if char.isprintable() or char in '\n\r\t')
+            return content.strip(), True
+    return "", False
+
+
+def build_files(base, count, seed=7):
+    rng = random.Random(seed)
+    kinds = ['ascii', 'utf8', 'latin1', 'crlf', 'nul', 'noisy', 'empty']
+    paths = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        size = rng.choice([200, 2_000, 12_000])
+        if kind == 'ascii':
+            data = (f"def func_{i}(x):\n    return x * {i}\n" * (size // 30)).encode()
+        elif kind == 'utf8':
+            data = ("configuração = 'ação' # çãé\n" * (size // 30)).encode('utf-8')
+        elif kind == 'latin1':
+            data = ("descrição = 'função'\n" * (size // 25)).encode('latin-1')
+        elif kind == 'crlf':
+            data = (f"linha {i}\r\n" * (size // 10)).encode()
+        elif kind == 'nul':
+            data = bytes(rng.randrange(256) for _ in range(512)) + b'\x00' * 16
+        elif kind == 'noisy':
+            data = bytes(rng.randrange(0, 32) for _ in range(size))
+        else:
+            data = b''
+        path = os.path.join(base, f"{i:06d}_{kind}.txt")
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara detecção de binários antiga e nova")
+    parser.add_argument('--files', type=int, default=50_000)
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp(prefix='bench_sniff_')
+    try:
+        print(f"Gerando {args.files} arquivos mistos em {base}...")
+        paths = build_files(base, args.files)
+        chunks = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                chunks.append(f.read(toolkit.SNIFF_SIZE))
+        total_mb = sum(len(c) for c in chunks) / 1e6
+
+        start = time.perf_counter()
+        legacy = [legacy_is_binary(c) for c in chunks]
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        fast = [toolkit.is_binary_chunk(c) for c in chunks]
+        fast_time = time.perf_counter() - start
+        assert legacy == fast, "os dois classificadores devem concordar"
+        print(f"classificador antigo: {legacy_time:7.3f}s ({total_mb / legacy_time:8.1f} MB/s)")
+        print(f"classificador novo  : {fast_time:7.3f}s ({total_mb / fast_time:8.1f} MB/s)  "
+              f"-> {legacy_time / fast_time:.0f}x  | binários: {sum(fast)}")
+
+        analyzer = toolkit.ProjectAnalyzer(base, 'bench.md')
+        analyzer.debug = False
+        sys.addaudithook(_audit)
+
+        OPEN_COUNT[0] = 0
+        start = time.perf_counter()
+        legacy_results = [legacy_read(p) for p in paths]
+        legacy_time, legacy_opens = time.perf_counter() - start, OPEN_COUNT[0]
+
+        OPEN_COUNT[0] = 0
+        start = time.perf_counter()
+        new_results = [analyzer._read_file_safely(p) for p in paths]
+        new_time, new_opens = time.perf_counter() - start, OPEN_COUNT[0]
+
+        assert legacy_results == new_results, "o conteúdo lido deve ser idêntico"
+        print(f"leitura antiga: {legacy_time:7.3f}s  opens={legacy_opens}")
+        print(f"leitura nova  : {new_time:7.3f}s  opens={new_opens}")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Micro-benchmark: regras de ignore compiladas x laços por substring
+#
+# Compara o _should_ignore_file antigo (splitext + laço 'in' sobre cada
+# entrada de ignore_patterns['paths']) com as regras compiladas em
+# set_profiles (conjuntos + sufixos multi-ponto + regex única de 'paths').
+#
+# Uso:
+#   python benchmarks/bench_ignore_rules.py [--paths 200000] [--rules 200]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+
+
+def legacy_should_ignore_file(patterns, file_name, relative_path):
+    """Cópia do _should_ignore_file anterior às regras compiladas."""
+    lower_name = file_name.lower()
+    if lower_name in patterns.get('files', set()): return True
+    _, ext = os.path.splitext(lower_name)
+    if ext and ext in patterns.get('extensions', set()): return True
+    if lower_name.startswith('.') and lower_name not in {'.gitkeep', '.htaccess', '.env.example', '.editorconfig'}: return True
+    normalized_path = relative_path.replace(os.sep, '/')
+    for ignore_path in patterns['paths']:
+        if ignore_path in normalized_path: return True
+    return False
+
+
+def synthetic_paths(count, seed=42):
+    rng = random.Random(seed)
+    dirs = ['app', 'src', 'lib', 'storage/framework/views', 'storage/logs', 'resources/views',
+            'public/js', 'tests/unit', 'bootstrap/cache', 'database/migrations', 'config']
+    names = ['index', 'main', 'UserController', 'helpers', 'app', 'routes', 'schema', 'README']
+    exts = ['.php', '.js', '.min.js', '.css', '.min.css', '.json', '.md', '.log', '.png', '.blade.php']
+    paths = []
+    for _ in range(count):
+        depth = rng.randint(0, 3)
+        parts = [rng.choice(dirs) for _ in range(depth)]
+        name = rng.choice(names) + rng.choice(exts)
+        paths.append((name, os.path.join(*parts, name) if parts else name))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara regras de ignore compiladas e antigas")
+    parser.add_argument('--paths', type=int, default=200_000)
+    parser.add_argument('--rules', type=int, default=200, help="entradas extras em ignore_patterns['paths']")
+    args = parser.parse_args()
+
+    analyzer = toolkit.ProjectAnalyzer(os.getcwd(), 'bench.md')
+    analyzer.debug = False
+    analyzer.set_profiles(['php', 'node', 'python'])
+    analyzer.ignore_patterns['paths'].update(f"generated/module_{i}/cache" for i in range(args.rules))
+    analyzer.compile_ignore_rules()
+    samples = synthetic_paths(args.paths)
+
+    start = time.perf_counter()
+    legacy = [legacy_should_ignore_file(analyzer.ignore_patterns, n, p) for n, p in samples]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [analyzer._should_ignore_file(n, p) for n, p in samples]
+    compiled_time = time.perf_counter() - start
+
+    # Únicas divergências esperadas: sufixos multi-ponto que o splitext nunca casava
+    diverging = {n for (n, _), a, b in zip(samples, legacy, compiled) if a != b}
+    unexpected = {n for n in diverging if not n.lower().endswith(('.min.js', '.min.css'))}
+
+    rules = len(analyzer.ignore_patterns['paths'])
+    print(f"caminhos={len(samples)}  regras de path={rules}")
+    print(f"antigo   : {legacy_time:7.3f}s  ({len(samples) / legacy_time:,.0f} caminhos/s)")
+    print(f"compilado: {compiled_time:7.3f}s  ({len(samples) / compiled_time:,.0f} caminhos/s)  "
+          f"-> {legacy_time / compiled_time:.1f}x")
+    print(f"decisões diferentes (multi-ponto): {sorted(diverging)}")
+    assert not unexpected, f"divergências inesperadas: {sorted(unexpected)}"
+
+
+if __name__ == '__main__':
+    main()
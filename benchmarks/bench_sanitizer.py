@@ -0,0 +1,64 @@
+# Benchmark: limpeza de caracteres não imprimíveis
+#
+# Compara a limpeza antiga (''.join sobre um gerador com isprintable() por
+# caractere) com sanitize_text (atalho em C para texto limpo + regex em cache
+# com os caracteres a remover), conferindo que a saída é idêntica.
+#
+# Uso:
+#   python benchmarks/bench_sanitizer.py [--size-kb 256] [--repeat 20]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+
+
+def legacy_sanitize(content):
+    return ''.join(char for char in content if char.isprintable() or char in '\n\r\t')
+
+
+def samples(size):
+    line_ascii = "def calcular_total(itens):\n\treturn sum(i.valor for i in itens)\n"
+    line_utf8 = "// configuração de ações — 日本語 テスト ✓ 🚀\n"
+    line_dirty = "valor\x00 = 1\x0b\x1b[0m # ​ zero-width ﻿ bom\r\n"
+    return {
+        'ascii limpo': (line_ascii * (size // len(line_ascii) + 1))[:size],
+        'unicode limpo': (line_utf8 * (size // len(line_utf8) + 1))[:size],
+        'com controles': (line_dirty * (size // len(line_dirty) + 1))[:size],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a limpeza de texto antiga e nova")
+    parser.add_argument('--size-kb', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # Correção em todos os code points (caso patológico, só conferido, não cronometrado)
+    everything = ''.join(map(chr, range(sys.maxunicode + 1)))
+    assert toolkit.sanitize_text(everything) == legacy_sanitize(everything)
+    print("todos os code points Unicode: saída idêntica\n")
+
+    for label, text in samples(args.size_kb * 1024).items():
+        expected = legacy_sanitize(text)
+        assert toolkit.sanitize_text(text) == expected, f"saída diferente em '{label}'"
+        repeat = args.repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy_sanitize(text)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            toolkit.sanitize_text(text)
+        new_time = time.perf_counter() - start
+        mb = len(text) * repeat / 1e6
+        print(f"{label:<15} antigo {mb / legacy_time:8.1f} Mchar/s | novo {mb / new_time:9.1f} Mchar/s "
+              f"-> {legacy_time / new_time:6.1f}x  (saída idêntica)")
+
+
+if __name__ == '__main__':
+    main()
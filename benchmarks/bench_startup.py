@@ -0,0 +1,77 @@
+# Benchmark: tempo de inicialização da CLI headless
+#
+# Mede, em processos novos, o tempo de 'python -c pass' (referência), do import
+# de project_toolkit_v3, do '--help' da CLI (como script e com -m) e (se tkinter e
+# customtkinter estiverem instalados) do import da GUI. Também confere que o
+# import da CLI não carrega tkinter/customtkinter.
+#
+# Uso:
+#   python benchmarks/bench_startup.py [--runs 20]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'project_toolkit_v3.py')
+
+# Mede com o cache de bytecode ativo, como numa instalação normal
+ENV = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+
+CHECK_HEADLESS = (
+    "import sys, project_toolkit_v3\n"
+    "gui = sorted(m for m in ('tkinter', 'customtkinter', 'project_toolkit_gui') if m in sys.modules)\n"
+    "print(','.join(gui))\n"
+)
+
+
+def run_once(cmd):
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} falhou:\n{proc.stderr.decode(errors='replace')}")
+    return elapsed
+
+
+def measure(label, cmd, runs):
+    run_once(cmd)  # aquece o cache de bytecode e de disco
+    times = [run_once(cmd) for _ in range(runs)]
+    median = statistics.median(times)
+    print(f"{label:<28} mediana={median * 1000:7.1f}ms  min={min(times) * 1000:7.1f}ms")
+    return median
+
+
+def gui_available():
+    cmd = [sys.executable, '-c', 'import tkinter, customtkinter']
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização da CLI e da GUI")
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    loaded = subprocess.run([sys.executable, '-c', CHECK_HEADLESS], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert not loaded, f"o import da CLI não deve carregar a GUI (carregou: {loaded})"
+    print("✅ import de project_toolkit_v3 não carrega tkinter/customtkinter\n")
+
+    base = measure("python -c pass", [sys.executable, '-c', 'pass'], args.runs)
+    cli = measure("import project_toolkit_v3", [sys.executable, '-c', 'import project_toolkit_v3'], args.runs)
+    # Como script, o módulo __main__ é recompilado a cada execução (sem .pyc)
+    measure("project_toolkit_v3.py --help", [sys.executable, SCRIPT, '--help'], args.runs)
+    measure("-m project_toolkit_v3 --help", [sys.executable, '-m', 'project_toolkit_v3', '--help'], args.runs)
+    if gui_available():
+        gui = measure("import project_toolkit_gui", [sys.executable, '-c', 'import project_toolkit_gui'], args.runs)
+        print(f"\nGUI custa +{(gui - cli) * 1000:.1f}ms sobre a CLI")
+    else:
+        print("\n(tkinter/customtkinter indisponíveis: import da GUI não medido)")
+    print(f"CLI custa +{(cli - base) * 1000:.1f}ms sobre o interpretador vazio")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+# Suíte de benchmarks de regressão: exportação, template e Sherlock
+#
+# Gera uma árvore sintética determinística (benchmarks/synthetic_tree.py) e
+# mede _generate_tree, _consolidate_code, generate_report, extrair_estrutura,
+# a criação da estrutura (verificar_estrutura + criar_itens_faltantes) e
+# FrontendScanner.scan. Cada medida é a mediana de --repeat execuções, com
+# vazão em arquivos/s e MB/s. O resultado sai em JSON com versão, parâmetros
+# da árvore e ambiente; --compare mostra a variação contra um JSON anterior.
+#
+# Uso:
+#   python benchmarks/bench_suite.py [--files 2000] [--repeat 3] [--output resultado.json]
+#                                    [--compare base.json] [--only generate_report,frontend_scan]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+from synthetic_tree import add_spec_arguments, generate_tree, spec_from_args  # noqa: E402
+
+RESULT_VERSION = 1
+
+
+def make_analyzer(base, output, cache):
+    analyzer = toolkit.ProjectAnalyzer(base, output)
+    analyzer.sinks = []
+    analyzer.debug = False
+    analyzer.timeout_seconds = 0
+    analyzer.use_cache = cache
+    analyzer.write_manifest = False
+    analyzer.write_index = False
+    analyzer.set_profiles(['node', 'python'])
+    return analyzer
+
+
+def frontend_input(base):
+    """Arquivos e bytes que o FrontendScanner lê (mesmo filtro do scan)."""
+    files = nbytes = 0
+    for root, dirs, names in os.walk(base):
+        if 'node_modules' in dirs: dirs.remove('node_modules')
+        for name in names:
+            if name.endswith((".js", ".jsx", ".ts", ".tsx")):
+                files += 1
+                nbytes += os.path.getsize(os.path.join(root, name))
+    return files, nbytes
+
+
+def build_cases(base, work, tree_stats, cache):
+    """Cada caso: nome -> (preparo, execução, arquivos, bytes). O preparo não é cronometrado."""
+    output = os.path.join(work, 'bench.md')
+    template = make_analyzer(base, output, False)._generate_tree()
+    estrutura = toolkit.extrair_estrutura(template)
+    items = len(estrutura['pastas']) + len(estrutura['arquivos'])
+    fe_files, fe_bytes = frontend_input(base)
+    tree_io = (tree_stats.files, tree_stats.bytes)
+
+    def fresh_target():
+        target = os.path.join(work, 'criar')
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(target)
+        return target
+
+    def create(target):
+        faltantes = toolkit.verificar_estrutura(estrutura, target)
+        assert toolkit.criar_itens_faltantes(faltantes, target) == items
+
+    return {
+        'generate_tree': (lambda: make_analyzer(base, output, cache),
+                          lambda a: a._generate_tree(), *tree_io),
+        'consolidate_code': (lambda: make_analyzer(base, output, cache),
+                             lambda a: a._consolidate_code(), *tree_io),
+        'generate_report': (lambda: make_analyzer(base, output, cache),
+                            lambda a: a.generate_report(template_path=os.path.join(work, 'bench_template.txt')),
+                            *tree_io),
+        'extrair_estrutura': (lambda: None, lambda _: toolkit.extrair_estrutura(template),
+                              items, len(template.encode('utf-8'))),
+        'criar_estrutura': (fresh_target, create, items, 0),
+        'frontend_scan': (lambda: toolkit.FrontendScanner(base),
+                          lambda scanner: scanner.scan(), fe_files, fe_bytes),
+    }
+
+
+def measure(prepare, run, repeat):
+    times = []
+    for _ in range(repeat):
+        state = prepare()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('spec') != results['spec']:
+        print("⚠️  Parâmetros da árvore diferentes da base: comparação só indicativa")
+    print(f"\n{'caso':<20} {'base':>10} {'atual':>10} {'variação':>10}")
+    for name, current in results['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old: continue
+        change = (current['seconds'] / old['seconds'] - 1) * 100 if old['seconds'] else 0.0
+        print(f"{name:<20} {old['seconds'] * 1000:8.1f}ms {current['seconds'] * 1000:8.1f}ms {change:+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks sobre uma árvore sintética")
+    add_spec_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help="Casos separados por vírgula (padrão: todos)")
+    parser.add_argument('--cache', action='store_true', help="Usa o cache persistente (padrão: desligado)")
+    parser.add_argument('--output', help="Grava o resultado JSON neste arquivo")
+    parser.add_argument('--compare', help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--keep', help="Gera a árvore nesta pasta (vazia) e a mantém no fim")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    base = args.keep or tempfile.mkdtemp(prefix='bench_tree_')
+    work = tempfile.mkdtemp(prefix='bench_work_')
+    try:
+        os.makedirs(base, exist_ok=True)
+        if os.listdir(base):
+            sys.exit(f"a pasta da árvore não está vazia: {base}")
+        print(f"Gerando {spec.files} arquivos em {base}...")
+        tree_stats = generate_tree(base, spec)
+
+        cases = build_cases(base, work, tree_stats, args.cache)
+        selected = args.only.split(',') if args.only else list(cases)
+        unknown = set(selected) - set(cases)
+        if unknown: parser.error(f"casos desconhecidos: {', '.join(sorted(unknown))}")
+
+        results = {
+            'version': RESULT_VERSION,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'spec': dict(spec._asdict(), ignored_dirs=list(spec.ignored_dirs)),
+            'tree': tree_stats._asdict(),
+            'repeat': args.repeat,
+            'results': {},
+        }
+        print(f"\n{'caso':<20} {'mediana':>10} {'arquivos/s':>12} {'MB/s':>9}")
+        for name in selected:
+            prepare, run, files, nbytes = cases[name]
+            times = measure(prepare, run, args.repeat)
+            seconds = statistics.median(times)
+            row = {
+                'seconds': seconds,
+                'runs': times,
+                'files': files,
+                'bytes': nbytes,
+                'files_per_s': files / seconds if seconds else None,
+                'mb_per_s': nbytes / seconds / 1e6 if seconds and nbytes else None,
+            }
+            results['results'][name] = row
+            mbs = f"{row['mb_per_s']:9.1f}" if row['mb_per_s'] is not None else f"{'-':>9}"
+            print(f"{name:<20} {seconds * 1000:8.1f}ms {row['files_per_s'] or 0:12.0f} {mbs}")
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResultado salvo em: {args.output}")
+        if args.compare:
+            compare(results, args.compare)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
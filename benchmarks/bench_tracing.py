@@ -0,0 +1,82 @@
+# Benchmark: custo da instrumentação por etapa (StageTracer)
+#
+# Gera uma árvore sintética e mede generate_report sem tracer (o padrão) e
+# com tracer, alternando as execuções. Mostra o custo do tracer ligado e o
+# detalhamento por etapa, e grava o trace da última execução (formato
+# trace-event do Chrome) para conferência no chrome://tracing ou no Perfetto.
+#
+# Uso:
+#   python benchmarks/bench_tracing.py [--files 3000] [--repeat 5] [--read-workers 1] [--trace trace.json]
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+from synthetic_tree import TreeSpec, generate_tree  # noqa: E402
+
+
+def run(base, work, read_workers, traced):
+    analyzer = toolkit.ProjectAnalyzer(base, os.path.join(work, 'bench.md'))
+    analyzer.sinks = []
+    analyzer.timeout_seconds = 0
+    analyzer.use_cache = False
+    analyzer.write_manifest = False
+    analyzer.write_index = False
+    analyzer.read_workers = read_workers
+    analyzer.set_profiles(['node', 'python'])
+    if traced: analyzer.tracer = toolkit.StageTracer()
+    start = time.perf_counter()
+    assert analyzer.generate_report()
+    return time.perf_counter() - start, analyzer.tracer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o custo do StageTracer ligado e desligado")
+    parser.add_argument('--files', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--read-workers', type=int, default=1)
+    parser.add_argument('--trace', help="Grava o trace da última execução instrumentada neste arquivo")
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp(prefix='bench_trace_tree_')
+    work = tempfile.mkdtemp(prefix='bench_trace_work_')
+    try:
+        print(f"Gerando {args.files} arquivos em {base}...")
+        generate_tree(base, TreeSpec(files=args.files))
+        run(base, work, args.read_workers, False)  # aquece o cache de disco
+
+        plain, traced, tracer = [], [], None
+        for _ in range(args.repeat):
+            plain.append(run(base, work, args.read_workers, False)[0])
+            elapsed, tracer = run(base, work, args.read_workers, True)
+            traced.append(elapsed)
+
+        off, on = statistics.median(plain), statistics.median(traced)
+        print(f"\nsem tracer: {off * 1000:8.1f}ms   com tracer: {on * 1000:8.1f}ms   "
+              f"custo ligado: {(on / off - 1) * 100:+.1f}%")
+        print(f"eventos: {len(tracer.events)} (descartados: {tracer.dropped_events})")
+        print(f"\n{'etapa':<16} {'total':>10} {'chamadas':>9}")
+        for name, seconds in sorted(tracer.stage_seconds.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"{name:<16} {seconds * 1000:8.1f}ms {tracer.stage_calls[name]:9}")
+        print(f"\ncontadores: {dict(tracer.counters)}")
+        print("mais lentos:")
+        for path, seconds, nbytes in tracer.slowest_files()[:5]:
+            print(f"  {seconds * 1000:7.2f}ms {nbytes:9} bytes  {os.path.relpath(path, base)}")
+        if args.trace:
+            tracer.save(args.trace)
+            print(f"\nTrace salvo em: {args.trace}")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
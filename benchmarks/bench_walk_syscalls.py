@@ -0,0 +1,199 @@
+# Benchmark: chamadas de metadados da travessia do ProjectAnalyzer
+#
+# Gera uma árvore sintética (padrão: 100k arquivos) e compara a travessia
+# antiga (os.walk + os.access/os.path.islink por pasta + os.path.getsize por
+# arquivo) com o walker sobre os.scandir, contando as chamadas de sistema de
+# metadados feitas por cada um.
+#
+# Uso:
+#   python benchmarks/bench_walk_syscalls.py [--files 100000] [--keep DIR]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_toolkit_v3 as toolkit  # noqa: E402
+
+
+class SyscallCounter:
+    """
+    Conta stat/lstat/access/scandir feitos pelo Python. Os DirEntry são
+    embrulhados para que DirEntry.stat() (que não passa por os.stat) também
+    seja contado. Assim como o DirEntry real, o stat fica em cache e só a
+    primeira chamada conta como syscall.
+    """
+    def __init__(self):
+        self.counts = Counter()
+        self._originals = {}
+
+    def _wrap(self, name, counter_name):
+        original = getattr(os, name)
+        self._originals[name] = original
+
+        def wrapper(*args, **kwargs):
+            self.counts[counter_name] += 1
+            return original(*args, **kwargs)
+        setattr(os, name, wrapper)
+
+    def __enter__(self):
+        self._wrap('stat', 'stat')
+        self._wrap('lstat', 'lstat')
+        self._wrap('access', 'access')
+        original_scandir = os.scandir
+        self._originals['scandir'] = original_scandir
+        counts = self.counts
+
+        class CountingEntry:
+            __slots__ = ('_entry', '_stat_done')
+
+            def __init__(self, entry):
+                self._entry = entry
+                self._stat_done = set()
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def __fspath__(self):
+                return self._entry.path
+
+            def stat(self, *, follow_symlinks=True):
+                if follow_symlinks not in self._stat_done:
+                    self._stat_done.add(follow_symlinks)
+                    counts['stat'] += 1
+                return self._entry.stat(follow_symlinks=follow_symlinks)
+
+        class CountingScandir:
+            def __init__(self, path):
+                counts['scandir'] += 1
+                self._it = original_scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                return CountingEntry(next(self._it))
+
+            def close(self):
+                self._it.close()
+
+        os.scandir = CountingScandir
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+
+
+def build_tree(base, total_files, files_per_dir=50, fanout=8):
+    """Árvore determinística: pastas com 'files_per_dir' arquivos e 'fanout' subpastas."""
+    created = 0
+    queue = [base]
+    index = 0
+    while created < total_files:
+        current = queue[index]
+        index += 1
+        for i in range(min(files_per_dir, total_files - created)):
+            ext = ('.py', '.js', '.md', '.json', '.png')[i % 5]
+            with open(os.path.join(current, f"f{i}{ext}"), 'w') as f:
+                f.write(f"# arquivo {created}\n")
+            created += 1
+        for d in range(fanout):
+            sub = os.path.join(current, f"d{d}")
+            os.mkdir(sub)
+            queue.append(sub)
+    # Pastas que devem ser podadas
+    os.makedirs(os.path.join(base, 'node_modules', 'pkg'))
+    os.makedirs(os.path.join(base, '.git', 'objects'))
+    return created
+
+
+def legacy_walk(analyzer):
+    """Réplica da travessia antiga: os.walk + access/islink por pasta + getsize por arquivo."""
+    files = 0
+    for root, dirs, names in os.walk(analyzer.project_path, topdown=True, followlinks=False):
+        kept = []
+        for d in dirs:
+            full = os.path.join(root, d)
+            if d.startswith('.') or d in analyzer.ignore_patterns['dirs_exact']:
+                continue
+            if not os.access(full, os.R_OK | os.X_OK) or os.path.islink(full):
+                continue
+            kept.append(d)
+        dirs[:] = kept
+        for name in names:
+            rel = os.path.relpath(os.path.join(root, name), analyzer.project_path)
+            if analyzer._should_ignore_file(name, rel):
+                continue
+            _, ext = os.path.splitext(name.lower())
+            if ext in analyzer.code_extensions:
+                os.path.getsize(os.path.join(root, name))
+                files += 1
+    return files
+
+
+def scandir_walk(analyzer):
+    files = 0
+    for entry in analyzer._walk_project():
+        if entry.kind != 'file' or entry.ignored:
+            continue
+        _, ext = os.path.splitext(entry.name.lower())
+        if ext in analyzer.code_extensions:
+            entry.dir_entry.stat()
+            entry.dir_entry.stat()  # segunda chamada deve vir do cache
+            files += 1
+    return files
+
+
+def run(label, func, analyzer):
+    with SyscallCounter() as counter:
+        start = time.perf_counter()
+        files = func(analyzer)
+        elapsed = time.perf_counter() - start
+    total = sum(counter.counts.values())
+    print(f"{label:<22} arquivos={files:<7} tempo={elapsed:7.3f}s  "
+          f"syscalls={total:<8} {dict(sorted(counter.counts.items()))}")
+    return files, counter.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conta syscalls de metadados da travessia")
+    parser.add_argument('--files', type=int, default=100_000)
+    parser.add_argument('--keep', help="Usa/mantém a árvore sintética nesta pasta")
+    args = parser.parse_args()
+
+    base = args.keep or tempfile.mkdtemp(prefix='bench_walk_')
+    try:
+        if not os.listdir(base):
+            print(f"Gerando {args.files} arquivos em {base}...")
+            build_tree(base, args.files)
+        analyzer = toolkit.ProjectAnalyzer(base, 'bench.md')
+        analyzer.debug = False
+        analyzer.timeout_seconds = 0
+        analyzer.set_profiles(['python', 'node'])
+
+        legacy_files, legacy = run("os.walk (antigo)", legacy_walk, analyzer)
+        new_files, new = run("os.scandir (novo)", scandir_walk, analyzer)
+        assert legacy_files == new_files, "as duas travessias devem ver os mesmos arquivos"
+        per_entry = new['stat'] / max(new_files, 1)
+        print(f"\nstat por arquivo lido (novo): {per_entry:.2f}  |  "
+              f"access+lstat por pasta (novo): {new['access'] + new['lstat']}")
+        assert per_entry <= 1.0, "o walker não deve fazer mais de um stat por item"
+    finally:
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
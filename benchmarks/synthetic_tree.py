@@ -0,0 +1,186 @@
+# Gerador determinístico de árvores de projeto sintéticas para os benchmarks.
+#
+# Mesma semente + mesmos parâmetros = mesma árvore, byte a byte. Controla
+# profundidade, fan-out, número de arquivos, distribuição de tamanhos
+# (log-normal), fração de binários, codificações (utf-8, latin-1, utf-16) e
+# pastas que o exportador deve ignorar (node_modules, __pycache__, dist).
+#
+# Uso direto (gera e mantém a árvore):
+#   python benchmarks/synthetic_tree.py DESTINO [--files 2000] [--depth 4] ...
+
+import argparse
+import math
+import os
+import random
+from typing import NamedTuple, Tuple
+
+
+class TreeSpec(NamedTuple):
+    files: int = 2000
+    depth: int = 4
+    fanout: int = 4
+    size_median: int = 4096           # bytes; tamanhos seguem uma log-normal
+    size_sigma: float = 1.0
+    max_size: int = 512 * 1024
+    binary_ratio: float = 0.02        # metade com extensão de código (passa pelo sniff), metade .png
+    non_utf8_ratio: float = 0.05      # arquivos em latin-1 ou utf-16 (com BOM)
+    ignored_ratio: float = 0.10       # arquivos extras dentro das pastas ignoradas
+    ignored_dirs: Tuple[str, ...] = ('node_modules', '__pycache__', 'dist')
+    seed: int = 42
+
+
+class TreeStats(NamedTuple):
+    dirs: int
+    files: int            # arquivos fora das pastas ignoradas
+    bytes: int
+    binary_files: int
+    non_utf8_files: int
+    ignored_files: int    # arquivos dentro das pastas ignoradas
+    frontend_files: int   # .js/.jsx/.ts/.tsx (entrada do FrontendScanner)
+
+
+# (extensão, peso)
+EXTENSIONS = (
+    ('.py', 25), ('.js', 15), ('.jsx', 8), ('.ts', 10), ('.tsx', 5),
+    ('.json', 8), ('.md', 6), ('.css', 6), ('.html', 5), ('.yml', 4),
+    ('.java', 4), ('.sql', 2), ('.txt', 2),
+)
+FRONTEND = ('.js', '.jsx', '.ts', '.tsx')
+ENTITIES = ('user', 'order', 'product', 'invoice', 'customer', 'payment', 'ticket', 'event')
+FIELDS = ('name', 'email', 'status', 'total', 'created', 'role', 'price', 'title', 'owner', 'amount')
+METHODS = ('get', 'post', 'put', 'delete', 'patch')
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'
+
+
+def _code_line(rng: random.Random, ext: str, n: int) -> str:
+    entity = rng.choice(ENTITIES)
+    field = rng.choice(FIELDS)
+    if ext in FRONTEND:
+        kind = n % 4
+        if kind == 0:
+            return f"  const res{n} = await api.{rng.choice(METHODS)}('/{entity}s/${{id}}/{field}');\n"
+        if kind == 1:
+            return f"  setValue({entity}.{field} ?? {entity}.{rng.choice(FIELDS)});\n"
+        if kind == 2:
+            return f"  // {entity}: ajuste de {field} — revisão {n}\n"
+        return f"  if ({entity}.{field}) {{ total += {n}; }}\n"
+    if ext == '.py':
+        return f"    {entity}_{field}_{n} = calcular('{field}', {n})  # ação nº {n}\n"
+    if ext in ('.json', '.yml'):
+        return f'  "{entity}_{field}_{n}": "{field}-{n}",\n'
+    if ext == '.md':
+        return f"- {entity.title()} {field}: descrição do item {n} (configuração)\n"
+    return f"/* {entity} {field} {n} */ .{entity}-{field}-{n} {{ width: {n % 100}px; }}\n"
+
+
+def _text(rng: random.Random, ext: str, size: int) -> str:
+    lines, total, n = [], 0, 0
+    while total < size:
+        line = _code_line(rng, ext, n)
+        lines.append(line)
+        total += len(line)
+        n += 1
+    return ''.join(lines)
+
+
+def _size(rng: random.Random, spec: TreeSpec) -> int:
+    size = int(rng.lognormvariate(math.log(max(spec.size_median, 1)), spec.size_sigma))
+    return max(16, min(size, spec.max_size))
+
+
+def _dirs(base: str, spec: TreeSpec, rng: random.Random):
+    """Pastas em largura até 'depth'; limitadas a ~files/4 para árvores rasas e largas."""
+    dirs = [base]
+    frontier = [base]
+    limit = max(1, spec.files // 4)
+    for level in range(spec.depth):
+        next_frontier = []
+        for parent in frontier:
+            for i in range(spec.fanout):
+                if len(dirs) >= limit: break
+                path = os.path.join(parent, f"{rng.choice(('src', 'lib', 'app', 'mod', 'pkg'))}{level}_{i}")
+                dirs.append(path)
+                next_frontier.append(path)
+        frontier = next_frontier
+    return dirs
+
+
+def generate_tree(base: str, spec: TreeSpec = TreeSpec()) -> TreeStats:
+    """Cria a árvore em 'base' (que deve existir e estar vazia) e devolve as contagens."""
+    rng = random.Random(spec.seed)
+    dirs = _dirs(base, spec, rng)
+    for d in dirs[1:]:
+        os.makedirs(d, exist_ok=True)
+    names, weights = zip(*EXTENSIONS)
+
+    total_bytes = binary = non_utf8 = frontend = 0
+    for i in range(spec.files):
+        folder = dirs[i % len(dirs)] if i < len(dirs) else rng.choice(dirs)
+        ext = rng.choices(names, weights)[0]
+        size = _size(rng, spec)
+        roll = rng.random()
+        if roll < spec.binary_ratio:
+            binary += 1
+            if roll < spec.binary_ratio / 2: ext = '.png'
+            data = PNG_HEADER + rng.randbytes(max(0, size - len(PNG_HEADER)))
+        else:
+            text = _text(rng, ext, size)
+            if roll < spec.binary_ratio + spec.non_utf8_ratio:
+                non_utf8 += 1
+                data = text.encode('latin-1', 'replace') if i % 2 else text.encode('utf-16')
+            else:
+                data = text.encode('utf-8')
+            if ext in FRONTEND: frontend += 1
+        with open(os.path.join(folder, f"f{i}{ext}"), 'wb') as f:
+            f.write(data)
+        total_bytes += len(data)
+
+    ignored = int(spec.files * spec.ignored_ratio)
+    for i in range(ignored):
+        name = spec.ignored_dirs[i % len(spec.ignored_dirs)] if spec.ignored_dirs else None
+        if name is None: break
+        folder = os.path.join(rng.choice(dirs[:max(1, len(dirs) // 8)]), name, f"pkg{i % 7}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"index{i}.js"), 'w', encoding='utf-8') as f:
+            f.write(_text(rng, '.js', _size(rng, spec)))
+
+    return TreeStats(len(dirs), spec.files, total_bytes, binary, non_utf8, ignored, frontend)
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """Um argumento --<campo> por campo de TreeSpec (tuplas como lista separada por vírgulas)."""
+    defaults = TreeSpec()
+    for field in TreeSpec._fields:
+        value = getattr(defaults, field)
+        flag = '--' + field.replace('_', '-')
+        if isinstance(value, tuple):
+            parser.add_argument(flag, default=','.join(value), help=f"padrão: {','.join(value)}")
+        else:
+            parser.add_argument(flag, type=type(value), default=value, help=f"padrão: {value}")
+
+
+def spec_from_args(args) -> TreeSpec:
+    values = {}
+    for field in TreeSpec._fields:
+        value = getattr(args, field)
+        if isinstance(getattr(TreeSpec(), field), tuple):
+            value = tuple(v for v in value.split(',') if v)
+        values[field] = value
+    return TreeSpec(**values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera uma árvore de projeto sintética e determinística")
+    parser.add_argument('destino')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    os.makedirs(args.destino, exist_ok=True)
+    if os.listdir(args.destino):
+        parser.error(f"a pasta de destino não está vazia: {args.destino}")
+    stats = generate_tree(args.destino, spec_from_args(args))
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
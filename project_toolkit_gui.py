@@ -0,0 +1,515 @@
+# Interface gráfica do ToolKitDev (customtkinter).
+#
+# Só é importada quando a GUI é iniciada (python project_toolkit_v3.py sem
+# subcomando); a CLI em project_toolkit_v3.py não depende de tkinter.
+#
+# REQUISITOS (instale na sua venv):
+# pip install customtkinter
+
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import customtkinter as ctk
+import traceback
+import threading
+
+from project_toolkit_v3 import (
+    ProjectAnalyzer, ProjectWatcher, FrontendScanner, default_template_path, format_record,
+    extrair_estrutura, resolver_diretorio_base, verificar_estrutura, criar_itens_faltantes,
+)
+
+#================================================================================
+# BLOCO 4: APLICAÇÃO PRINCIPAL (UI CORRIGIDA)
+#================================================================================
+
+class App(ctk.CTk):
+    
+    def __init__(self, use_cache: bool = True):
+        super().__init__()
+
+        self.title("ToolKitDev v3 - Suíte de Engenharia")
+        self.geometry("950x700")
+        self.minsize(800, 600)
+
+        ctk.set_appearance_mode("Dark")
+        ctk.set_default_color_theme("blue")
+
+        # --- Variáveis de estado ---
+        self.export_project_path = ctk.StringVar()
+        self.export_output_name = ctk.StringVar(value="projeto_para_ia.md")
+        self.export_analyzer = None
+        self.export_analysis_thread = None
+        self.export_profile_vars = {}
+        self.export_walk_workers = ctk.StringVar(value="1")
+        self.export_read_workers = ctk.StringVar(value="1")
+        self.export_use_gitignore = ctk.BooleanVar(value=False)
+        self.export_use_cache = ctk.BooleanVar(value=use_cache)
+        self.export_delta = ctk.BooleanVar(value=False)
+        self.export_use_git_index = ctk.BooleanVar(value=False)
+        self.export_watch = ctk.BooleanVar(value=False)
+        self.export_near_duplicates = ctk.BooleanVar(value=False)
+        self.export_token_budget = ctk.StringVar(value="Sem limite")
+        self.export_shard_size = ctk.StringVar(value="Arquivo único")
+
+        self.create_itens_faltantes = {'pastas': [], 'arquivos': []}
+        self.create_project_dir = ctk.StringVar(value=os.getcwd())
+        
+        # [NOVO] Variável para o Scanner
+        self.scanner_project_path = ctk.StringVar()
+
+        # --- Estrutura Principal ---
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        # --- Seletor de Modo ---
+        mode_frame = ctk.CTkFrame(self, fg_color="transparent")
+        mode_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+        mode_frame.grid_columnconfigure(0, weight=1)
+        
+        # [CORREÇÃO] Adicionado "Scanner (Sherlock)" nas opções
+        self.mode_switcher = ctk.CTkSegmentedButton(
+            mode_frame,
+            values=["Exportar Template", "Criar por Template", "Scanner (Sherlock)"],
+            command=self._switch_mode
+        )
+        self.mode_switcher.grid(row=0, column=0, sticky="ew")
+        
+        # --- Frames (Telas) ---
+        self.export_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.export_frame.grid_rowconfigure(2, weight=1)
+        self.export_frame.grid_columnconfigure(0, weight=1)
+
+        self.create_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.create_frame.grid_rowconfigure(2, weight=1)
+        self.create_frame.grid_columnconfigure(0, weight=1)
+        self.create_frame.grid_columnconfigure(1, weight=1)
+
+        # [NOVO] Frame do Scanner
+        self.scanner_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.scanner_frame.grid_columnconfigure(1, weight=1)
+        self.scanner_frame.grid_rowconfigure(2, weight=1)
+
+        # Montar as telas
+        self._create_export_widgets(self.export_frame)
+        self._create_create_widgets(self.create_frame)
+        self._create_scanner_widgets(self.scanner_frame) # [NOVO]
+        
+        # Inicia no modo "Exportar"
+        self.mode_switcher.set("Exportar Template")
+        self._switch_mode("Exportar Template")
+        
+        self._center_window()
+
+    def _center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+    def _switch_mode(self, mode):
+        # Esconde todos primeiro
+        self.export_frame.grid_forget()
+        self.create_frame.grid_forget()
+        self.scanner_frame.grid_forget()
+
+        # Mostra o selecionado
+        if mode == "Exportar Template":
+            self.export_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        elif mode == "Criar por Template":
+            self.create_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
+        elif mode == "Scanner (Sherlock)":
+            self.scanner_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
+
+    # ============================================================
+    #  MÉTODOS TELA 1: EXPORTAR
+    # ============================================================
+    def _create_export_widgets(self, tab):
+        config_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        config_frame.grid(row=0, column=0, padx=0, pady=0, sticky="ew")
+        config_frame.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(config_frame, text="Pasta do Projeto:").grid(row=0, column=0, sticky="w", padx=(0, 10), pady=5)
+        ctk.CTkEntry(config_frame, textvariable=self.export_project_path).grid(row=0, column=1, sticky="ew", pady=5)
+        ctk.CTkButton(config_frame, text="📁 Buscar", width=100, command=self._export_select_folder).grid(row=0, column=2, padx=(10, 0), pady=5)
+
+        ctk.CTkLabel(config_frame, text="Nome do .md (IA):").grid(row=1, column=0, sticky="w", padx=(0, 10), pady=5)
+        ctk.CTkEntry(config_frame, textvariable=self.export_output_name).grid(row=1, column=1, sticky="ew", pady=5)
+        
+        profiles_frame = ctk.CTkFrame(tab)
+        profiles_frame.grid(row=1, column=0, padx=0, pady=10, sticky="ew")
+        ctk.CTkLabel(profiles_frame, text="Perfis para Ignorar:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=5, sticky="w", padx=10, pady=10)
+        profiles = [('Python', 'python'), ('React/Node.js', 'react'), ('PHP/Laravel', 'php'), ('Spring/Java', 'spring'), ('Node.js', 'node')]
+        self.export_profile_vars = {}
+        for i, (label, value) in enumerate(profiles):
+            var = ctk.BooleanVar()
+            self.export_profile_vars[value] = var
+            ctk.CTkCheckBox(profiles_frame, text=label, variable=var).grid(row=1, column=i, sticky="w", padx=10, pady=(0, 10))
+
+        # Opções de desempenho (aplicadas ao ProjectAnalyzer em _export_run_analysis)
+        self.export_options_frame = ctk.CTkFrame(profiles_frame, fg_color="transparent")
+        self.export_options_frame.grid(row=2, column=0, columnspan=5, sticky="ew", padx=10, pady=(0, 10))
+        ctk.CTkLabel(self.export_options_frame, text="Threads p/ listar pastas:").grid(row=0, column=0, sticky="w", padx=(0, 10))
+        ctk.CTkOptionMenu(self.export_options_frame, variable=self.export_walk_workers, values=["1", "2", "4", "8", "16"], width=80).grid(row=0, column=1, sticky="w")
+        ctk.CTkLabel(self.export_options_frame, text="Threads p/ ler arquivos:").grid(row=0, column=2, sticky="w", padx=(20, 10))
+        ctk.CTkOptionMenu(self.export_options_frame, variable=self.export_read_workers, values=["1", "2", "4", "8", "16"], width=80).grid(row=0, column=3, sticky="w")
+        ctk.CTkCheckBox(self.export_options_frame, text="Respeitar .gitignore", variable=self.export_use_gitignore).grid(row=0, column=4, sticky="w", padx=(20, 0))
+        ctk.CTkCheckBox(self.export_options_frame, text="Usar cache", variable=self.export_use_cache).grid(row=0, column=5, sticky="w", padx=(20, 0))
+        ctk.CTkCheckBox(self.export_options_frame, text="Só mudanças (delta)", variable=self.export_delta).grid(row=1, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        ctk.CTkCheckBox(self.export_options_frame, text="Só arquivos do git", variable=self.export_use_git_index).grid(row=1, column=2, columnspan=2, sticky="w", padx=(20, 0), pady=(10, 0))
+        ctk.CTkCheckBox(self.export_options_frame, text="Modo watch (até cancelar)", variable=self.export_watch).grid(row=1, column=4, columnspan=2, sticky="w", padx=(20, 0), pady=(10, 0))
+        ctk.CTkCheckBox(self.export_options_frame, text="Agrupar quase duplicados", variable=self.export_near_duplicates).grid(row=2, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        ctk.CTkLabel(self.export_options_frame, text="Orçamento de tokens:").grid(row=2, column=2, sticky="w", padx=(20, 10), pady=(10, 0))
+        ctk.CTkOptionMenu(self.export_options_frame, variable=self.export_token_budget, values=["Sem limite", "32000", "128000", "200000", "1000000"], width=110).grid(row=2, column=3, sticky="w", pady=(10, 0))
+        ctk.CTkLabel(self.export_options_frame, text="Partes de até:").grid(row=2, column=4, sticky="w", padx=(20, 10), pady=(10, 0))
+        ctk.CTkOptionMenu(self.export_options_frame, variable=self.export_shard_size, values=["Arquivo único", "1 MB", "4 MB", "16 MB"], width=110).grid(row=2, column=5, sticky="w", pady=(10, 0))
+
+        log_frame = ctk.CTkFrame(tab)
+        log_frame.grid(row=2, column=0, padx=0, pady=(0, 10), sticky="nsew")
+        log_frame.grid_rowconfigure(1, weight=1)
+        log_frame.grid_columnconfigure(0, weight=1)
+        ctk.CTkLabel(log_frame, text="Log de Execução:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(10, 5))
+        self.export_log_text = ctk.CTkTextbox(log_frame, wrap=tk.WORD, state='disabled')
+        self.export_log_text.grid(row=1, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="nsew")
+        self.export_progress_label = ctk.CTkLabel(log_frame, text="Pronto.")
+        self.export_progress_label.grid(row=2, column=0, sticky="w", padx=10, pady=(0, 10))
+        self.export_progress = ctk.CTkProgressBar(log_frame, mode='indeterminate')
+        self.export_progress.grid(row=3, column=0, columnspan=2, sticky="ew", padx=10, pady=(0, 10))
+        self.export_progress.set(0)
+
+        button_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        button_frame.grid(row=3, column=0, padx=0, pady=10, sticky="ew")
+        button_frame.grid_columnconfigure(0, weight=1)
+        button_frame.grid_columnconfigure(1, weight=1)
+        self.export_start_btn = ctk.CTkButton(button_frame, text="▶️ Iniciar Exportação (Gera .txt e .md)", command=self._export_start_analysis, height=35)
+        self.export_start_btn.grid(row=0, column=0, padx=(0, 5), sticky="ew")
+        self.export_cancel_btn = ctk.CTkButton(button_frame, text="⏹️ Cancelar", command=self._export_cancel_analysis, state='disabled', fg_color="tomato", hover_color="darkred", height=35)
+        self.export_cancel_btn.grid(row=0, column=1, padx=(5, 0), sticky="ew")
+
+    def _export_log(self, message: str):
+        self.export_log_text.configure(state='normal')
+        self.export_log_text.insert(tk.END, f"{message}\n")
+        self.export_log_text.see(tk.END)
+        self.export_log_text.configure(state='disabled')
+    
+    def _export_select_folder(self):
+        try:
+            folder = filedialog.askdirectory(title="Selecione a pasta do projeto", mustexist=True)
+            if folder:
+                self.export_project_path.set(folder)
+                self._export_log(f"✅ Pasta selecionada: {folder}")
+        except Exception as e:
+            self._export_log(f"❌ Erro ao selecionar pasta: {e}")
+
+    def _export_validate_inputs(self) -> bool:
+        if not self.export_project_path.get():
+            messagebox.showerror("Erro", "Selecione uma pasta do projeto!")
+            return False
+        if not os.path.isdir(self.export_project_path.get()):
+            messagebox.showerror("Erro", "A pasta selecionada não existe!")
+            return False
+        if not self.export_output_name.get():
+            messagebox.showerror("Erro", "Digite um nome para o arquivo de saída .md!")
+            return False
+        return True
+    
+    def _export_start_analysis(self):
+        if not self._export_validate_inputs():
+            return
+        
+        self.export_start_btn.configure(state='disabled')
+        self.export_cancel_btn.configure(state='normal')
+        self.export_log_text.configure(state='normal')
+        self.export_log_text.delete('1.0', tk.END)
+        self.export_log_text.configure(state='disabled')
+        self.export_progress.start()
+        self.export_progress.set(1)
+        self.export_progress_label.configure(text="⏳ Analisando projeto...")
+        
+        selected_profiles = [key for key, var in self.export_profile_vars.items() if var.get()]
+        options = {
+            'walk_workers': int(self.export_walk_workers.get() or 1),
+            'read_workers': int(self.export_read_workers.get() or 1),
+            'use_gitignore': bool(self.export_use_gitignore.get()),
+            'use_cache': bool(self.export_use_cache.get()),
+            'delta': bool(self.export_delta.get()),
+            'use_git_index': bool(self.export_use_git_index.get()),
+            'watch': bool(self.export_watch.get()),
+            'near_duplicates': bool(self.export_near_duplicates.get()),
+            'token_budget': int(self.export_token_budget.get()) if self.export_token_budget.get().isdigit() else None,
+            'shard_max_bytes': int(self.export_shard_size.get().split()[0]) * 1024 * 1024 if self.export_shard_size.get().endswith(" MB") else None,
+        }
+        
+        self.export_analysis_thread = threading.Thread(
+            target=self._export_run_analysis,
+            args=(self.export_project_path.get(), self.export_output_name.get(), selected_profiles, options),
+            daemon=True
+        )
+        self.export_analysis_thread.start()
+        self._export_check_thread()
+    
+    def _export_run_analysis(self, project_path: str, output_name_md: str, profiles: list, options: dict):
+        try:
+            self.export_analyzer = ProjectAnalyzer(project_path, output_name_md)
+            self.export_analyzer.set_profiles(profiles)
+            self.export_analyzer.apply_options(options)
+            
+            # Os registros da exportação chegam ao log em tempo real, sem redirecionar o stdout
+            self.export_analyzer.sinks = [self._export_sink]
+            
+            template_filepath = default_template_path(project_path, output_name_md)
+            
+            if options.get('watch'):
+                # Reescreve o .md a cada mudança até o botão Cancelar
+                success = ProjectWatcher(self.export_analyzer, template_path=template_filepath).run()
+            else:
+                # Uma única travessia gera o template .txt e o relatório .md
+                success = self.export_analyzer.generate_report(template_path=template_filepath)
+            
+            self.after(0, self._export_analysis_complete, success, template_filepath)
+            
+        except Exception as e:
+            error_msg = f"Erro crítico: {e}\n{traceback.format_exc()}"
+            self.after(0, self._export_analysis_error, error_msg)
+    
+    def _export_sink(self, record):
+        # Chamado na thread da exportação: a escrita no log vai para a thread da UI
+        line = format_record(record)
+        if line is None: return
+        for part in line.split('\n'):
+            if part.strip(): self.after(0, self._export_log, part)
+
+    def _export_check_thread(self):
+        if self.export_analysis_thread and self.export_analysis_thread.is_alive():
+            self.after(100, self._export_check_thread)
+        else:
+            self.export_progress.stop()
+            self.export_progress.set(0)
+    
+    def _export_analysis_complete(self, success: bool, template_filepath: str):
+        self.export_progress.stop()
+        self.export_progress.set(0)
+        self.export_start_btn.configure(state='normal')
+        self.export_cancel_btn.configure(state='disabled')
+        
+        if success:
+            self.export_progress_label.configure(text="✅ Exportação concluída!")
+            messagebox.showinfo("Sucesso", f"Exportação concluída!\n\nTemplate: {template_filepath}\nRelatório: {self.export_output_name.get()}")
+        else:
+            self.export_progress_label.configure(text="❌ Erro na exportação")
+            messagebox.showwarning("Aviso", "Concluído com erros. Verifique o log.")
+    
+    def _export_analysis_error(self, error_msg: str):
+        self.export_progress.stop()
+        self.export_progress.set(0)
+        self.export_start_btn.configure(state='normal')
+        self.export_cancel_btn.configure(state='disabled')
+        self.export_progress_label.configure(text="❌ Erro crítico")
+        self._export_log(f"\n❌ ERRO CRÍTICO:\n{error_msg}")
+        messagebox.showerror("Erro", error_msg[:200])
+    
+    def _export_cancel_analysis(self):
+        if self.export_analyzer:
+            self.export_analyzer.cancelled = True
+            self._export_log("⏹️ Cancelamento solicitado...")
+            self.export_progress_label.configure(text="⏹️ Cancelando...")
+
+    # ============================================================
+    #  MÉTODOS TELA 2: CRIAR
+    # ============================================================
+    def _create_create_widgets(self, tab):
+        left_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        left_frame.grid(row=0, column=0, rowspan=4, padx=(0, 10), pady=0, sticky="nsew")
+        left_frame.grid_rowconfigure(1, weight=1)
+        left_frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(left_frame, text="Estrutura do Template", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w")
+        self.create_structure_area = ctk.CTkTextbox(left_frame, wrap=tk.WORD, font=('Courier New', 12))
+        self.create_structure_area.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=10)
+        self.create_structure_area.insert(tk.END, "# Cole sua estrutura aqui ou carregue um arquivo...")
+
+        ctk.CTkButton(left_frame, text="Carregar Template (.txt)...", command=self._create_carregar_estrutura).grid(row=2, column=0, sticky="ew", padx=(0, 5))
+        ctk.CTkButton(left_frame, text="Salvar...", command=self._create_exportar_estrutura).grid(row=2, column=1, sticky="ew", padx=(5, 0))
+
+        right_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        right_frame.grid(row=0, column=1, rowspan=4, padx=(10, 0), pady=0, sticky="nsew")
+        right_frame.grid_rowconfigure(2, weight=1)
+        right_frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(right_frame, text="Pasta Base do Novo Projeto", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w")
+        
+        path_frame = ctk.CTkFrame(right_frame, fg_color="transparent")
+        path_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+        path_frame.grid_columnconfigure(0, weight=1)
+        
+        self.create_path_entry = ctk.CTkEntry(path_frame, textvariable=self.create_project_dir)
+        self.create_path_entry.grid(row=0, column=0, sticky="ew")
+        self.create_path_entry.configure(state="readonly")
+        ctk.CTkButton(path_frame, text="Selecionar Destino...", width=140, command=self._create_selecionar_pasta_projeto).grid(row=0, column=1, sticky="e", padx=(10,0))
+        
+        self.create_log_area = ctk.CTkTextbox(right_frame, wrap=tk.WORD, font=('Courier New', 12))
+        self.create_log_area.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=10)
+        self.create_log_area.configure(state=tk.DISABLED)
+
+        self.create_verify_button = ctk.CTkButton(right_frame, text="Verificar Estrutura", command=self._create_verificar_estrutura, height=35)
+        self.create_verify_button.grid(row=3, column=0, sticky="ew", padx=(0, 5))
+
+        self.create_create_button = ctk.CTkButton(right_frame, text="Criar Itens Faltantes", command=self._create_criar_estrutura, state=tk.DISABLED, height=35)
+        self.create_create_button.grid(row=3, column=1, sticky="ew", padx=(5, 0))
+
+        self.create_status_label = ctk.CTkLabel(right_frame, text="Pronto.", anchor='w', height=25)
+        self.create_status_label.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        
+        self._create_verificar_estrutura()
+
+    def _create_log(self, message):
+        self.create_log_area.configure(state=tk.NORMAL)
+        self.create_log_area.insert(tk.END, message + "\n")
+        self.create_log_area.configure(state=tk.DISABLED)
+        self.create_log_area.see(tk.END)
+
+    def _create_selecionar_pasta_projeto(self):
+        diretorio = filedialog.askdirectory(title="Selecione a pasta raiz", initialdir=self.create_project_dir.get())
+        if diretorio:
+            self.create_project_dir.set(diretorio)
+            self.create_path_entry.configure(state="normal")
+            self.create_path_entry.delete(0, tk.END)
+            self.create_path_entry.insert(0, diretorio)
+            self.create_path_entry.configure(state="readonly")
+            self.create_status_label.configure(text=f"Pasta selecionada.")
+            self._create_verificar_estrutura()
+
+    def _create_carregar_estrutura(self):
+        filepath = filedialog.askopenfilename(title="Selecione um template", filetypes=[("Texto", "*.txt"), ("Markdown", "*.md"), ("Todos", "*.*")])
+        if filepath:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    self.create_structure_area.delete('1.0', tk.END)
+                    self.create_structure_area.insert('1.0', f.read())
+                self.create_status_label.configure(text=f"Template carregado.")
+                self._create_verificar_estrutura()
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao ler arquivo:\n{e}")
+
+    def _create_exportar_estrutura(self):
+        filepath = filedialog.asksaveasfilename(title="Salvar estrutura", defaultextension=".txt")
+        if filepath:
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(self.create_structure_area.get('1.0', tk.END))
+                messagebox.showinfo("Sucesso", f"Salvo em:\n{filepath}")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao salvar:\n{e}")
+
+    def _create_get_base_dir_and_structure(self):
+        estrutura_atual = self.create_structure_area.get('1.0', tk.END)
+        estrutura = extrair_estrutura(estrutura_atual)
+        diretorio_base = resolver_diretorio_base(estrutura, self.create_project_dir.get())
+        return diretorio_base, estrutura
+
+    def _create_verificar_estrutura(self):
+        self.create_log_area.configure(state=tk.NORMAL)
+        self.create_log_area.delete('1.0', tk.END)
+        self.create_log_area.configure(state=tk.DISABLED)
+        
+        self.create_itens_faltantes = {'pastas': [], 'arquivos': []}
+        self.create_create_button.configure(state=tk.DISABLED)
+        self.create_status_label.configure(text="Verificando...")
+
+        diretorio_base, estrutura = self._create_get_base_dir_and_structure()
+        pastas_esperadas = estrutura['pastas']
+        arquivos_esperados = estrutura['arquivos']
+
+        if not pastas_esperadas and not arquivos_esperados:
+            self._create_log("Estrutura vazia.")
+            self.create_status_label.configure(text="Estrutura vazia.")
+            return
+
+        self._create_log(f"--- BASE: {diretorio_base} ---")
+        
+        self.create_itens_faltantes = verificar_estrutura(estrutura, diretorio_base, self._create_log)
+        
+        total = len(self.create_itens_faltantes['pastas']) + len(self.create_itens_faltantes['arquivos'])
+        if total == 0:
+            self._create_log("\n✅ Estrutura completa!")
+            self.create_status_label.configure(text="Tudo ok.")
+        else:
+            self._create_log(f"\n⚠️ {total} itens faltando.")
+            self.create_status_label.configure(text=f"{total} faltando.")
+            self.create_create_button.configure(state=tk.NORMAL)
+
+    def _create_criar_estrutura(self):
+        total = len(self.create_itens_faltantes['pastas']) + len(self.create_itens_faltantes['arquivos'])
+        if total == 0: return
+
+        diretorio_base, _ = self._create_get_base_dir_and_structure()
+        if not messagebox.askyesno("Criar", f"Criar {total} itens em:\n{diretorio_base}?"): return
+
+        self._create_log("\n--- CRIANDO ---")
+        criados = criar_itens_faltantes(self.create_itens_faltantes, diretorio_base, self._create_log)
+
+        self._create_log("\n✨ Concluído!")
+        self.create_status_label.configure(text=f"{criados} criados.")
+        self.create_create_button.configure(state=tk.DISABLED)
+        self._create_verificar_estrutura()
+
+    # ============================================================
+    #  MÉTODOS TELA 3: SCANNER (SHERLOCK)
+    # ============================================================
+    def _create_scanner_widgets(self, frame):
+        frame.grid_columnconfigure(1, weight=1)
+        frame.grid_rowconfigure(2, weight=1)
+
+        ctk.CTkLabel(frame, text="Analise a pasta 'src' do Frontend para descobrir rotas e modelos.", 
+                     text_color="gray").grid(row=0, column=0, columnspan=3, sticky="w", padx=10, pady=(0, 20))
+
+        ctk.CTkLabel(frame, text="Pasta 'src':").grid(row=1, column=0, padx=10, sticky="w")
+        ctk.CTkEntry(frame, textvariable=self.scanner_project_path).grid(row=1, column=1, padx=10, sticky="ew")
+        ctk.CTkButton(frame, text="📁 Buscar", width=80, command=self._sel_scanner_folder).grid(row=1, column=2, padx=10)
+
+        self.txt_scanner_result = ctk.CTkTextbox(frame, font=("Courier New", 13), fg_color="#1e1e1e", text_color="#00ff00")
+        self.txt_scanner_result.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
+        self.txt_scanner_result.insert("0.0", ">>> Aguardando ordem de análise...\n")
+
+        self.btn_scan = ctk.CTkButton(frame, text="🕵️ Executar Análise Sherlock", 
+                                      command=self._run_scanner, height=40, fg_color="#D4AF37", text_color="#001B3D")
+        self.btn_scan.grid(row=3, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
+
+    def _sel_scanner_folder(self):
+        f = filedialog.askdirectory(title="Selecione a pasta src do frontend")
+        if f: self.scanner_project_path.set(f)
+
+    def _run_scanner(self):
+        path = self.scanner_project_path.get()
+        if not path or not os.path.exists(path):
+            messagebox.showerror("Erro", "Selecione uma pasta válida")
+            return
+        
+        self.txt_scanner_result.delete("1.0", "end")
+        self.txt_scanner_result.insert("end", f"⏳ Iniciando análise em: {path}...\n\n")
+        self.update()
+
+        scanner = FrontendScanner(path)
+        report = scanner.scan()
+        
+        self.txt_scanner_result.delete("1.0", "end")
+        self.txt_scanner_result.insert("end", report)
+
+
+def run_gui(use_cache: bool = True) -> int:
+    try:
+        app = App(use_cache=use_cache)
+        app.mainloop()
+        return 0
+    except Exception as e:
+        print(f"❌ Erro fatal ao iniciar a aplicação: {e}")
+        print(traceback.format_exc())
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            messagebox.showerror("Erro Fatal", f"Ocorreu um erro crítico ao iniciar:\n\n{e}\n\nVeja o console para detalhes.")
+            root.destroy()
+        except Exception:
+            pass
+        return 1
@@ -1,14 +1,15 @@
-# Salve este arquivo como: project_toolkit_v2.py
+# Salve este arquivo como: project_toolkit_v3.py
 #
-# REQUISITOS (instale na sua venv):
+# Uso sem interface (não precisa de tkinter):
+#   python project_toolkit_v3.py export|batch|create|verify|scan ...
+# A interface gráfica (sem subcomando) fica em project_toolkit_gui.py.
+#
+# REQUISITOS DA INTERFACE (instale na sua venv):
 # pip install customtkinter
 
 import os
 import sys
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import customtkinter as ctk
-from typing import Set, Dict, List, Tuple
+from typing import AbstractSet, Set, Dict, List, Tuple, Optional, FrozenSet, Iterator, NamedTuple, Callable, IO, Union
 from pathlib import Path
 import traceback
 from datetime import datetime
@@ -16,12 +17,963 @@ import threading
 import time
 import re
 import io
-from collections import defaultdict
+import json
+import hashlib
+import sqlite3
+import mmap
+import shutil
+import struct
+import zlib
+import subprocess
+import queue
+import heapq
+import tempfile
+import glob
+import operator
+from array import array
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import repeat, groupby
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 
 #================================================================================
 # BLOCO 1: LÓGICA DO "CONSOLIDA PROJECT"
 #================================================================================
 
+class WalkEntry(NamedTuple):
+    """
+    Item produzido pela travessia única do projeto (ProjectAnalyzer._walk_project).
+    A mesma sequência alimenta a árvore, o consolidador e as estatísticas.
+    """
+    kind: str        # 'dir' ou 'file'
+    name: str
+    path: str        # caminho absoluto
+    rel_path: str    # caminho relativo à raiz do projeto
+    level: int       # nível de indentação usado na árvore
+    ignored: bool    # arquivo descartado por _should_ignore_file
+    is_last: bool    # último arquivo visível da pasta (prefixo '└──')
+    dir_entry: Optional[os.DirEntry] = None  # metadados em cache do os.scandir
+
+
+# Detecção de binários: bytes "de texto" montados uma única vez no import.
+# bytes.translate(None, _TEXT_BYTES) remove todos eles em C; o que sobra é não-texto.
+SNIFF_SIZE = 8192
+_TEXT_BYTES = bytes(sorted({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f}))
+
+
+def is_binary_chunk(chunk: bytes) -> bool:
+    """True se o trecho inicial de um arquivo parece binário (NUL ou >30% de bytes não-texto)."""
+    if not chunk: return False
+    if b'\x00' in chunk: return True
+    return len(chunk.translate(None, _TEXT_BYTES)) / len(chunk) > 0.3
+
+
+def decode_text(data, encoding: str) -> str:
+    """
+    Decodifica bytes (ou qualquer buffer, ex.: mmap) como o open(..., 'r',
+    errors='ignore') fazia, inclusive a conversão universal de quebras de
+    linha ('\\r\\n' e '\\r' viram '\\n').
+    """
+    text = str(data, encoding, 'ignore')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+@lru_cache(maxsize=1024)
+def _deletion_pattern(chars: str) -> re.Pattern:
+    """Classe de caracteres compilada (e reaproveitada) para um conjunto de caracteres a remover."""
+    return re.compile('[' + ''.join(re.escape(c) for c in chars) + ']')
+
+
+def sanitize_text(text: str) -> str:
+    """
+    Remove caracteres não imprimíveis (exceto '\\n', '\\r' e '\\t'), com a
+    mesma saída da antiga limpeza caractere a caractere. Texto já limpo (o
+    caso comum) é detectado em C por str.isprintable() e volta sem cópia; caso
+    contrário só os caracteres distintos do texto são testados, e a remoção
+    usa uma regex em cache com exatamente esses caracteres.
+    """
+    if text.replace('\n', '').replace('\r', '').replace('\t', '').isprintable():
+        return text
+    drop = []
+    for c in set(text):
+        if not c.isprintable() and c not in '\n\r\t':
+            drop.append(c)
+            if len(drop) > 64:
+                # Texto patológico (muitos caracteres distintos a remover): filtro direto
+                return ''.join(c for c in text if c.isprintable() or c in '\n\r\t')
+    return _deletion_pattern(''.join(sorted(drop))).sub('', text)
+
+
+class IgnoreRules(NamedTuple):
+    """
+    Regras de ignore compiladas uma vez por set_profiles. Tudo é imutável
+    (frozenset / regex compilada), então pode ser compartilhado entre threads
+    e serializado para outros processos.
+    """
+    dirs: frozenset          # 'dirs' + 'dirs_exact' (nome exato da pasta)
+    files: frozenset         # nomes de arquivo em minúsculas
+    extensions: frozenset    # sufixos em minúsculas, inclusive multi-ponto ('.min.js')
+    paths: Optional[re.Pattern]  # alternância única com todos os 'paths' (busca por substring)
+
+
+class GitignoreRule(NamedTuple):
+    """Uma linha compilada de .gitignore / .dockerignore."""
+    regex: re.Pattern   # casa o caminho relativo (com '/') à pasta do arquivo de regras
+    negate: bool        # linha com '!'
+    dir_only: bool      # linha terminada em '/'
+
+
+def _gitignore_to_regex(pattern: str, anchored: bool) -> re.Pattern:
+    """Traduz um padrão do .gitignore ('*', '?', '[...]', '**') para regex."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i) and (i == 0 or pattern[i - 1] == '/') and (i + 2 == n or pattern[i + 2] == '/'):
+                if i + 2 == n:
+                    out.append('.*')            # 'pasta/**': tudo dentro da pasta
+                    i += 2
+                else:
+                    out.append('(?:.*/)?')      # '**/': zero ou mais pastas
+                    i += 3
+                continue
+            while i < n and pattern[i] == '*': i += 1
+            out.append('[^/]*')
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) or pattern.startswith('[^', i) else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'): body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile('^' + prefix + ''.join(out) + '$', re.DOTALL)
+
+
+def parse_ignore_file(path: str, docker: bool = False) -> Tuple[GitignoreRule, ...]:
+    """
+    Lê um .gitignore (ou .dockerignore com docker=True) e compila suas linhas.
+    No .dockerignore todo padrão é relativo à raiz do contexto e a barra final
+    não restringe a pastas; no .gitignore um padrão só é ancorado se tiver '/'.
+    """
+    rules = []
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for raw in f:
+            line = raw.rstrip('\r\n')
+            # Espaços finais são ignorados, a menos que escapados
+            while line.endswith(' ') and not line.endswith('\\ '): line = line[:-1]
+            if not line or line.startswith('#'): continue
+            negate = line.startswith('!')
+            if negate: line = line[1:]
+            elif line.startswith('\\!') or line.startswith('\\#'): line = line[1:]
+            if docker:
+                line = line.strip().lstrip('/')
+                while line.startswith('./'): line = line[2:]
+            dir_only = line.endswith('/') and not docker
+            line = line.rstrip('/')
+            if not line: continue
+            anchored = docker or '/' in line
+            rules.append(GitignoreRule(_gitignore_to_regex(line.lstrip('/'), anchored), negate, dir_only))
+    return tuple(rules)
+
+
+def gitignore_match(stack: Tuple[Tuple[str, Tuple[GitignoreRule, ...]], ...], rel_path: str, is_dir: bool) -> bool:
+    """
+    Decide se 'rel_path' (relativo à raiz, com '/') está ignorado pela pilha de
+    regras (base, regras), da pasta mais externa para a mais interna. Vale a
+    última regra que casar, como no git; '!' reinclui.
+    """
+    for base, rules in reversed(stack):
+        if base:
+            if not rel_path.startswith(base + '/'): continue
+            local = rel_path[len(base) + 1:]
+        else:
+            local = rel_path
+        for rule in reversed(rules):
+            if rule.dir_only and not is_dir: continue
+            if rule.regex.match(local):
+                return not rule.negate
+    return False
+
+
+GIT_MODE_SYMLINK = 0o120000
+GIT_MODE_GITLINK = 0o160000  # submódulo
+GIT_MODE_DIR = 0o040000  # só aparece em índices esparsos
+
+
+def read_git_index(index_path: str, symlinks: Optional[Set[str]] = None) -> Optional[List[str]]:
+    """
+    Lê o arquivo .git/index (versões 2, 3 e 4) e devolve os caminhos
+    rastreados (relativos à raiz do repositório, com '/'; arquivos em
+    conflito aparecem uma vez por estágio), sem submódulos
+    nem arquivos marcados como skip-worktree. Links simbólicos rastreados
+    continuam na lista e também entram em 'symlinks', se dado. Devolve None para formatos que
+    não são tratados aqui (índice dividido, esparso, hash SHA-256), para que
+    o chamador recorra ao 'git ls-files'.
+    """
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    if len(data) < 12 or data[:4] != b'DIRC':
+        return None
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3, 4):
+        return None
+    hash_size = 20
+    end = len(data) - hash_size
+    pos = 12
+    previous = b''
+    paths = []
+    for _ in range(count):
+        # ctime, mtime, dev, ino, uid, gid, tamanho: só o modo e as flags interessam
+        mode = struct.unpack_from('>I', data, pos + 24)[0]
+        flags = struct.unpack_from('>H', data, pos + 60)[0]
+        entry_start = pos
+        pos += 62
+        skip_worktree = False
+        if flags & 0x4000 and version >= 3:
+            skip_worktree = bool(struct.unpack_from('>H', data, pos)[0] & 0x4000)
+            pos += 2
+        if version == 4:
+            # Prefixo comprimido: quantos bytes remover do caminho anterior + sufixo
+            c = data[pos]; pos += 1
+            strip = c & 0x7f
+            while c & 0x80:
+                c = data[pos]; pos += 1
+                strip = ((strip + 1) << 7) | (c & 0x7f)
+            nul = data.index(b'\0', pos)
+            name = previous[:len(previous) - strip] + data[pos:nul]
+            pos = nul + 1
+        else:
+            nul = data.index(b'\0', pos)
+            name = data[pos:nul]
+            # Entradas são completadas com NULs até múltiplo de 8
+            pos = entry_start + ((nul - entry_start + 8) & ~7)
+        previous = name
+        if pos > end:
+            return None
+        if mode == GIT_MODE_DIR:
+            return None
+        if mode == GIT_MODE_GITLINK or skip_worktree:
+            continue
+        if mode == GIT_MODE_SYMLINK and symlinks is not None:
+            symlinks.add(os.fsdecode(name))
+        paths.append(os.fsdecode(name))
+    # Extensões: 'link' (índice dividido) e 'sdir' (esparso) mudam o significado das entradas
+    while pos + 8 <= end:
+        signature = data[pos:pos + 4]
+        size = struct.unpack_from('>I', data, pos + 4)[0]
+        if signature in (b'link', b'sdir'):
+            return None
+        pos += 8 + size
+    if pos != end:
+        return None  # provável hash SHA-256 ou arquivo truncado
+    return paths
+
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_MASK = MINHASH_PERMUTATIONS - 1
+MINHASH_MIN_TOKENS = 20  # abaixo disso, só a deduplicação exata vale
+NEAR_SKETCH_SIZE = 512  # hashes guardados por representante para confirmar candidatos
+
+
+def shingle_hashes(text: str, shingle_size: int = 3) -> Optional[FrozenSet[int]]:
+    """
+    Hashes dos shingles de 'shingle_size' palavras; None para textos curtos
+    demais. Cada palavra vira seu crc32 e cada shingle o hash() da tupla de
+    inteiros: ao contrário do hash() de str, não muda com PYTHONHASHSEED, então
+    os grupos saem iguais em toda execução.
+    """
+    tokens = list(map(zlib.crc32, text.encode('utf-8', 'surrogatepass').split()))
+    if len(tokens) < MINHASH_MIN_TOKENS:
+        return None
+    return frozenset(map(hash, zip(*(tokens[i:] for i in range(shingle_size)))))
+
+
+def minhash_signature(shingles: FrozenSet[int]) -> Tuple:
+    """
+    Assinatura MinHash de uma permutação só (one-permutation hashing) sobre
+    os hashes de shingle_hashes: cada shingle cai em um de
+    MINHASH_PERMUTATIONS compartimentos e fica o menor hash de cada um. Tudo
+    roda em C (sorted, dict); compartimentos vazios herdam o próximo
+    preenchido, marcados pela distância.
+    """
+    hashes = sorted(shingles, reverse=True)
+    # Em ordem decrescente, o último valor gravado em cada compartimento é o menor
+    bins = dict(zip(map(operator.and_, hashes, repeat(MINHASH_MASK)), hashes))
+    signature = []
+    for i in range(MINHASH_PERMUTATIONS):
+        for distance in range(MINHASH_PERMUTATIONS):
+            value = bins.get((i + distance) & MINHASH_MASK)
+            if value is not None:
+                signature.append((value, distance))
+                break
+    return tuple(signature)
+
+
+def minhash_similarity(a: Tuple, b: Tuple) -> float:
+    """
+    Estimativa da similaridade de Jaccard: fração de compartimentos iguais.
+    Com 64 compartimentos o desvio padrão chega a ~0,06 (perto de 0,5) e fica
+    em ~0,045 perto de 0,85, então serve só para achar candidatos.
+    """
+    return sum(map(operator.eq, a, b)) / MINHASH_PERMUTATIONS
+
+
+def jaccard_similarity(a: AbstractSet[int], b: AbstractSet[int]) -> float:
+    """Similaridade de Jaccard exata entre dois conjuntos de shingles."""
+    common = len(a & b)
+    return common / (len(a) + len(b) - common) if a or b else 1.0
+
+
+def bottom_k_sketch(shingles: FrozenSet[int], k: int = NEAR_SKETCH_SIZE) -> array:
+    """Os k menores hashes dos shingles, em ordem (todos, se forem menos de k); 8 bytes cada."""
+    return array('q', heapq.nsmallest(k, shingles))
+
+
+def sketch_similarity(a: array, b: array, k: int = NEAR_SKETCH_SIZE) -> float:
+    """
+    Similaridade de Jaccard pelos esboços bottom-k. Exata quando os dois
+    arquivos têm menos de k shingles; senão é a fração dos k menores hashes
+    da união presente nos dois, com desvio padrão sqrt(J(1-J)/k): ~0,016
+    perto do limiar padrão de 0,85 com k=512 (contra ~0,045 da MinHash de
+    64 compartimentos).
+    """
+    set_a, set_b = set(a), set(b)
+    if len(a) < k and len(b) < k:
+        return jaccard_similarity(set_a, set_b)
+    union = heapq.nsmallest(k, set_a | set_b)
+    return len(set_a.intersection(union).intersection(set_b)) / len(union)
+
+
+class NearDuplicateIndex:
+    """
+    Índice LSH (faixas de 'rows' linhas) sobre assinaturas MinHash. Só os
+    representantes de cada grupo entram no índice; cada consulta olha as
+    faixas da assinatura e compara com no máximo 'max_candidates' deles, de
+    modo que o custo total cresce linearmente com o número de arquivos. A
+    estimativa MinHash só seleciona candidatos: a decisão compara o esboço
+    bottom-k (sketch_similarity) com o guardado de cada representante, que
+    ocupa no máximo NEAR_SKETCH_SIZE * 8 bytes seja qual for o arquivo.
+    """
+    def __init__(self, threshold: float, max_candidates: int = 32):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        # Maior número de linhas por faixa cuja curva S começa abaixo do limiar
+        self.rows = 1
+        for rows in (1, 2, 4, 8, 16, 32):
+            if (rows / MINHASH_PERMUTATIONS) ** (1 / rows) <= threshold:
+                self.rows = rows
+        self._buckets: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+        self._sketches: Dict[str, array] = {}
+
+    def _band_keys(self, signature: Tuple) -> Iterator[Tuple[int, int]]:
+        rows = self.rows
+        for band in range(MINHASH_PERMUTATIONS // rows):
+            yield band, hash(signature[band * rows:(band + 1) * rows])
+
+    def match(self, signature: Tuple, sketch: array) -> Optional[Tuple[str, float]]:
+        """(representante, similaridade) mais parecido acima do limiar, ou None."""
+        best = None
+        seen: Set[str] = set()
+        for key in self._band_keys(signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen: continue
+                seen.add(candidate)
+                similarity = sketch_similarity(sketch, self._sketches[candidate])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate, similarity)
+                if len(seen) >= self.max_candidates:
+                    return best
+        return best
+
+    def add(self, key: str, signature: Tuple, sketch: array):
+        self._sketches[key] = sketch
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].append(key)
+
+
+BYTES_PER_TOKEN = 3.5  # aproximação usual para código-fonte com tokenizers BPE
+REPORT_OVERHEAD_TOKENS = 200  # cabeçalho, estatísticas e separadores do .md
+RECENT_SECONDS = 7 * 24 * 3600  # "modificado recentemente" na prioridade do orçamento
+ENTRY_POINT_NAMES = frozenset({
+    'main.py', '__main__.py', 'app.py', 'manage.py', 'wsgi.py', 'asgi.py', 'cli.py', 'server.py',
+    'index.js', 'index.ts', 'index.jsx', 'index.tsx', 'main.js', 'main.ts', 'app.js', 'app.ts',
+    'server.js', 'server.ts', 'main.go', 'main.rs', 'lib.rs', 'program.cs', 'main.java', 'index.php',
+})
+CONFIG_NAMES = frozenset({
+    'package.json', 'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt', 'pipfile',
+    'tsconfig.json', 'vite.config.js', 'vite.config.ts', 'webpack.config.js', 'next.config.js',
+    'dockerfile', 'docker-compose.yml', 'docker-compose.yaml', 'makefile', 'cargo.toml', 'go.mod',
+    'pom.xml', 'build.gradle', 'composer.json', 'gemfile', '.env.example', 'readme.md',
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa barata de tokens: bytes UTF-8 / BYTES_PER_TOKEN (para texto
+    ASCII, len() já é o número de bytes). Para contagem exata, troque
+    ProjectAnalyzer.token_estimator por um tokenizer real.
+    """
+    size = len(text) if text.isascii() else len(text.encode('utf-8', 'surrogatepass'))
+    return int(size / BYTES_PER_TOKEN) + 1
+
+
+class BudgetItem(NamedTuple):
+    """Seção candidata ao orçamento de tokens, com sua posição no spool bruto."""
+    rel_path: str
+    name: str
+    mtime: float
+    tokens: int
+    ref: Optional[str]  # seção que só faz sentido se 'ref' também entrar (duplicados)
+    offset: int
+    length: int
+
+
+SHARD_HEADER_BYTES = 1024  # reserva por parte para cabeçalho e rodapé
+
+
+class ShardItem(NamedTuple):
+    """Seção destinada a uma parte, com sua posição no spool binário das partes."""
+    rel_path: str
+    offset: int
+    nbytes: int
+    tokens: int
+    raw_bytes: int  # tamanho descomprimido, para o índice
+    lang: Optional[str]
+    digest: str
+
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.xz': 'lzma', '.bz2': 'bz2'}
+
+
+def compression_codec(path: str) -> Optional[str]:
+    """Módulo da stdlib ('gzip', 'lzma', 'bz2') pela extensão do arquivo, ou None."""
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def _codec_module(codec: str):
+    import importlib  # lzma/bz2 só são carregados quando usados
+    return importlib.import_module(codec)
+
+
+class MemberSpool:
+    """
+    Spool comprimido: o texto passa por um compressor em fluxo direto para um
+    arquivo temporário binário e forma um membro (gzip) ou stream (xz, bz2)
+    completo. Membros concatenados formam um arquivo válido, então a saída
+    final é montada copiando os bytes já comprimidos, sem nenhuma cópia
+    descomprimida em disco. Ler (seek(0) + read) descomprime sob demanda.
+    """
+    def __init__(self, raw: IO[bytes], codec: str):
+        self.raw = raw
+        self.codec = codec
+        self._writer = io.TextIOWrapper(_codec_module(codec).open(raw, 'wb'), encoding='utf-8', errors='replace', newline='')
+        self._reader = None
+        self._chars = 0
+        self.bytes_written = 0  # tamanho descomprimido, em bytes
+
+    def write(self, text: str) -> int:
+        self._chars += len(text)
+        self.bytes_written += len(text) if text.isascii() else len(text.encode('utf-8', 'replace'))
+        return self._writer.write(text)
+
+    def tell(self) -> int:
+        return self._chars
+
+    def finish(self):
+        """Fecha o compressor (grava o final do membro); depois disso o spool é só leitura."""
+        if self._writer is not None:
+            self._writer.close()  # fecha o compressor, não o arquivo temporário
+            self._writer = None
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self.finish()
+        if whence == io.SEEK_SET and offset == 0:
+            self._reader = None
+        return 0
+
+    def read(self, size: int = -1) -> str:
+        if self._reader is None:
+            self.finish()
+            self.raw.seek(0)
+            self._reader = io.TextIOWrapper(_codec_module(self.codec).open(self.raw, 'rb'), encoding='utf-8', newline='')
+        return self._reader.read(size)
+
+    def copy_raw(self, out: IO[bytes]):
+        self.finish()
+        self.raw.seek(0)
+        shutil.copyfileobj(self.raw, out, 1024 * 1024)
+
+    def close(self):
+        self.finish()
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemberWriter:
+    """
+    Arquivo de saída comprimido montado por membros: texto escrito com write()
+    vira um membro próprio, e spools comprimidos com o mesmo codec são
+    copiados byte a byte. Outros spools são recomprimidos em fluxo.
+    """
+    def __init__(self, path: str, codec: str):
+        self.codec = codec
+        self._out = open(path, 'wb')
+        self._pending: List[str] = []
+        self._position = 0  # bytes descomprimidos já entregues
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        return len(text)
+
+    def tell(self) -> int:
+        """Posição no conteúdo descomprimido (como em um arquivo comum)."""
+        self._flush()
+        return self._position
+
+    def _flush(self):
+        if self._pending:
+            data = "".join(self._pending).encode('utf-8', 'replace')
+            self._out.write(_codec_module(self.codec).compress(data))
+            self._position += len(data)
+            self._pending = []
+
+    def copy_spool(self, spool: IO[str]):
+        self._flush()
+        if isinstance(spool, MemberSpool) and spool.codec == self.codec:
+            spool.copy_raw(self._out)
+            self._position += spool.bytes_written
+            return
+        spool.seek(0)
+        with _codec_module(self.codec).open(self._out, 'wt', encoding='utf-8', errors='replace', newline='') as z:
+            for chunk in iter(lambda: spool.read(1024 * 1024), ''):
+                z.write(chunk)
+                self._position += len(chunk.encode('utf-8', 'replace'))
+
+    def close(self):
+        try:
+            self._flush()
+        finally:
+            self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class IndexRecord(NamedTuple):
+    """Uma seção no índice lateral: onde está (arquivo, posição, tamanho em bytes), linguagem e hash."""
+    path: str
+    file: str
+    offset: int
+    length: int
+    lang: Optional[str]
+    hash: str
+
+
+class ReportIndex:
+    """
+    Leitor do índice lateral (<relatório>.idx.json) gravado por generate_report:
+    extrai a seção de qualquer arquivo com um único seek, sem varrer o .md.
+    Em relatórios .gz/.xz/.bz2 as posições são do conteúdo descomprimido (o
+    seek do módulo de compressão avança descomprimindo).
+    """
+    def __init__(self, index_path: str):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != 1:
+            raise ValueError(f"Versão de índice não suportada: {data.get('version')}")
+        self.base_dir = os.path.dirname(os.path.abspath(index_path))
+        self.report = data['report']
+        self.newline = data.get('newline', '\n')
+        self.records: Dict[str, IndexRecord] = {row[0]: IndexRecord(*row) for row in data['files']}
+
+    @classmethod
+    def for_report(cls, report_path: str) -> 'ReportIndex':
+        return cls(f"{report_path}.idx.json")
+
+    def paths(self) -> List[str]:
+        return list(self.records)
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        record = self.records[rel_path]
+        path = os.path.join(self.base_dir, record.file)
+        codec = compression_codec(path)
+        opener = _codec_module(codec).open if codec else open
+        with opener(path, 'rb') as f:
+            f.seek(record.offset)
+            return f.read(record.length)
+
+    def read_section(self, rel_path: str) -> str:
+        """A seção Markdown completa ('### `caminho`' + bloco de código) do arquivo."""
+        text = self.read_bytes(rel_path).decode('utf-8')
+        return text.replace(self.newline, '\n') if self.newline != '\n' else text
+
+    def read_content(self, rel_path: str) -> Optional[str]:
+        """Só o conteúdo do arquivo (sem título e cercas); None para referências a duplicados."""
+        if self.records[rel_path].lang is None: return None
+        section = self.read_section(rel_path)
+        start = section.index('```') + 3
+        start = section.index('\n', start) + 1
+        return section[start:section.rindex('\n```')]
+
+    def verify(self, rel_path: str) -> bool:
+        """True se os bytes no relatório ainda batem com o hash do índice."""
+        data = self.read_bytes(rel_path)
+        return hashlib.blake2b(data, digest_size=16).hexdigest() == self.records[rel_path].hash
+
+
+class IndexEntry:
+    """
+    Substituto leve de os.DirEntry para caminhos vindos do índice do git:
+    mesmo name/path/stat() (com cache), sem listagem de pasta.
+    """
+    __slots__ = ('name', 'path', '_stat')
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self._stat = None
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def __fspath__(self) -> str:
+        return self.path
+
+
+class StageTracer:
+    """
+    Instrumentação opcional da exportação (analyzer.tracer). Soma tempo e
+    chamadas por etapa (scandir, ignore, read, sniff, decode, sanitize,
+    cache, escrita...), contadores (bytes lidos, syscalls, cache) e os
+    arquivos mais lentos, e guarda cada medida como evento 'X' do formato
+    trace-event do Chrome (chrome://tracing, ui.perfetto.dev). Com o tracer
+    em None, cada ponto instrumentado custa só um teste 'is not None'.
+    """
+    now = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, max_events: int = 200_000, slowest: int = 20):
+        self.max_events = max_events
+        self.slowest = slowest
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.stage_calls: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.events: List[Tuple[str, int, int, int, Optional[dict]]] = []  # (etapa, tid, início, duração, args)
+        self.dropped_events = 0
+        self._slowest: List[Tuple[int, str, int]] = []  # heap mínimo (duração ns, caminho, bytes)
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def add(self, stage: str, start_ns: int, args: Optional[dict] = None) -> int:
+        """Fecha a etapa iniciada em 'start_ns'. Devolve o instante final (início da próxima)."""
+        end = time.perf_counter_ns()
+        tid = threading.get_ident()
+        with self._lock:
+            self.stage_seconds[stage] += (end - start_ns) / 1e9
+            self.stage_calls[stage] += 1
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            if len(self.events) < self.max_events:
+                self.events.append((stage, tid, start_ns, end - start_ns, args))
+            else:
+                self.dropped_events += 1
+        return end
+
+    def count(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] += n
+
+    def file_done(self, path: str, start_ns: int, nbytes: int):
+        """Fecha a leitura de um arquivo (etapa 'file') e atualiza os mais lentos."""
+        end = self.add('file', start_ns, {'path': path, 'bytes': nbytes})
+        item = (end - start_ns, path, nbytes)
+        with self._lock:
+            if len(self._slowest) < self.slowest: heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]: heapq.heapreplace(self._slowest, item)
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, args or None)
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """'func' cronometrada a cada chamada (ex.: o escritor de seções)."""
+        def timed(*args):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args)
+            finally:
+                self.add(stage, start)
+        return timed
+
+    def slowest_files(self) -> List[Tuple[str, float, int]]:
+        """(caminho, segundos, bytes) do mais lento para o mais rápido."""
+        return [(path, ns / 1e9, nbytes) for ns, path, nbytes in sorted(self._slowest, reverse=True)]
+
+    def stage_summary(self, limit: int = 8) -> str:
+        top = sorted(self.stage_seconds.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return ", ".join(f"{name} {seconds:.3f}s ({self.stage_calls[name]}x)" for name, seconds in top)
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'project_toolkit'}}]
+        for tid, name in self._threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        last = self._origin
+        for stage, tid, start, duration, args in self.events:
+            event = {'name': stage, 'cat': 'export', 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': (start - self._origin) / 1000, 'dur': duration / 1000}
+            if args: event['args'] = args
+            events.append(event)
+            last = max(last, start + duration)
+        if self.counters:
+            events.append({'name': 'contadores', 'ph': 'C', 'pid': pid, 'tid': 0,
+                           'ts': (last - self._origin) / 1000, 'args': dict(self.counters)})
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'stages': {name: {'seconds': round(seconds, 6), 'calls': self.stage_calls[name]}
+                           for name, seconds in sorted(self.stage_seconds.items())},
+                'counters': dict(self.counters),
+                'slowest_files': [{'path': p, 'seconds': round(s, 6), 'bytes': b} for p, s, b in self.slowest_files()],
+                'dropped_events': self.dropped_events,
+            },
+        }
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+# Registros da exportação: o ProjectAnalyzer entrega cada evento às funções de
+# analyzer.sinks em vez de imprimir. O padrão é o console (_console_sink);
+# GUI, CLI e serviços trocam ou acrescentam os seus.
+
+class FileProcessed(NamedTuple):
+    path: str   # caminho relativo ao projeto
+    nbytes: int
+    lang: str
+
+
+class FileSkipped(NamedTuple):
+    path: str
+    reason: str  # 'ignorado', 'extensão' ou 'ilegível' (o detalhe vai num StatusMessage)
+
+
+class StatusMessage(NamedTuple):
+    level: str  # 'info', 'warning' ou 'error'
+    text: str
+
+
+class Progress(NamedTuple):
+    stage: str  # 'walk', 'budget', 'shards', 'write' ou 'watch'
+    files_processed: int
+    files_skipped: int
+
+
+class ExportStats(NamedTuple):
+    success: bool
+    output: str
+    files_processed: int
+    files_skipped: int
+    errors: int
+    warnings: int
+    elapsed: float
+    parts: Tuple[str, ...]
+
+
+ExportRecord = Union[FileProcessed, FileSkipped, StatusMessage, Progress, ExportStats]
+PROGRESS_EVERY = 10  # um Progress a cada N arquivos processados
+
+
+def format_record(record: ExportRecord, verbose: bool = True) -> Optional[str]:
+    """Linha de texto do registro, como o console a mostra (None = não exibido)."""
+    if isinstance(record, StatusMessage):
+        if record.level == 'info': return record.text
+        if not verbose: return None
+        if record.level == 'error': return f"❌ ERRO: {record.text}"
+        return f"⚠️  AVISO: {record.text}"
+    if isinstance(record, Progress) and verbose and record.stage == 'walk':
+        return f"📝 Processados: {record.files_processed} arquivos..."
+    return None
+
+
+#================================================================================
+# BLOCO 1B: CACHE PERSISTENTE DE ARQUIVOS
+#================================================================================
+
+def default_cache_dir() -> str:
+    """Pasta de cache do usuário (LOCALAPPDATA no Windows, XDG_CACHE_HOME ou ~/.cache nos demais)."""
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return os.path.join(base or os.path.join(os.path.expanduser('~'), '.cache'), 'project_toolkit')
+
+
+class FileCache:
+    """
+    Cache SQLite de vereditos e conteúdo limpo por arquivo, chaveado por
+    (caminho, tamanho, mtime_ns, inode). Tamanho total limitado a 'max_bytes',
+    com despejo LRU pelo último uso. Seguro para as threads de leitura.
+
+    As gravações ficam num buffer em memória e vão ao banco em transações
+    curtas (executemany + commit) a cada FLUSH_ROWS linhas ou FLUSH_BYTES de
+    conteúdo: o banco nunca fica travado enquanto os arquivos são lidos, e
+    outros processos que usam o mesmo cache (ex.: export_batch) não esperam.
+    Erros do SQLite viram falta de cache (get) ou nada (put/close): o cache
+    nunca derruba a exportação.
+    """
+    SCHEMA_VERSION = 1  # mude quando a decodificação/limpeza mudar de saída
+    FLUSH_ROWS = 200
+    FLUSH_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, db_path: str, max_bytes: int, on_error: Optional[Callable[[str], None]] = None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.on_error = on_error
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, int] = {}
+        self._pending: List[tuple] = []
+        self._pending_bytes = 0
+        self._failed = False
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER,"
+            " verdict TEXT, encoding TEXT, content TEXT, content_hash TEXT,"
+            " bytes INTEGER, last_used INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_lru ON files(last_used)")
+        self._conn.commit()
+        # Estimativa por cima (linhas substituídas contam duas vezes); _evict recalcula
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM files").fetchone()[0]
+
+    @classmethod
+    def open(cls, cache_path: Optional[str], max_bytes: int, on_error: Callable[[str], None]) -> Optional['FileCache']:
+        """Abre o cache; em caso de falha avisa e segue sem cache (None)."""
+        try:
+            return cls(cache_path or os.path.join(default_cache_dir(), 'file_cache.sqlite3'), max_bytes, on_error)
+        except (sqlite3.Error, OSError) as e:
+            on_error(f"Cache desativado (erro ao abrir): {e}")
+            return None
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+    def _error(self, e: sqlite3.Error):
+        """Avisa uma vez por sessão; o cache segue valendo como falta/nada."""
+        if not self._failed and self.on_error is not None:
+            self.on_error(f"Erro no cache (seguindo sem ele quando falhar): {e}")
+        self._failed = True
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[Tuple[str, str]]:
+        """(veredito, conteúdo) se o arquivo não mudou desde a última leitura."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, inode, verdict, content FROM files WHERE path = ?", (path,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._error(e)
+                row = None
+            if row is None or row[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[path] = time.time_ns()
+            return row[3], row[4] or ""
+
+    def put(self, path: str, stat: os.stat_result, verdict: str, encoding: Optional[str], content: str):
+        record = (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, verdict, encoding,
+                  content, self.content_hash(content), len(content), time.time_ns())
+        with self._lock:
+            self._pending.append(record)
+            self._pending_bytes += len(content)
+            if len(self._pending) >= self.FLUSH_ROWS or self._pending_bytes >= self.FLUSH_BYTES:
+                self._flush()
+
+    def _flush(self):
+        """Grava o buffer (e os últimos usos) numa transação curta e aplica o limite de tamanho."""
+        pending, touched = self._pending, self._touched
+        self._pending, self._pending_bytes, self._touched = [], 0, {}
+        try:
+            with self._conn:
+                if pending:
+                    self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", pending)
+                if touched:
+                    self._conn.executemany("UPDATE files SET last_used = ? WHERE path = ?",
+                                           [(t, p) for p, t in touched.items()])
+            self._total_bytes += sum(record[8] for record in pending)
+            if self._total_bytes > self.max_bytes:
+                with self._conn:
+                    self._evict()
+        except sqlite3.Error as e:
+            self._error(e)
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM files").fetchone()[0]
+        self._total_bytes = total
+        if total <= self.max_bytes: return
+        target = total - int(self.max_bytes * 0.9)
+        doomed, freed = [], 0
+        for path, size in self._conn.execute("SELECT path, bytes FROM files ORDER BY last_used"):
+            doomed.append((path,))
+            freed += size or 0
+            if freed >= target: break
+        self._conn.executemany("DELETE FROM files WHERE path = ?", doomed)
+        self._total_bytes = total - freed
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush()
+            finally:
+                try:
+                    self._conn.close()
+                except sqlite3.Error as e:
+                    self._error(e)
+
+
 class ProjectAnalyzer:
     # ... [ TODO O CONTEÚDO DA SUA CLASSE ProjectAnalyzer VAI AQUI ] ...
     # (É exatamente o mesmo conteúdo do BLOCO 1 do script anterior)
@@ -36,16 +988,70 @@ class ProjectAnalyzer:
         self.project_path = self._validate_path(project_path)
         self.output_filename = self._sanitize_filename(output_filename)
         self.ignore_patterns: Dict[str, Set[str]] = {}
+        self.ignore_rules: Optional[IgnoreRules] = None
         self.code_extensions: Set[str] = set()
         self.debug = True
+        self.sinks: List[Callable[[ExportRecord], None]] = [self._console_sink]
+        self.tracer: Optional[StageTracer] = None  # instrumentação por etapa (None = desligada)
+        self.trace_path: Optional[str] = None  # grava o trace (Chrome trace-event JSON) ao fim
         self.errors: List[str] = []
         self.warnings: List[str] = []
         self.max_file_size = 10 * 1024 * 1024  # 10MB
+        self.mmap_threshold = 4 * 1024 * 1024  # arquivos a partir daqui são lidos via mmap
         self.timeout_seconds = 300  # 5 minutos
         self.start_time = None
         self.files_processed = 0
         self.files_skipped = 0
+        self.dirs_walked = 0
+        self.files_listed = 0
         self.cancelled = False
+        self.walk_workers = 1  # >1 lista subpastas em paralelo (NFS/SMB)
+        self.read_workers = 1  # >1 lê/decodifica arquivos em paralelo
+        self.max_inflight_bytes = 64 * 1024 * 1024  # 64MB em leitura simultânea
+        self.use_gitignore = False  # respeita .gitignore aninhados e o .dockerignore da raiz
+        self.use_git_index = False  # lista só os arquivos rastreados pelo git, sem percorrer pastas
+        self._ignore_file_cache: Dict[str, Tuple[Tuple[int, int], Tuple[GitignoreRule, ...]]] = {}
+        self.use_cache = True  # cache persistente de conteúdo (desligue com --no-cache)
+        self.cache_path: Optional[str] = None  # None = pasta de cache do usuário
+        self.cache_max_bytes = 512 * 1024 * 1024
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: Optional['FileCache'] = None
+        self.write_manifest = True  # grava <saída>.manifest.json a cada exportação
+        self.manifest_path: Optional[str] = None  # None = ao lado do .md
+        self.delta_from: Optional[str] = None  # manifesto anterior: exporta só o que mudou
+        self._manifest_prev: Optional[Dict[str, list]] = None
+        self._manifest_now: Optional[Dict[str, list]] = None
+        self.delta_added: List[str] = []
+        self.delta_modified: List[str] = []
+        self.delta_deleted: List[str] = []
+        self.delta_unchanged = 0
+        self.dedupe_files = True  # arquivos idênticos viram referência à primeira ocorrência
+        self._seen_hashes: Dict[str, str] = {}  # hash do conteúdo -> caminho relativo
+        self.duplicates_found = 0
+        self.duplicate_bytes_saved = 0
+        self.near_duplicates = False  # agrupa arquivos quase idênticos (MinHash/LSH)
+        self.near_duplicate_threshold = 0.85  # similaridade de Jaccard mínima (shingles de 3 palavras)
+        self._near_index: Optional[NearDuplicateIndex] = None
+        self.near_clusters: Dict[str, List[str]] = {}  # representante -> demais membros
+        self.token_budget: Optional[int] = None  # máximo de tokens do .md (None = sem limite)
+        self.token_estimator: Callable[[str], int] = estimate_tokens
+        self.tokens_used = 0
+        self.budget_excluded: List[Tuple[str, int]] = []  # (caminho, tokens) fora do orçamento
+        self._budget_meta: List[Tuple[str, str, float, int, Optional[str]]] = []
+        self._budget_spans: List[Tuple[int, int]] = []
+        self.shard_max_bytes: Optional[int] = None  # divide o .md em partes de até N bytes
+        self.shard_max_tokens: Optional[int] = None  # ... e/ou de até N tokens estimados
+        self.shard_workers = 4  # partes gravadas em paralelo
+        self.shard_files: List[Tuple[str, int, int, int]] = []  # (arquivo, seções, bytes, tokens)
+        self._shard_items: List[ShardItem] = []
+        self.write_index = True  # grava <saída>.idx.json com a posição de cada seção
+        self.index_path: Optional[str] = None  # None = ao lado do .md
+        self._index_records: List[list] = []  # [caminho, arquivo|None, posição, tamanho, linguagem, hash]
+        self._code_offset = 0  # posição do bloco de código no relatório final
+        self._own_paths: Set[str] = set()  # saídas do próprio analisador dentro do projeto
+        self._own_parts: Optional[re.Pattern] = None
+        self._exclude_own_outputs()
 
     def _validate_path(self, path: str) -> str:
         try:
@@ -70,24 +1076,51 @@ class ProjectAnalyzer:
             forbidden_chars = '<>:"|?*\x00'
             for char in forbidden_chars:
                 filename = filename.replace(char, '_')
+            # .md.gz / .md.xz / .md.bz2: relatório comprimido em fluxo
+            compressed = ''
+            if compression_codec(filename):
+                filename, compressed = os.path.splitext(filename)
             if not filename.lower().endswith('.md'):
                 filename += '.md'
             if len(filename) > 200:
                 name, ext = os.path.splitext(filename)
                 filename = name[:196] + ext
-            return filename
+            return filename + compressed
         except Exception:
             return "projeto_unificado.md"
 
+    def _emit(self, record: ExportRecord):
+        for sink in self.sinks:
+            sink(record)
+
+    def _info(self, text: str):
+        self._emit(StatusMessage('info', text))
+
+    def _console_sink(self, record: ExportRecord):
+        """Sink padrão: imprime no terminal (erros no stderr; avisos e progresso só com debug)."""
+        line = format_record(record, self.debug)
+        if line is not None:
+            is_error = isinstance(record, StatusMessage) and record.level == 'error'
+            print(line, file=sys.stderr if is_error else sys.stdout)
+
     def _log_error(self, message: str):
         self.errors.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-        if self.debug:
-            print(f"❌ ERRO: {message}", file=sys.stderr)
+        self._emit(StatusMessage('error', message))
 
     def _log_warning(self, message: str):
         self.warnings.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-        if self.debug:
-            print(f"⚠️  AVISO: {message}")
+        self._emit(StatusMessage('warning', message))
+
+    def _skip(self, entry: WalkEntry, reason: str):
+        self.files_skipped += 1
+        self._emit(FileSkipped(entry.rel_path, reason))
+
+    def _progress(self, stage: str):
+        self._emit(Progress(stage, self.files_processed, self.files_skipped))
+
+    def _stage(self, name: str):
+        """Etapa cronometrada pelo tracer (contexto vazio sem instrumentação)."""
+        return self.tracer.stage(name) if self.tracer is not None else nullcontext()
 
     def _check_timeout(self) -> bool:
         if self.start_time and self.timeout_seconds:
@@ -158,6 +1191,35 @@ class ProjectAnalyzer:
             if 'node' in profiles or 'nodejs' in profiles: self._add_node_patterns()
         except Exception as e:
             self._log_error(f"Erro ao configurar perfis: {e}")
+        self.compile_ignore_rules()
+
+    def apply_options(self, options: dict):
+        """
+        Aplica as opções de exportação vindas da GUI, da CLI ou do lote. Chaves
+        ausentes mantêm o padrão; 'delta' compara com o manifesto anterior.
+        """
+        for key in ('walk_workers', 'read_workers', 'use_gitignore', 'use_cache', 'use_git_index',
+                    'near_duplicates', 'token_budget', 'shard_max_bytes', 'shard_max_tokens', 'trace_path'):
+            if key in options: setattr(self, key, options[key])
+        if options.get('delta'):
+            # Compara com o manifesto deixado pela exportação anterior do mesmo .md
+            self.delta_from = self._default_manifest_path()
+
+    def compile_ignore_rules(self) -> IgnoreRules:
+        """
+        Compila ignore_patterns em estruturas de busca O(tamanho do caminho):
+        conjuntos para pastas, nomes e sufixos, e uma única regex com todos os
+        'paths'. Chame de novo se ignore_patterns for alterado à mão.
+        """
+        patterns = self.ignore_patterns
+        paths = sorted({p.replace(os.sep, '/') for p in patterns.get('paths', set()) if p}, key=len, reverse=True)
+        self.ignore_rules = IgnoreRules(
+            dirs=frozenset(patterns.get('dirs', set()) | patterns.get('dirs_exact', set())),
+            files=frozenset(f.lower() for f in patterns.get('files', set())),
+            extensions=frozenset(e.lower() for e in patterns.get('extensions', set())),
+            paths=re.compile('|'.join(re.escape(p) for p in paths)) if paths else None,
+        )
+        return self.ignore_rules
 
     def _add_php_patterns(self):
         try:
@@ -205,12 +1267,24 @@ class ProjectAnalyzer:
             self.ignore_patterns['files'].update({'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml'})
         except Exception as e: self._log_warning(f"Erro ao adicionar padrões Node: {e}")
 
-    def _should_ignore_dir(self, dir_name: str, full_path: str) -> bool:
+    def _should_ignore_dir(self, dir_name: str, full_path: str, dir_entry: Optional[os.DirEntry] = None) -> bool:
+        """
+        Com 'dir_entry' (vindo do os.scandir) o teste de link simbólico usa o
+        tipo já em cache e a permissão é verificada pela própria listagem da
+        pasta em _scan_dir, sem os.access/os.path.islink extras.
+        """
         try:
             if not dir_name or not isinstance(dir_name, str): return True
             if dir_name.startswith('.') and dir_name not in {'.github', '.gitlab'}: return True
-            if dir_name in self.ignore_patterns.get('dirs', set()): return True
-            if dir_name in self.ignore_patterns.get('dirs_exact', set()): return True
+            rules = self.ignore_rules or self.compile_ignore_rules()
+            if dir_name in rules.dirs: return True
+            if dir_entry is not None:
+                try:
+                    if dir_entry.is_symlink():
+                        self._log_warning(f"Link simbólico ignorado: {dir_name}")
+                        return True
+                except OSError: return True
+                return False
             try:
                 if not os.access(full_path, os.R_OK | os.X_OK):
                     self._log_warning(f"Sem permissão para acessar: {dir_name}")
@@ -229,194 +1303,1032 @@ class ProjectAnalyzer:
     def _should_ignore_file(self, file_name: str, relative_path: str) -> bool:
         try:
             if not file_name or not isinstance(file_name, str): return True
+            if relative_path in self._own_paths: return True
+            if self._own_parts is not None and self._own_parts.fullmatch(relative_path): return True
+            rules = self.ignore_rules or self.compile_ignore_rules()
             lower_name = file_name.lower()
-            if lower_name in self.ignore_patterns.get('files', set()): return True
-            try:
-                _, ext = os.path.splitext(lower_name)
-                if ext and ext in self.ignore_patterns.get('extensions', set()): return True
-            except Exception: pass
+            if lower_name in rules.files: return True
+            # Testa cada sufixo a partir de um ponto ('a.min.js' -> '.min.js', '.js')
+            if rules.extensions:
+                dot = lower_name.find('.', 1)
+                while dot != -1:
+                    if lower_name[dot:] in rules.extensions: return True
+                    dot = lower_name.find('.', dot + 1)
             if lower_name.startswith('.') and lower_name not in {'.gitkeep', '.htaccess', '.env.example', '.editorconfig'}: return True
-            try:
-                if 'paths' in self.ignore_patterns:
-                    normalized_path = relative_path.replace(os.sep, '/')
-                    for ignore_path in self.ignore_patterns['paths']:
-                        if ignore_path in normalized_path: return True
-            except Exception: pass
+            if rules.paths is not None:
+                normalized_path = relative_path.replace(os.sep, '/') if os.sep != '/' else relative_path
+                if rules.paths.search(normalized_path): return True
             return False
         except Exception as e:
             self._log_warning(f"Erro ao verificar arquivo {file_name}: {e}")
             return True
 
-    def _is_binary_file(self, file_path: str) -> bool:
-        try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(8192)
-                if not chunk: return False
-                if b'\x00' in chunk: return True
-                text_chars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
-                non_text = sum(1 for byte in chunk if byte not in text_chars)
-                return non_text / len(chunk) > 0.3
-        except Exception: return True
-
-    def _read_file_safely(self, file_path: str) -> Tuple[str, bool]:
-        try:
+    @contextmanager
+    def _file_buffer(self, f, file_size: int):
+        """
+        Conteúdo inteiro do arquivo já aberto 'f' em um único buffer. Arquivos
+        grandes (>= mmap_threshold) são mapeados com mmap, sem cópia para o heap;
+        os demais são lidos com uma só chamada read() de file_size + 1 bytes
+        (uma leitura curta já indica o fim do arquivo).
+        """
+        if file_size >= self.mmap_threshold:
             try:
-                file_size = os.path.getsize(file_path)
-                if file_size > self.max_file_size:
-                    self._log_warning(f"Arquivo muito grande ignorado ({file_size} bytes): {file_path}")
-                    return "", False
-                if file_size == 0: return "", False
-            except (OSError, ValueError): return "", False
-            if self._is_binary_file(file_path):
-                self._log_warning(f"Arquivo binário ignorado: {file_path}")
-                return "", False
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'ascii']
-            for encoding in encodings:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+            if mapped is not None:
                 try:
-                    with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                        content = f.read()
-                    if content and len(content.strip()) > 0:
-                        content = ''.join(char for char in content if char.isprintable() or char in '\n\r\t')
-                        return content.strip(), True
-                except (UnicodeDecodeError, UnicodeError): continue
-                except Exception: break
-            return "", False
+                    yield mapped
+                finally:
+                    mapped.close()
+                return
+        data = f.read(file_size + 1)
+        if len(data) > file_size:  # o arquivo cresceu desde o stat
+            data += f.read()
+        yield data
+
+    def _read_file_safely(self, file_path: str, file_size: Optional[int] = None) -> Tuple[str, bool]:
+        content, success, _, _ = self._read_file_verdict(file_path, file_size)
+        return content, success
+
+    def _read_file_verdict(self, file_path: str, file_size: Optional[int] = None) -> Tuple[str, bool, Optional[str], Optional[str]]:
+        """
+        Ingestão com um único open e uma única leitura: tamanho (do DirEntry ou
+        fstat do próprio handle), detecção de binário e decodificação operam
+        todos sobre o mesmo buffer.
+
+        Devolve (conteúdo, sucesso, veredito, encoding). O veredito é 'text',
+        'blank' (só espaços) ou 'binary' quando o arquivo foi de fato lido, e
+        None para recusas por tamanho ou erros, que não devem ir para o cache.
+        """
+        tracer = self.tracer
+        try:
+            if file_size is not None and not self._check_file_size(file_path, file_size):
+                return "", False, None, None
+            t = tracer.now() if tracer is not None else 0
+            with open(file_path, 'rb', buffering=0) as f:
+                if file_size is None:
+                    try:
+                        file_size = os.fstat(f.fileno()).st_size
+                    except (OSError, ValueError): return "", False, None, None
+                    if tracer is not None: tracer.count('fstat')
+                    if not self._check_file_size(file_path, file_size):
+                        return "", False, None, None
+                with self._file_buffer(f, file_size) as data:
+                    if tracer is not None:
+                        tracer.count('open')
+                        tracer.count('bytes_read', len(data))
+                        t = tracer.add('read', t)
+                    if len(data) > self.max_file_size:
+                        self._log_warning(f"Arquivo muito grande ignorado ({len(data)} bytes): {file_path}")
+                        return "", False, None, None
+                    binary = is_binary_chunk(data[:SNIFF_SIZE])
+                    if tracer is not None: t = tracer.add('sniff', t)
+                    if binary:
+                        self._log_warning(f"Arquivo binário ignorado: {file_path}")
+                        return "", False, 'binary', None
+                    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'ascii']
+                    for encoding in encodings:
+                        try:
+                            content = decode_text(data, encoding)
+                            if tracer is not None: t = tracer.add('decode', t)
+                            if content and len(content.strip()) > 0:
+                                content = sanitize_text(content)
+                                if tracer is not None: tracer.add('sanitize', t)
+                                return content.strip(), True, 'text', encoding
+                        except (UnicodeDecodeError, UnicodeError): continue
+                        except Exception: break
+            return "", False, 'blank', None
         except PermissionError:
             self._log_warning(f"Sem permissão para ler: {file_path}")
-            return "", False
+            return "", False, None, None
         except (OSError, IOError) as e:
             self._log_warning(f"Erro de I/O ao ler {file_path}: {e}")
-            return "", False
+            return "", False, None, None
         except Exception as e:
             self._log_error(f"Erro inesperado ao ler {file_path}: {e}")
-            return "", False
+            return "", False, None, None
 
-    def _generate_tree(self) -> str:
-        lines = []
-        
-        # --- NOVIDADE: Adiciona o nome da pasta raiz no topo ---
-        project_root_name = os.path.basename(self.project_path)
-        lines.append(f"{project_root_name}/")
-        
+    def _read_entry(self, file_path: str, stat: Optional[os.stat_result]) -> Tuple[str, bool]:
+        tracer = self.tracer
+        if tracer is None:
+            return self._read_entry_cached(file_path, stat)
+        start = tracer.now()
         try:
-            for root, dirs, files in os.walk(self.project_path, topdown=True, onerror=None, followlinks=False):
-                try:
-                    if self._check_timeout() or self.cancelled: break
-                    
-                    relative_path = os.path.relpath(root, self.project_path)
-                    
-                    original_dirs = dirs.copy()
-                    dirs[:] = []
-                    for d in original_dirs:
-                        try:
-                            full_dir_path = os.path.join(root, d)
-                            if not self._should_ignore_dir(d, full_dir_path):
-                                dirs.append(d)
-                        except Exception as e: self._log_warning(f"Erro ao processar diretório {d}: {e}")
-                    
-                    # --- NÍVEL DE INDENTAÇÃO CORRIGIDO ---
-                    # O nível agora é baseado no relative_path + 1 (para contar a raiz)
-                    level = relative_path.count(os.sep) if relative_path != '.' else 0
-                    indent = "│   " * level
-                    
-                    # --- LÓGICA DE PREFIXO ---
-                    # Adiciona o prefixo '├──' ou '└──'
-                    # (Esta lógica estava faltando na sua árvore original, 
-                    # mas é necessária para o Script 2 ler corretamente)
-                    
-                    dir_name = os.path.basename(root)
-                    
-                    # Não adiciona a raiz de novo, já foi adicionada
-                    if root == self.project_path:
-                         pass # Já adicionamos a raiz no topo
-                    else:
-                        # Determina se é o último item da pasta pai (complexo de fazer sem lookahead)
-                        # Vamos usar uma abordagem simples que funciona para o Script 2
-                         lines.append(f"{indent}├── {dir_name}/") # Simplificado
+            return self._read_entry_cached(file_path, stat)
+        finally:
+            tracer.file_done(file_path, start, stat.st_size if stat is not None else 0)
 
-                    sub_indent = "│   " * (level + 1)
-                    
-                    for i, file in enumerate(files):
-                        try:
-                            is_last_file = (i == len(files) - 1)
-                            prefix = "└──" if is_last_file else "├──"
-                            
-                            if not self._should_ignore_file(file, os.path.join(relative_path, file)):
-                                lines.append(f"{sub_indent}{prefix} {file}")
-                        except Exception as e: self._log_warning(f"Erro ao processar arquivo {file}: {e}")
-                
-                except Exception as e:
-                    self._log_warning(f"Erro ao processar pasta {root}: {e}")
-                    continue
-        except Exception as e:
-            self._log_error(f"Erro ao gerar árvore: {e}")
-        
-        return "\n".join(lines) if lines else "├── (vazio ou sem permissão)"
+    def _read_entry_cached(self, file_path: str, stat: Optional[os.stat_result]) -> Tuple[str, bool]:
+        """
+        Leitura de um arquivo da travessia passando pelo cache persistente:
+        se (caminho, tamanho, mtime_ns, inode) não mudou, o veredito e o conteúdo
+        limpo vêm do cache e _read_file_safely nem é chamado.
+        """
+        file_size = stat.st_size if stat is not None else None
+        cache = self._cache
+        if cache is not None and stat is not None:
+            if not self._check_file_size(file_path, stat.st_size):
+                return "", False
+            t = self.tracer.now() if self.tracer is not None else 0
+            hit = cache.get(file_path, stat)
+            if self.tracer is not None: self.tracer.add('cache_get', t)
+            if hit is not None:
+                verdict, content = hit
+                if verdict == 'binary':
+                    self._log_warning(f"Arquivo binário ignorado: {file_path}")
+                return content, verdict == 'text'
+            content, success, verdict, encoding = self._read_file_verdict(file_path, file_size)
+            if verdict is not None:
+                t = self.tracer.now() if self.tracer is not None else 0
+                cache.put(file_path, stat, verdict, encoding, content)
+                if self.tracer is not None: self.tracer.add('cache_put', t)
+            return content, success
+        return self._read_file_safely(file_path, file_size)
+
+    def _check_file_size(self, file_path: str, file_size: int) -> bool:
+        """False (com aviso, se for o caso) para arquivos vazios ou acima de max_file_size."""
+        if file_size > self.max_file_size:
+            self._log_warning(f"Arquivo muito grande ignorado ({file_size} bytes): {file_path}")
+            return False
+        return file_size > 0
 
-    def _consolidate_code(self) -> str:
-        content = []
+    def _scan_dir(self, path: str) -> Optional[Tuple[List[os.DirEntry], List[os.DirEntry]]]:
+        """
+        Lista uma pasta com os.scandir e separa subpastas de arquivos usando o
+        tipo em cache do DirEntry (d_type), sem stat por item. Só links
+        simbólicos precisam de um stat para saber se apontam para uma pasta.
+        Os itens saem ordenados por nome, para que a saída seja a mesma no
+        modo sequencial e no paralelo. Devolve None se a pasta não puder ser
+        listada (ex.: sem permissão). Pode rodar em threads do pool.
+        """
+        tracer = self.tracer
+        start = tracer.now() if tracer is not None else 0
+        subdirs, files = [], []
+        try:
+            with os.scandir(path) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            subdirs.append(dir_entry)
+                        elif dir_entry.is_symlink() and dir_entry.is_dir():
+                            subdirs.append(dir_entry)  # descartado em _should_ignore_dir
+                        else:
+                            files.append(dir_entry)
+                    except OSError:
+                        files.append(dir_entry)
+        except PermissionError:
+            self._log_warning(f"Sem permissão para acessar: {os.path.basename(path)}")
+            return None
+        except OSError as e:
+            self._log_warning(f"Erro ao listar pasta {path}: {e}")
+            return None
+        subdirs.sort(key=lambda d: d.name)
+        files.sort(key=lambda f: f.name)
+        if tracer is not None:
+            tracer.count('scandir')
+            tracer.count('dir_entries', len(subdirs) + len(files))
+            tracer.add('scandir', start)
+        return subdirs, files
+
+    def _load_ignore_file(self, path: str, docker: bool = False, stat: Optional[os.stat_result] = None) -> Tuple[GitignoreRule, ...]:
+        """Compila um arquivo de regras uma única vez (cache por caminho, tamanho e mtime)."""
+        try:
+            if stat is None: stat = os.stat(path)
+            key = (stat.st_size, stat.st_mtime_ns)
+            cached = self._ignore_file_cache.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            rules = parse_ignore_file(path, docker)
+            self._ignore_file_cache[path] = (key, rules)
+            return rules
+        except OSError:
+            return ()
+        except Exception as e:
+            self._log_warning(f"Erro ao ler regras de {path}: {e}")
+            return ()
+
+    def _root_ignore_stack(self) -> Tuple[Tuple[str, Tuple[GitignoreRule, ...]], ...]:
+        """Regras da raiz com precedência menor que os .gitignore: .git/info/exclude e .dockerignore."""
+        stack = []
+        for name, docker in ((os.path.join('.git', 'info', 'exclude'), False), ('.dockerignore', True)):
+            path = os.path.join(self.project_path, name)
+            if os.path.isfile(path):
+                rules = self._load_ignore_file(path, docker)
+                if rules: stack.append(('', rules))
+        return tuple(stack)
+
+    def _walk_project(self) -> Iterator[WalkEntry]:
+        """
+        Travessia única do projeto sobre os.scandir. Aplica a poda de
+        _should_ignore_dir e o filtro de _should_ignore_file uma só vez e entrega
+        as pastas e os arquivos em ordem de árvore (pasta, seus arquivos, depois
+        as subpastas). Cada arquivo leva o seu DirEntry, de modo que o stat
+        (tamanho) é feito no máximo uma vez e reaproveitado pelo leitor.
+
+        Com use_gitignore, cada pasta empilha as regras do seu .gitignore
+        (compiladas uma vez) sobre as da pasta pai; pastas ignoradas são podadas
+        antes de serem listadas.
+
+        Com walk_workers > 1, as subpastas que sobreviveram à poda são listadas
+        antecipadamente por um pool limitado de threads, enquanto a ordem de
+        saída continua sendo a da busca em profundidade (determinística).
+        """
+        # Pilha explícita (sem recursão): (caminho, relativo, nível, regras .gitignore herdadas)
+        stack = [(self.project_path, '.', 0, self._root_ignore_stack() if self.use_gitignore else ())]
         try:
-            for root, dirs, files in os.walk(self.project_path, topdown=True, onerror=None, followlinks=False):
+            workers = max(1, int(self.walk_workers or 1))
+        except (TypeError, ValueError):
+            workers = 1
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="walk") if workers > 1 else None
+        # Listagens antecipadas em andamento, limitadas para não crescer com o projeto
+        prefetched = {}
+        max_prefetched = workers * 32
+        tracer = self.tracer
+        try:
+            while stack:
+                if self._check_timeout():
+                    self._log_error("Processo cancelado por timeout")
+                    break
+                if self.cancelled:
+                    self._log_warning("Processo cancelado pelo usuário")
+                    break
+                root, relative_path, level, ignore_stack = stack.pop()
                 try:
-                    if self._check_timeout():
-                        self._log_error("Processo cancelado por timeout")
-                        break
-                    if self.cancelled:
-                        self._log_warning("Processo cancelado pelo usuário")
-                        break
-                    relative_path = os.path.relpath(root, self.project_path)
-                    original_dirs = dirs.copy()
-                    dirs[:] = []
-                    for d in original_dirs:
+                    future = prefetched.pop(root, None)
+                    listing = future.result() if future is not None else self._scan_dir(root)
+                    if listing is None: continue
+                    subdirs, files = listing
+                    rel_posix = '' if relative_path == '.' else relative_path.replace(os.sep, '/')
+                    if self.use_gitignore:
+                        for dir_entry in files:
+                            if dir_entry.name == '.gitignore':
+                                rules = self._load_ignore_file(dir_entry.path, stat=dir_entry.stat())
+                                if rules: ignore_stack = ignore_stack + ((rel_posix, rules),)
+                                break
+
+                    self.dirs_walked += 1
+                    if relative_path != '.':
+                        yield WalkEntry('dir', os.path.basename(root), root, relative_path, level, False, False)
+
+                    t = tracer.now() if tracer is not None else 0
+                    checked = []
+                    for dir_entry in files:
                         try:
-                            full_dir_path = os.path.join(root, d)
-                            if not self._should_ignore_dir(d, full_dir_path):
-                                dirs.append(d)
-                        except Exception: pass
-                    for file in files:
+                            rel_file = dir_entry.name if relative_path == '.' else os.path.join(relative_path, dir_entry.name)
+                            ignored = self._should_ignore_file(dir_entry.name, rel_file)
+                            if not ignored and ignore_stack:
+                                ignored = gitignore_match(ignore_stack, rel_file.replace(os.sep, '/'), False)
+                            checked.append((dir_entry, rel_file, ignored))
+                        except Exception as e: self._log_warning(f"Erro ao processar arquivo {dir_entry.name}: {e}")
+                    visible = [i for i, (_, _, ignored) in enumerate(checked) if not ignored]
+                    if tracer is not None:
+                        tracer.count('ignore_checks', len(files))
+                        tracer.add('ignore', t)
+                    last_visible = visible[-1] if visible else -1
+                    for i, (dir_entry, rel_file, ignored) in enumerate(checked):
+                        yield WalkEntry('file', dir_entry.name, dir_entry.path, rel_file,
+                                        level + 1, ignored, i == last_visible, dir_entry)
+
+                    t = tracer.now() if tracer is not None else 0
+                    children = []
+                    for dir_entry in subdirs:
                         try:
-                            if self._check_timeout() or self.cancelled: break
-                            file_path = os.path.join(root, file)
-                            rel_path = os.path.relpath(file_path, self.project_path)
-                            if self._should_ignore_file(file, rel_path):
-                                self.files_skipped += 1
-                                continue
-                            try:
-                                _, ext = os.path.splitext(file.lower())
-                                if ext not in self.code_extensions and file.lower() not in self.code_extensions:
-                                    self.files_skipped += 1
+                            if not self._should_ignore_dir(dir_entry.name, dir_entry.path, dir_entry):
+                                rel_dir = dir_entry.name if relative_path == '.' else os.path.join(relative_path, dir_entry.name)
+                                if ignore_stack and gitignore_match(ignore_stack, rel_dir.replace(os.sep, '/'), True):
                                     continue
-                            except Exception:
-                                self.files_skipped += 1
-                                continue
-                            file_content, success = self._read_file_safely(file_path)
-                            if success and file_content:
-                                lang = ext[1:] if ext and len(ext) > 1 else ''
-                                content.append(
-                                    f"### `{rel_path}`\n\n"
-                                    f"```{lang}\n{file_content}\n```\n"
-                                )
-                                self.files_processed += 1
-                                if self.debug and self.files_processed % 10 == 0:
-                                    print(f"📝 Processados: {self.files_processed} arquivos...")
-                            else:
-                                self.files_skipped += 1
-                        except Exception as e:
-                            self._log_warning(f"Erro ao processar {file}: {e}")
-                            self.files_skipped += 1
+                                children.append((dir_entry.path, rel_dir, rel_dir.count(os.sep), ignore_stack))
+                        except Exception as e: self._log_warning(f"Erro ao processar diretório {dir_entry.name}: {e}")
+                    if tracer is not None:
+                        tracer.count('ignore_checks', len(subdirs))
+                        tracer.add('ignore', t)
+                    if pool is not None:
+                        for child_path, _, _, _ in children:
+                            if len(prefetched) >= max_prefetched: break
+                            prefetched[child_path] = pool.submit(self._scan_dir, child_path)
+                    stack.extend(reversed(children))
+
                 except Exception as e:
                     self._log_warning(f"Erro ao processar pasta {root}: {e}")
                     continue
+        except Exception as e:
+            self._log_error(f"Erro ao percorrer projeto: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _git_tracked_paths(self, symlinks: Optional[Set[str]] = None) -> Optional[List[str]]:
+        """
+        Caminhos rastreados pelo git, relativos a project_path (com '/').
+        Lê .git/index direto quando a pasta é a raiz de um repositório comum;
+        nos demais casos (subpasta, worktree, submódulo, formato não suportado)
+        usa 'git ls-files -z -t -s'. Nos dois caminhos, submódulos e arquivos
+        skip-worktree ficam de fora e os links simbólicos vão também para
+        'symlinks' (como em read_git_index). None se nenhum dos dois funcionar.
+        """
+        index_path = os.path.join(self.project_path, '.git', 'index')
+        if os.path.isfile(index_path):
+            try:
+                found: Set[str] = set()
+                paths = read_git_index(index_path, found)
+                if paths is not None:
+                    if symlinks is not None: symlinks.update(found)
+                    return paths
+            except Exception as e:
+                self._log_warning(f"Erro ao ler índice do git, usando git ls-files: {e}")
+        try:
+            result = subprocess.run(['git', 'ls-files', '-z', '-t', '-s', '--cached'], cwd=self.project_path,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            self._log_warning(f"git ls-files indisponível: {e}")
+            return None
+        if result.returncode != 0:
+            message = result.stderr.decode('utf-8', 'replace').strip().splitlines()
+            self._log_warning(f"git ls-files falhou: {message[0] if message else result.returncode}")
+            return None
+        # Cada item vem como '<tag> <modo> <hash> <estágio>\t<caminho>'; 'S' = skip-worktree
+        paths = []
+        for item in result.stdout.split(b'\0'):
+            if not item or item.startswith(b'S '): continue
+            meta, _, name = item.partition(b'\t')
+            mode = int(meta.split()[1], 8)
+            if mode == GIT_MODE_GITLINK: continue
+            path = os.fsdecode(name)
+            if mode == GIT_MODE_SYMLINK and symlinks is not None: symlinks.add(path)
+            paths.append(path)
+        return paths
+
+    def _walk_git_index(self, paths: List[str], symlinks: AbstractSet[str] = frozenset()) -> Iterator[WalkEntry]:
+        """
+        Mesma saída de _walk_project (ordem de árvore, pasta, arquivos, depois
+        subpastas), mas montada a partir da lista de arquivos rastreados: nenhuma
+        pasta é listada. Os filtros de perfil valem só sobre esses caminhos.
+        Links simbólicos ('symlinks') seguem a regra de _walk_project: para
+        arquivo, são lidos; para pasta, ficam de fora com aviso.
+        """
+        # Árvore em memória: pasta -> ({subpasta: nó}, [arquivos])
+        root: Tuple[Dict[str, tuple], List[str]] = ({}, [])
+        for rel in paths:
+            parts = rel.split('/')
+            node = root
+            for part in parts[:-1]:
+                child = node[0].get(part)
+                if child is None:
+                    child = node[0][part] = ({}, [])
+                node = child
+            node[1].append(parts[-1])
+
+        stack = [(self.project_path, '.', 0, root)]
+        while stack:
+            if self._check_timeout():
+                self._log_error("Processo cancelado por timeout")
+                break
+            if self.cancelled:
+                self._log_warning("Processo cancelado pelo usuário")
+                break
+            folder, relative_path, level, (subdirs, files) = stack.pop()
+            self.dirs_walked += 1
+            if relative_path != '.':
+                yield WalkEntry('dir', os.path.basename(folder), folder, relative_path, level, False, False)
+
+            checked = []
+            for name in sorted(set(files)):
+                rel_file = name if relative_path == '.' else os.path.join(relative_path, name)
+                if symlinks and rel_file.replace(os.sep, '/') in symlinks and os.path.isdir(os.path.join(folder, name)):
+                    self._log_warning(f"Link simbólico ignorado: {name}")
+                    continue
+                checked.append((name, rel_file, self._should_ignore_file(name, rel_file)))
+            visible = [i for i, (_, _, ignored) in enumerate(checked) if not ignored]
+            last_visible = visible[-1] if visible else -1
+            for i, (name, rel_file, ignored) in enumerate(checked):
+                file_path = os.path.join(folder, name)
+                yield WalkEntry('file', name, file_path, rel_file, level + 1, ignored,
+                                i == last_visible, IndexEntry(name, file_path))
+
+            children = []
+            for name in sorted(subdirs):
+                child_path = os.path.join(folder, name)
+                if self._should_ignore_dir(name, child_path, IndexEntry(name, child_path)):
+                    continue
+                rel_dir = name if relative_path == '.' else os.path.join(relative_path, name)
+                children.append((child_path, rel_dir, rel_dir.count(os.sep), subdirs[name]))
+            stack.extend(reversed(children))
+
+    def _walk(self) -> Iterator[WalkEntry]:
+        """Travessia escolhida: índice do git (use_git_index) ou o sistema de arquivos."""
+        if self.use_git_index:
+            symlinks: Set[str] = set()
+            paths = self._git_tracked_paths(symlinks)
+            if paths is not None:
+                return self._walk_git_index(paths, symlinks)
+            self._log_warning("Índice do git indisponível, percorrendo as pastas")
+        return self._walk_project()
+
+    def _tree_line(self, entry: WalkEntry) -> Optional[str]:
+        """Linha da árvore de template para um item da travessia (None se oculto)."""
+        if entry.ignored: return None
+        indent = "│   " * entry.level
+        if entry.kind == 'dir':
+            # Sem lookahead entre pastas: o prefixo '├──' é suficiente para o extrair_estrutura
+            return f"{indent}├── {entry.name}/"
+        prefix = "└──" if entry.is_last else "├──"
+        return f"{indent}{prefix} {entry.name}"
+
+    def _prepare_entry(self, entry: WalkEntry) -> Optional[Tuple[str, Optional[os.stat_result]]]:
+        """
+        Filtros baratos de um arquivo da travessia (ignorado / extensão).
+        Devolve (extensão, stat em cache do DirEntry) ou None se o arquivo foi pulado.
+        """
+        try:
+            if entry.ignored:
+                self._skip(entry, 'ignorado')
+                return None
+            try:
+                _, ext = os.path.splitext(entry.name.lower())
+                if ext not in self.code_extensions and entry.name.lower() not in self.code_extensions:
+                    self._skip(entry, 'extensão')
+                    return None
+            except Exception:
+                self._skip(entry, 'extensão')
+                return None
+            stat = None
+            if entry.dir_entry is not None:
+                try: stat = entry.dir_entry.stat()
+                except OSError: pass
+            if self._delta_unchanged_by_stat(entry, stat):
+                return None
+            return ext, stat
+        except Exception as e:
+            self._log_warning(f"Erro ao processar {entry.name}: {e}")
+            self._skip(entry, 'erro')
+            return None
+
+    def _finish_entry(self, entry: WalkEntry, ext: str, result: Tuple[str, bool]) -> Optional[str]:
+        """Transforma o resultado de _read_file_safely na seção Markdown do arquivo."""
+        file_content, success = result
+        if success and file_content:
+            digest = None
+            if self.dedupe_files or self._manifest_now is not None:
+                digest = FileCache.content_hash(file_content)
+            if not self._track_manifest(entry, digest):
+                return None
+            lang = ext[1:] if ext and len(ext) > 1 else ''
+            self.files_processed += 1
+            size = 0
+            if entry.dir_entry is not None:
+                try: size = entry.dir_entry.stat().st_size
+                except OSError: pass
+            self._emit(FileProcessed(entry.rel_path, size, lang))
+            if self.files_processed % PROGRESS_EVERY == 0:
+                self._progress('walk')
+            section, ref = None, None
+            if self.dedupe_files:
+                first = self._seen_hashes.get(digest)
+                if first is not None:
+                    self.duplicates_found += 1
+                    self.duplicate_bytes_saved += len(file_content.encode('utf-8', 'surrogatepass'))
+                    section, ref = (
+                        f"### `{entry.rel_path}`\n\n"
+                        f"_Conteúdo idêntico a `{first}`._\n"
+                    ), first
+                else:
+                    self._seen_hashes[digest] = entry.rel_path
+            if section is None and self.near_duplicates:
+                near = self._near_duplicate_section(entry, file_content)
+                if near is not None:
+                    section, ref = near
+            if section is None:
+                section = (
+                    f"### `{entry.rel_path}`\n\n"
+                    f"```{lang}\n{file_content}\n```\n"
+                )
+            if self.token_budget:
+                self._record_budget_item(entry, section, ref)
+            return section
+        self._skip(entry, 'ilegível')
+        return None
+
+    def _record_budget_item(self, entry: WalkEntry, section: str, ref: Optional[str]):
+        """
+        Estima os tokens da seção logo após a leitura. As seções saem na mesma
+        ordem em que chegam ao _budget_writer, que completa a posição no spool.
+        """
+        mtime = 0.0
+        if entry.dir_entry is not None:
+            try: mtime = entry.dir_entry.stat().st_mtime
+            except OSError: pass
+        self._budget_meta.append((entry.rel_path, entry.name, mtime, self.token_estimator(section), ref))
+
+    def _near_duplicate_section(self, entry: WalkEntry, content: str) -> Optional[Tuple[str, str]]:
+        """
+        Etapa opcional de quase duplicados: se o arquivo for parecido (acima de
+        near_duplicate_threshold) com um representante já emitido, devolve
+        (seção curta que aponta para ele, representante); senão o arquivo vira
+        representante.
+        """
+        shingles = shingle_hashes(content)
+        if shingles is None: return None
+        signature, sketch = minhash_signature(shingles), bottom_k_sketch(shingles)
+        if self._near_index is None:
+            self._near_index = NearDuplicateIndex(self.near_duplicate_threshold)
+        match = self._near_index.match(signature, sketch)
+        if match is None:
+            self._near_index.add(entry.rel_path, signature, sketch)
+            return None
+        representative, similarity = match
+        self.near_clusters.setdefault(representative, []).append(entry.rel_path)
+        return (
+            f"### `{entry.rel_path}`\n\n"
+            f"_Quase idêntico (~{similarity:.0%}) a `{representative}`._\n"
+        ), representative
+
+    def _generate_near_duplicate_section(self) -> str:
+        lines = ["## 🧬 Grupos de Arquivos Quase Idênticos\n"]
+        for representative, members in self.near_clusters.items():
+            lines.append(f"- `{representative}` (representante): " + ", ".join(f"`{m}`" for m in members))
+        return "\n".join(lines)
+
+    def _consolidate_entry(self, entry: WalkEntry) -> Optional[str]:
+        """Lê um arquivo da travessia e devolve a seção Markdown, ou None se pulado."""
+        prepared = self._prepare_entry(entry)
+        if prepared is None: return None
+        ext, stat = prepared
+        try:
+            return self._finish_entry(entry, ext, self._read_entry(entry.path, stat))
+        except Exception as e:
+            self._log_warning(f"Erro ao processar {entry.name}: {e}")
+            self._skip(entry, 'erro')
+            return None
+
+    def _read_sections(self, entries: Iterator[WalkEntry]) -> Iterator[str]:
+        """
+        Consolidador em pipeline. Com read_workers > 1, um pool de threads
+        executa _read_entry (cache ou leitura, detecção de binário, decodificação e
+        limpeza) enquanto este gerador, o único "escritor", entrega as seções na
+        ordem da travessia. Os bytes em voo (tamanho dos arquivos submetidos e
+        ainda não entregues) ficam limitados a max_inflight_bytes.
+        """
+        try:
+            workers = max(1, int(self.read_workers or 1))
+        except (TypeError, ValueError):
+            workers = 1
+        if workers == 1:
+            for entry in entries:
+                if entry.kind != 'file' or self.cancelled or self._check_timeout(): continue
+                section = self._consolidate_entry(entry)
+                if section: yield section
+            return
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="read")
+        pending = deque()  # (entry, ext, custo em bytes, future) na ordem da travessia
+        inflight = 0
+
+        def finish(item) -> Optional[str]:
+            entry, ext, _, future = item
+            try:
+                return self._finish_entry(entry, ext, future.result())
+            except Exception as e:
+                self._log_warning(f"Erro ao processar {entry.name}: {e}")
+                self._skip(entry, 'erro')
+                return None
+
+        try:
+            for entry in entries:
+                if entry.kind != 'file' or self.cancelled or self._check_timeout(): continue
+                prepared = self._prepare_entry(entry)
+                if prepared is None: continue
+                ext, stat = prepared
+                file_size = stat.st_size if stat is not None else None
+                # Arquivos acima do limite são recusados sem leitura: não pesam no orçamento
+                cost = file_size if file_size and file_size <= self.max_file_size else 0
+                while pending and (pending[0][3].done() or inflight + cost > self.max_inflight_bytes):
+                    item = pending.popleft()
+                    inflight -= item[2]
+                    section = finish(item)
+                    if section: yield section
+                pending.append((entry, ext, cost, pool.submit(self._read_entry, entry.path, stat)))
+                inflight += cost
+            while pending:
+                section = finish(pending.popleft())
+                if section: yield section
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _stream(self, on_tree_line: Optional[Callable[[str], None]],
+                on_section: Optional[Callable[[str], None]]) -> None:
+        """
+        Consome a travessia uma única vez e alimenta, no mesmo passo, o
+        renderizador da árvore (on_tree_line), o consolidador (on_section) e
+        os contadores de estatística. Nada é acumulado aqui: cada linha e cada
+        seção vai direto para o destino assim que fica pronta. Os contadores
+        da travessia (dirs_walked, files_listed) valem só para esta passada.
+        """
+        self.dirs_walked = self.files_listed = 0
+        if on_section is not None and self.use_cache:
+            self._cache = FileCache.open(self.cache_path, self.cache_max_bytes, self._log_warning)
+        if on_tree_line is not None:
+            on_tree_line(f"{os.path.basename(self.project_path)}/")
+
+        def walk() -> Iterator[WalkEntry]:
+            for entry in self._walk():
+                if entry.kind == 'file' and not entry.ignored:
+                    self.files_listed += 1
+                if on_tree_line is not None:
+                    line = self._tree_line(entry)
+                    if line is not None: on_tree_line(line)
+                yield entry
+
+        try:
+            if on_section is not None:
+                for section in self._read_sections(walk()):
+                    on_section(section)
+            else:
+                for _ in walk(): pass
         except Exception as e:
             self._log_error(f"Erro crítico ao consolidar código: {e}")
             self._log_error(traceback.format_exc())
-        return "\n".join(content) if content else "_Nenhum arquivo de código encontrado ou processado._\n"
+        finally:
+            if self._cache is not None:
+                self.cache_hits, self.cache_misses = self._cache.hits, self._cache.misses
+                if self.tracer is not None:
+                    self.tracer.count('cache_hits', self._cache.hits)
+                    self.tracer.count('cache_misses', self._cache.misses)
+                self._cache.close()
+                self._cache = None
+
+    def _collect(self, want_tree: bool = True, want_code: bool = True) -> Tuple[str, str]:
+        """Versão em memória de _stream: devolve (árvore, código) como strings."""
+        lines, content = [], []
+        self._stream(lines.append if want_tree else None, content.append if want_code else None)
+        tree = "\n".join(lines) if lines else "├── (vazio ou sem permissão)"
+        code = "\n".join(content) if content else "_Nenhum arquivo de código encontrado ou processado._\n"
+        return tree, code
+
+    def _generate_tree(self) -> str:
+        tree, _ = self._collect(want_tree=True, want_code=False)
+        return tree
+
+    def _consolidate_code(self) -> str:
+        _, code = self._collect(want_tree=False, want_code=True)
+        return code
+
+    def _open_spool(self, binary: bool = False) -> IO:
+        """
+        Arquivo temporário (em disco, ao lado do relatório) que recebe a árvore
+        ou as seções de código durante a travessia. newline='' preserva o
+        conteúdo byte a byte até a cópia final.
+        """
+        spool_dir = os.path.dirname(os.path.abspath(self.output_filename))
+        if binary:
+            return tempfile.TemporaryFile('w+b', dir=spool_dir)
+        codec = compression_codec(self.output_filename)
+        if codec:
+            # Saída comprimida: o spool já guarda um membro comprimido, pronto para cópia
+            return MemberSpool(tempfile.TemporaryFile('w+b', dir=spool_dir), codec)
+        return tempfile.TemporaryFile('w+', encoding='utf-8', errors='replace', newline='', dir=spool_dir)
+
+    @staticmethod
+    def _joined_writer(spool: IO[str]) -> Callable[[str], None]:
+        """Escreve itens separados por '\\n' (mesmo formato de "\\n".join)."""
+        state = {'first': True}
+        def write(item: str):
+            if not state['first']: spool.write("\n")
+            state['first'] = False
+            spool.write(item)
+        return write
+
+    def _budget_writer(self, spool: IO[bytes]) -> Callable[[str], None]:
+        """Grava todas as seções no spool bruto, guardando (posição, tamanho em bytes) de cada uma."""
+        def write(section: str):
+            data = self._encode_section(section)
+            self._budget_spans.append((spool.tell(), len(data)))
+            spool.write(data)
+        return write
+
+    def _budget_tier(self, item: BudgetItem, recent_cutoff: float) -> int:
+        """Prioridade no orçamento: pontos de entrada, configs, recentes, demais."""
+        name = item.name.lower()
+        if name in ENTRY_POINT_NAMES: return 0
+        if name in CONFIG_NAMES or (name.startswith('requirements') and name.endswith('.txt')): return 1
+        if item.mtime >= recent_cutoff: return 2
+        return 3
+
+    def _apply_token_budget(self, tree_spool: IO[str], raw_spool: IO[bytes], write: Callable[[str], None]):
+        """
+        Escolhe as seções por prioridade (e as menores primeiro dentro de cada
+        faixa) até esgotar token_budget, descontando a árvore e o cabeçalho, e
+        entrega as escolhidas do spool bruto a 'write' na ordem da árvore.
+        Referências a duplicados só entram se o arquivo de origem entrou.
+        """
+        items = [BudgetItem(*meta, *span) for meta, span in zip(self._budget_meta, self._budget_spans)]
+        tree_spool.seek(0)
+        used = self.token_estimator(tree_spool.read()) + REPORT_OVERHEAD_TOKENS
+        tree_spool.seek(0, io.SEEK_END)
+        recent_cutoff = time.time() - RECENT_SECONDS
+        ranked = sorted(items, key=lambda i: (self._budget_tier(i, recent_cutoff), i.tokens, i.rel_path))
+        chosen: List[BudgetItem] = []
+        selected: Set[str] = set()
+        for item in ranked:
+            if item.ref is None and used + item.tokens <= self.token_budget:
+                chosen.append(item)
+                selected.add(item.rel_path)
+                used += item.tokens
+        for item in ranked:
+            if item.ref is not None and item.ref in selected and used + item.tokens <= self.token_budget:
+                chosen.append(item)
+                selected.add(item.rel_path)
+                used += item.tokens
+        # A lista dos que ficaram de fora também custa tokens: devolve os de
+        # menor prioridade até caber (as referências saem antes das origens)
+        def listing_cost(item: BudgetItem) -> int:
+            return self.token_estimator(f"- `{item.rel_path}` (~{item.tokens} tokens)\n")
+        used += sum(listing_cost(i) for i in items if i.rel_path not in selected)
+        while chosen and used > self.token_budget:
+            item = chosen.pop()
+            selected.discard(item.rel_path)
+            used += listing_cost(item) - item.tokens
+        self.tokens_used = used
+        self.budget_excluded = [(i.rel_path, i.tokens) for i in items if i.rel_path not in selected]
+        for item in items:
+            if item.rel_path in selected:
+                raw_spool.seek(item.offset)
+                write(self._decode_section(raw_spool.read(item.length)))
+        # As posições só valem para este spool bruto, que é fechado em seguida
+        self._budget_meta, self._budget_spans = [], []
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.shard_max_bytes or self.shard_max_tokens)
+
+    @staticmethod
+    def _section_meta(section: str) -> Tuple[str, Optional[str]]:
+        """(caminho, linguagem) a partir do título e da cerca da seção; linguagem None em referências."""
+        end = section.find('`\n', 5)
+        if not section.startswith('### `') or end < 0: return '', None
+        fence = end + 3  # depois de "`\n\n"
+        if not section.startswith('```', fence): return section[5:end], None
+        return section[5:end], section[fence + 3:section.index('\n', fence)]
+
+    def _shard_writer(self, spool: IO[bytes]) -> Callable[[str], None]:
+        """Grava as seções finais (em UTF-8) no spool das partes, anotando caminho, posição e custo."""
+        def write(section: str):
+            raw = section.encode('utf-8', 'replace')
+            data = self._compress_bytes(raw)
+            rel, lang = self._section_meta(section)
+            self._shard_items.append(ShardItem(rel, spool.tell(), len(data), self.token_estimator(section),
+                                               len(raw), lang, hashlib.blake2b(raw, digest_size=16).hexdigest()))
+            spool.write(data)
+        return write
+
+    def _indexed_writer(self, spool: IO[str]) -> Callable[[str], None]:
+        """
+        _joined_writer que também anota, para o índice lateral, a posição em
+        bytes de cada seção dentro do bloco de código. Conta os bytes como vão
+        para o disco: UTF-8 e, em saída de texto sem compressão, '\n' virando
+        os.linesep.
+        """
+        newline = '\n' if compression_codec(self.output_filename) else os.linesep
+        joined = self._joined_writer(spool)
+        state = {'pos': 0, 'first': True}
+        def write(section: str):
+            if not state['first']: state['pos'] += len(newline)
+            state['first'] = False
+            joined(section)
+            if not self.write_index: return
+            on_disk = section if newline == '\n' else section.replace('\n', newline)
+            data = on_disk.encode('utf-8', 'replace')
+            rel, lang = self._section_meta(section)
+            self._index_records.append([rel, None, state['pos'], len(data), lang,
+                                        hashlib.blake2b(data, digest_size=16).hexdigest()])
+            state['pos'] += len(data)
+        return write
+
+    def _save_index(self):
+        """Grava o índice lateral; seções do relatório principal ganham a posição do bloco de código."""
+        path = self.index_path or f"{self.output_filename}.idx.json"
+        report = os.path.basename(self.output_filename)
+        rows = []
+        for rel, file, offset, length, lang, digest in self._index_records:
+            if file is None:
+                file, offset = report, offset + self._code_offset
+            rows.append([rel.replace(os.sep, '/'), file, offset, length, lang, digest])
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': 1,
+                    'report': report,
+                    'newline': '\n' if compression_codec(self.output_filename) else os.linesep,
+                    'files': rows,
+                }, f, ensure_ascii=False, separators=(',', ':'))
+            self._info(f"🗂️  Índice salvo em: {path}")
+        except Exception as e:
+            self._log_warning(f"Erro ao salvar índice {path}: {e}")
+
+    def _pack_shards(self) -> List[List[ShardItem]]:
+        """
+        Distribui as seções (na ordem da árvore) em partes dentro dos limites.
+        Os arquivos de uma mesma pasta ficam juntos sempre que a pasta inteira
+        cabe em uma parte; pastas maiores que uma parte são divididas, e um
+        arquivo maior que o limite vai sozinho para a sua parte.
+        """
+        max_bytes = (self.shard_max_bytes or 0) - SHARD_HEADER_BYTES
+        max_tokens = (self.shard_max_tokens or 0) - estimate_tokens(" " * SHARD_HEADER_BYTES)
+
+        def cost(item: ShardItem) -> Tuple[int, int]:
+            # A seção e a sua linha na árvore de contexto da parte
+            return item.nbytes + len(item.rel_path) + 16, item.tokens + len(item.rel_path) // 4 + 4
+
+        def fits(used: Tuple[int, int], extra: Tuple[int, int]) -> bool:
+            if self.shard_max_bytes and used[0] + extra[0] > max_bytes: return False
+            if self.shard_max_tokens and used[1] + extra[1] > max_tokens: return False
+            return True
+
+        parts: List[List[ShardItem]] = [[]]
+        used = (0, 0)
+        for _, group in groupby(self._shard_items, key=lambda item: os.path.dirname(item.rel_path)):
+            group = list(group)
+            costs = [cost(item) for item in group]
+            total = (sum(c[0] for c in costs), sum(c[1] for c in costs))
+            if parts[-1] and not fits(used, total) and fits((0, 0), total):
+                parts.append([])
+                used = (0, 0)
+            for item, item_cost in zip(group, costs):
+                if parts[-1] and not fits(used, item_cost):
+                    parts.append([])
+                    used = (0, 0)
+                parts[-1].append(item)
+                used = (used[0] + item_cost[0], used[1] + item_cost[1])
+        return [part for part in parts if part]
+
+    def _exclude_own_outputs(self, template_path: Optional[str] = None):
+        """
+        Relatório, partes, manifesto, índice e template ficam fora da
+        travessia: com a saída dentro do projeto ('export .'), a exportação
+        seguinte os leria de volta como código (e, em delta, como modificados).
+        """
+        root = self.project_path.rstrip(os.sep) + os.sep
+        def relative(path: str) -> Optional[str]:
+            path = os.path.abspath(path)
+            return os.path.relpath(path, self.project_path) if path.startswith(root) else None
+        own = (self.output_filename, self._default_manifest_path(),
+               self.index_path or f"{self.output_filename}.idx.json", template_path)
+        self._own_paths = {rel for rel in (relative(p) for p in own if p) if rel}
+        base, compressed = self.output_filename, ''
+        if compression_codec(base):
+            base, compressed = os.path.splitext(base)
+        base, ext = os.path.splitext(base)
+        rel_base = relative(base)
+        self._own_parts = re.compile(re.escape(rel_base) + r'\.part\d{2,}' + re.escape(ext + compressed)) if rel_base else None
+
+    def _shard_path(self, index: int) -> str:
+        base, compressed = self.output_filename, ''
+        if compression_codec(base):
+            base, compressed = os.path.splitext(base)
+        base, ext = os.path.splitext(base)
+        return f"{base}.part{index:02d}{ext}{compressed}"
+
+    def _encode_section(self, text: str) -> bytes:
+        """Bytes de uma seção nos spools binários: UTF-8, comprimido (um membro) se a saída for."""
+        return self._compress_bytes(text.encode('utf-8', 'replace'))
+
+    def _compress_bytes(self, data: bytes) -> bytes:
+        codec = compression_codec(self.output_filename)
+        return _codec_module(codec).compress(data) if codec else data
+
+    def _decode_section(self, data: bytes) -> str:
+        codec = compression_codec(self.output_filename)
+        if codec: data = _codec_module(codec).decompress(data)
+        return data.decode('utf-8')
+
+    def _render_subtree(self, rel_paths: List[str]) -> str:
+        """Árvore de contexto de uma parte: só as pastas e os arquivos que ela contém."""
+        lines = [f"{os.path.basename(self.project_path)}/"]
+        emitted: Set[str] = set()
+        for i, rel in enumerate(rel_paths):
+            parent, name = os.path.split(rel)
+            parts = parent.split(os.sep) if parent else []
+            for depth in range(len(parts)):
+                folder = os.sep.join(parts[:depth + 1])
+                if folder not in emitted:
+                    emitted.add(folder)
+                    lines.append(self._tree_line(WalkEntry('dir', parts[depth], '', folder, depth, False, False)))
+            level = (parent.count(os.sep) if parent else 0) + 1
+            is_last = i + 1 == len(rel_paths) or os.path.dirname(rel_paths[i + 1]) != parent
+            lines.append(self._tree_line(WalkEntry('file', name, '', rel, level, False, is_last)))
+        return "\n".join(lines)
+
+    def _write_shard(self, spool: IO[bytes], lock: threading.Lock, index: int, total: int,
+                     part: List[ShardItem]) -> Tuple[Tuple[str, int, int, int], List[list]]:
+        """Grava uma parte; devolve o resumo para o índice de partes e os registros do índice lateral."""
+        path = self._shard_path(index)
+        fd = spool.fileno()
+        with open(path, 'wb') as out:
+            header = (
+                f"# 📋 Análise de Projeto — Parte {index}/{total}\n\n"
+                f"**Projeto:** `{os.path.basename(self.project_path)}`  \n"
+                f"**Caminho:** `{self.project_path}`  \n"
+                f"**Índice:** `{os.path.basename(self.output_filename)}`\n\n"
+                "---\n\n"
+                "## 📁 Arquivos Desta Parte\n\n```\n"
+                f"{self._render_subtree([item.rel_path for item in part])}\n```\n\n"
+                "---\n\n"
+                "## 💻 Conteúdo dos Arquivos de Código\n\n"
+            )
+            header_bytes = header.encode('utf-8', 'replace')
+            out.write(self._compress_bytes(header_bytes))
+            separator = self._encode_section("\n")
+            position = len(header_bytes)  # em bytes descomprimidos
+            records = []
+            for i, item in enumerate(part):
+                if i:
+                    out.write(separator)
+                    position += 1
+                records.append([item.rel_path, os.path.basename(path), position, item.raw_bytes, item.lang, item.digest])
+                position += item.raw_bytes
+                if hasattr(os, 'pread'):
+                    data = os.pread(fd, item.nbytes, item.offset)
+                else:
+                    with lock:
+                        spool.seek(item.offset)
+                        data = spool.read(item.nbytes)
+                out.write(data)
+            out.write(self._encode_section(f"\n\n---\n\n_Parte {index}/{total} gerada automaticamente pelo ProjectAnalyzer_\n"))
+        return (path, len(part), os.path.getsize(path), sum(item.tokens for item in part)), records
+
+    def _write_shards(self, spool: IO[bytes], code_spool: IO[str]):
+        """
+        Grava as partes em paralelo (cada thread lê suas seções do spool com
+        pread, sem disputar a posição do arquivo) e deixa em code_spool o
+        índice das partes para o relatório principal.
+        """
+        spool.flush()
+        parts = self._pack_shards()
+        lock = threading.Lock()
+        try:
+            workers = max(1, min(int(self.shard_workers or 1), len(parts)))
+        except (TypeError, ValueError):
+            workers = 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard") as pool:
+            futures = [pool.submit(self._write_shard, spool, lock, i, len(parts), part)
+                       for i, part in enumerate(parts, 1)]
+            self.shard_files = []
+            for future in futures:
+                try:
+                    summary, records = future.result()
+                    self.shard_files.append(summary)
+                    if self.write_index: self._index_records.extend(records)
+                except Exception as e:
+                    self._log_error(f"Erro ao gravar parte: {e}")
+        oversized = [path for path, _, size, _ in self.shard_files if self.shard_max_bytes and size > self.shard_max_bytes]
+        for path in oversized:
+            self._log_warning(f"Parte acima do limite (arquivo maior que o limite): {path}")
+        write = self._joined_writer(code_spool)
+        for path, sections, size, tokens in self.shard_files:
+            write(f"- `{os.path.basename(path)}` — {sections} arquivo(s), {size} bytes, ~{tokens} tokens")
+
+    def _generate_budget_section(self) -> str:
+        lines = [f"## ✂️ Arquivos Fora do Orçamento de Tokens ({self.token_budget})\n"]
+        lines.extend(f"- `{path}` (~{tokens} tokens)" for path, tokens in self.budget_excluded)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _open_output(path: str) -> IO[str]:
+        """Abre um arquivo de saída de texto; .gz/.xz/.bz2 são comprimidos em fluxo, por membros."""
+        codec = compression_codec(path)
+        if codec: return MemberWriter(path, codec)
+        return open(path, 'w', encoding='utf-8', errors='replace')
+
+    @staticmethod
+    def _copy_spool(spool: IO[str], out: IO[str]):
+        if isinstance(out, MemberWriter):
+            out.copy_spool(spool)
+            return
+        spool.seek(0)
+        shutil.copyfileobj(spool, out, 1024 * 1024)
+
+    def _write_template(self, tree_content: Union[str, IO[str]], template_path: str) -> bool:
+        try:
+            with self._open_output(template_path) as f:
+                if isinstance(tree_content, str): f.write(tree_content)
+                else: self._copy_spool(tree_content, f)
+            self._info(f"✅ Template salvo com sucesso em: {template_path}")
+            return True
+        except Exception as e:
+            self._log_error(f"Erro ao salvar template .txt: {e}")
+            return False
 
     def _generate_statistics(self) -> str:
         stats = [
             "## 📊 Estatísticas da Análise\n",
             f"- **Arquivos processados:** {self.files_processed}",
             f"- **Arquivos ignorados/pulados:** {self.files_skipped}",
+            f"- **Pastas percorridas:** {self.dirs_walked}",
+            f"- **Arquivos na árvore:** {self.files_listed}",
+            f"- **Duplicados idênticos:** {self.duplicates_found} ({self.duplicate_bytes_saved} bytes economizados)" if self.dedupe_files else "- **Duplicados idênticos:** não verificado",
+            f"- **Quase duplicados:** {sum(map(len, self.near_clusters.values()))} em {len(self.near_clusters)} grupo(s)" if self.near_duplicates else None,
+            f"- **Orçamento de tokens:** ~{self.tokens_used} de {self.token_budget} ({len(self.budget_excluded)} arquivo(s) fora)" if self.token_budget else None,
+            f"- **Cache (acertos/faltas):** {self.cache_hits}/{self.cache_misses}" if self.use_cache else "- **Cache:** desativado",
             f"- **Erros encontrados:** {len(self.errors)}",
             f"- **Avisos gerados:** {len(self.warnings)}",
             f"- **Data/Hora:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
@@ -424,7 +2336,9 @@ class ProjectAnalyzer:
         if self.start_time:
             elapsed = time.time() - self.start_time
             stats.append(f"- **Tempo de execução:** {elapsed:.2f}s")
-        return "\n".join(stats)
+        if self.tracer is not None and self.tracer.stage_seconds:
+            stats.append(f"- **Tempo por etapa:** {self.tracer.stage_summary()}")
+        return "\n".join(line for line in stats if line is not None)
 
     def _generate_error_section(self) -> str:
         sections = []
@@ -440,94 +2354,849 @@ class ProjectAnalyzer:
             if len(self.warnings) > 30: sections.append(f"\n_... e mais {len(self.warnings) - 30} avisos_")
         return "\n".join(sections)
 
-    def generate_report(self, tree_content: str) -> bool:
+    def _default_manifest_path(self) -> str:
+        return self.manifest_path or f"{self.output_filename}.manifest.json"
+
+    def _load_manifest(self, path: str) -> Optional[Dict[str, list]]:
+        """Lê um manifesto {caminho: [tamanho, mtime_ns, hash]}; None (com aviso) se não der."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != 1 or not isinstance(data.get('files'), dict):
+                raise ValueError("formato desconhecido")
+            return data['files']
+        except FileNotFoundError:
+            self._log_warning(f"Manifesto anterior não encontrado, exportando tudo: {path}")
+        except Exception as e:
+            self._log_warning(f"Manifesto anterior inválido ({e}), exportando tudo: {path}")
+        return None
+
+    def _save_manifest(self):
+        path = self._default_manifest_path()
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': 1,
+                    'project': self.project_path,
+                    'generated_at': datetime.now().isoformat(timespec='seconds'),
+                    'files': self._manifest_now,
+                }, f, ensure_ascii=False, separators=(',', ':'))
+            self._info(f"🧾 Manifesto salvo em: {path}")
+        except Exception as e:
+            self._log_warning(f"Erro ao salvar manifesto {path}: {e}")
+
+    def _delta_unchanged_by_stat(self, entry: WalkEntry, stat: Optional[os.stat_result]) -> bool:
         """
-        Gera relatório completo.
-        MODIFICADO: Agora recebe o 'tree_content' como argumento
-        para evitar gerá-lo duas vezes.
+        Modo delta: arquivo com mesmo tamanho e mtime do manifesto anterior é
+        considerado inalterado sem ser lido (a entrada antiga é copiada).
         """
-        self.start_time = time.time()
-        success = False
+        if self._manifest_prev is None or stat is None: return False
+        key = entry.rel_path.replace(os.sep, '/')
+        previous = self._manifest_prev.get(key)
+        if previous is None or previous[0] != stat.st_size or previous[1] != stat.st_mtime_ns:
+            return False
+        self._manifest_now[key] = previous
+        self.delta_unchanged += 1
+        return True
+
+    def _track_manifest(self, entry: WalkEntry, digest: str) -> bool:
+        """
+        Registra o arquivo lido no manifesto novo. Em modo delta devolve False
+        quando o conteúdo é igual ao do manifesto anterior (só o mtime mudou),
+        e classifica o arquivo como adicionado ou modificado caso contrário.
+        """
+        if self._manifest_now is None: return True
+        key = entry.rel_path.replace(os.sep, '/')
+        stat = None
+        if entry.dir_entry is not None:
+            try: stat = entry.dir_entry.stat()
+            except OSError: pass
+        self._manifest_now[key] = [stat.st_size if stat else None, stat.st_mtime_ns if stat else None, digest]
+        if self._manifest_prev is None: return True
+        previous = self._manifest_prev.get(key)
+        if previous is None:
+            self.delta_added.append(key)
+        elif previous[2] != digest:
+            self.delta_modified.append(key)
+        else:
+            self.delta_unchanged += 1
+            return False
+        return True
+
+    def _generate_delta_section(self) -> str:
+        lines = [
+            "## 🔄 Mudanças desde a exportação anterior\n",
+            f"- **Adicionados:** {len(self.delta_added)}",
+            f"- **Modificados:** {len(self.delta_modified)}",
+            f"- **Removidos:** {len(self.delta_deleted)}",
+            f"- **Inalterados:** {self.delta_unchanged}",
+        ]
+        for title, paths in (("Adicionados", self.delta_added), ("Modificados", self.delta_modified), ("Removidos", self.delta_deleted)):
+            if paths:
+                lines.append(f"\n**{title}:**\n")
+                lines.extend(f"- `{p}`" for p in paths)
+        return "\n".join(lines)
+
+    def _write_report_file(self, tree_spool: IO[str], code_spool: IO[str]):
+        """Monta o .md final: cabeçalho e estatísticas, depois a árvore e o código copiados dos spools."""
+        stats = self._generate_statistics()
+        error_section = self._generate_error_section()
         try:
-            print("📝 Consolidando arquivos de código...")
-            code_content = self._consolidate_code()
-            
-            stats = self._generate_statistics()
-            error_section = self._generate_error_section()
-            
-            print(f"\n💾 Salvando arquivo '{self.output_filename}'...")
-            
-            try:
-                with open(self.output_filename, 'w', encoding='utf-8', errors='replace') as out:
-                    out.write("# 📋 Análise de Projeto\n\n")
-                    out.write(f"**Projeto:** `{os.path.basename(self.project_path)}`  \n")
-                    out.write(f"**Caminho:** `{self.project_path}`\n\n")
-                    out.write("---\n\n")
-                    out.write(stats)
+            with self._open_output(self.output_filename) as out:
+                out.write("# 📋 Análise de Projeto\n\n")
+                out.write(f"**Projeto:** `{os.path.basename(self.project_path)}`  \n")
+                out.write(f"**Caminho:** `{self.project_path}`\n\n")
+                out.write("---\n\n")
+                out.write(stats)
+                out.write("\n\n---\n\n")
+                if self._manifest_prev is not None:
+                    # Delta: resumo das mudanças no lugar da árvore completa
+                    out.write(self._generate_delta_section())
                     out.write("\n\n---\n\n")
+                    out.write("## 💻 Arquivos Adicionados/Modificados\n\n")
+                else:
                     out.write("## 📁 Estrutura de Pastas\n\n```\n")
-                    out.write(tree_content) # Usa a árvore pré-gerada
+                    self._copy_spool(tree_spool, out)
                     out.write("\n```\n\n")
                     out.write("---\n\n")
-                    out.write("## 💻 Conteúdo dos Arquivos de Código\n\n")
-                    out.write(code_content)
-                    
-                    if error_section:
-                        out.write("\n\n---\n")
-                        out.write(error_section)
-                    
+                    if self.shard_files:
+                        out.write(f"## 🧩 Partes da Exportação ({len(self.shard_files)})\n\n")
+                    else:
+                        out.write("## 💻 Conteúdo dos Arquivos de Código\n\n")
+                self._code_offset = out.tell()
+                self._copy_spool(code_spool, out)
+
+                if self.near_clusters:
                     out.write("\n\n---\n\n")
-                    out.write("_Relatório gerado automaticamente pelo ProjectAnalyzer_\n")
-                
+                    out.write(self._generate_near_duplicate_section())
+
+                if self.budget_excluded:
+                    out.write("\n\n---\n\n")
+                    out.write(self._generate_budget_section())
+
+                if error_section:
+                    out.write("\n\n---\n")
+                    out.write(error_section)
+
+                out.write("\n\n---\n\n")
+                out.write("_Relatório gerado automaticamente pelo ProjectAnalyzer_\n")
+        except PermissionError:
+            raise PermissionError(f"Sem permissão para escrever: {self.output_filename}")
+        except (OSError, IOError) as e:
+            raise IOError(f"Erro ao escrever arquivo: {e}")
+
+    def _reset_run_state(self):
+        """Zera o estado de uma exportação, para o mesmo analisador poder gerar outro relatório."""
+        self.files_processed = self.files_skipped = 0
+        self.dirs_walked = self.files_listed = 0
+        self._manifest_prev = self._manifest_now = None
+        self.delta_added, self.delta_modified, self.delta_deleted = [], [], []
+        self.delta_unchanged = 0
+        self._seen_hashes = {}
+        self.duplicates_found = self.duplicate_bytes_saved = 0
+        self._near_index = None
+        self.near_clusters = {}
+        self.tokens_used = 0
+        self.budget_excluded = []
+        self._budget_meta, self._budget_spans = [], []
+        self.shard_files, self._shard_items = [], []
+        self._index_records = []
+        self._code_offset = 0
+
+    def generate_report(self, tree_content: Optional[str] = None, template_path: Optional[str] = None) -> bool:
+        """
+        Gera relatório completo.
+        Sem 'tree_content', a árvore e o código saem da MESMA travessia do
+        projeto; com 'template_path', a árvore também é salva como template .txt.
+
+        A árvore e as seções de código são gravadas em arquivos temporários à
+        medida que são produzidas, e o relatório final é montado por cópia em
+        blocos. As estatísticas, que só existem no fim, entram no cabeçalho
+        nessa montagem. O pico de memória não cresce com o tamanho do projeto.
+        """
+        self._reset_run_state()
+        self._exclude_own_outputs(template_path)
+        self.start_time = time.time()
+        if self.trace_path and self.tracer is None:
+            self.tracer = StageTracer()
+        tracer = self.tracer
+        export_start = tracer.now() if tracer is not None else 0
+        success = False
+        try:
+            if self.delta_from:
+                self._manifest_prev = self._load_manifest(self.delta_from)
+            if self.write_manifest or self._manifest_prev is not None:
+                self._manifest_now = {}
+            with self._open_spool() as tree_spool, self._open_spool() as code_spool:
+                # Com orçamento de tokens, todas as seções vão antes para um spool
+                # bruto; só as escolhidas seguem para code_spool
+                raw_spool = self._open_spool(binary=True) if self.token_budget else code_spool
+                # Em partes, as seções finais vão (em bytes) para um spool próprio
+                shard_spool = self._open_spool(binary=True) if self.sharded else None
+                try:
+                    final_write = self._shard_writer(shard_spool) if self.sharded else self._indexed_writer(code_spool)
+                    write_section = self._budget_writer(raw_spool) if self.token_budget else final_write
+                    write_tree = self._joined_writer(tree_spool)
+                    if tracer is not None:
+                        write_section = tracer.wrap('write_section', write_section)
+                        write_tree = tracer.wrap('write_tree', write_tree)
+                    if tree_content is None:
+                        self._info("📂 Percorrendo projeto (árvore + código em passada única)...")
+                        self._stream(write_tree, write_section)
+                    else:
+                        self._info("📝 Consolidando arquivos de código...")
+                        tree_spool.write(tree_content)
+                        self._stream(None, write_section)
+                    if self.token_budget:
+                        self._progress('budget')
+                        with self._stage('budget'):
+                            self._apply_token_budget(tree_spool, raw_spool, final_write)
+                    if self.sharded:
+                        self._info("🧩 Gravando partes em paralelo...")
+                        self._progress('shards')
+                        with self._stage('shards'):
+                            self._write_shards(shard_spool, code_spool)
+                finally:
+                    if raw_spool is not code_spool: raw_spool.close()
+                    if shard_spool is not None: shard_spool.close()
+                if self._manifest_prev is not None and not (self.cancelled or self._check_timeout()):
+                    self.delta_deleted = sorted(set(self._manifest_prev) - set(self._manifest_now))
+                if code_spool.tell() == 0:
+                    if self._manifest_prev is not None: empty = "_Nenhuma mudança desde a exportação anterior._\n"
+                    elif self.budget_excluded: empty = "_Nenhum arquivo coube no orçamento de tokens._\n"
+                    else: empty = "_Nenhum arquivo de código encontrado ou processado._\n"
+                    code_spool.write(empty)
+                if template_path:
+                    with self._stage('template'):
+                        self._write_template(tree_spool, template_path)
+
+                self._info(f"\n💾 Salvando arquivo '{self.output_filename}'...")
+                self._progress('write')
+                with self._stage('write_report'):
+                    self._write_report_file(tree_spool, code_spool)
                 success = True
-                
-            except PermissionError:
-                raise PermissionError(f"Sem permissão para escrever: {self.output_filename}")
-            except (OSError, IOError) as e:
-                raise IOError(f"Erro ao escrever arquivo: {e}")
+            if self.write_manifest and not self.cancelled:
+                with self._stage('manifest'):
+                    self._save_manifest()
+            if self.write_index and not self.cancelled:
+                with self._stage('index'):
+                    self._save_index()
             
-            print("\n" + "="*60)
-            print("✅ ANÁLISE CONCLUÍDA COM SUCESSO!")
-            print("="*60)
-            print(f"📄 Arquivo gerado: {self.output_filename}")
-            print(f"📊 Arquivos processados: {self.files_processed}")
-            print(f"⏭️  Arquivos ignorados: {self.files_skipped}")
+            self._info("\n" + "="*60)
+            self._info("✅ ANÁLISE CONCLUÍDA COM SUCESSO!")
+            self._info("="*60)
+            self._info(f"📄 Arquivo gerado: {self.output_filename}")
+            self._info(f"📊 Arquivos processados: {self.files_processed}")
+            self._info(f"⏭️  Arquivos ignorados: {self.files_skipped}")
             
-            if self.errors: print(f"❌ Erros: {len(self.errors)}")
-            if self.warnings: print(f"⚠️  Avisos: {len(self.warnings)}")
+            if self.shard_files:
+                self._info(f"🧩 Partes: {len(self.shard_files)} ({os.path.basename(self._shard_path(1))} ...)")
+            if self.token_budget:
+                self._info(f"🎯 Tokens: ~{self.tokens_used} de {self.token_budget} ({len(self.budget_excluded)} arquivo(s) fora do orçamento)")
+            if self.duplicates_found:
+                self._info(f"♻️  Duplicados: {self.duplicates_found} ({self.duplicate_bytes_saved} bytes economizados)")
+            if self._manifest_prev is not None:
+                self._info(f"🔄 Delta: +{len(self.delta_added)} ~{len(self.delta_modified)} -{len(self.delta_deleted)} (inalterados: {self.delta_unchanged})")
+            if self.errors: self._info(f"❌ Erros: {len(self.errors)}")
+            if self.warnings: self._info(f"⚠️  Avisos: {len(self.warnings)}")
             
             if self.start_time:
                 elapsed = time.time() - (self.start_time or time.time())
-                print(f"⏱️  Tempo total: {elapsed:.2f}s")
-            print("="*60)
+                self._info(f"⏱️  Tempo total: {elapsed:.2f}s")
+            if tracer is not None:
+                self._info(f"🔬 Etapas: {tracer.stage_summary(5)}")
+            self._info("="*60)
             
             return True
             
         except KeyboardInterrupt:
             self._log_error("Processo interrompido pelo usuário")
-            print("\n⚠️  Processo cancelado pelo usuário")
+            self._info("\n⚠️  Processo cancelado pelo usuário")
             return False
             
         except Exception as e:
             self._log_error(f"Erro crítico: {e}")
             self._log_error(traceback.format_exc())
-            print(f"\n❌ ERRO CRÍTICO: {e}")
-            print("Verifique as permissões e o caminho do projeto")
+            self._info(f"\n❌ ERRO CRÍTICO: {e}")
+            self._info("Verifique as permissões e o caminho do projeto")
             return False
         
         finally:
             if not success and self.files_processed > 0:
                 try:
-                    print("\n⚠️  Tentando salvar relatório parcial...")
-                    with open(f"parcial_{self.output_filename}", 'w', encoding='utf-8') as out:
+                    self._info("\n⚠️  Tentando salvar relatório parcial...")
+                    with self._open_output(f"parcial_{self.output_filename}") as out:
                         out.write("# Relatório Parcial (Processo Interrompido)\n\n")
                         out.write(self._generate_statistics())
                         out.write(self._generate_error_section())
-                    print(f"💾 Relatório parcial salvo como: parcial_{self.output_filename}")
+                    self._info(f"💾 Relatório parcial salvo como: parcial_{self.output_filename}")
                 except Exception:
                     pass
+            if tracer is not None:
+                tracer.add('export', export_start)
+                if self.trace_path: self._save_trace()
+            self._emit(ExportStats(
+                success, self.output_filename, self.files_processed, self.files_skipped,
+                len(self.errors), len(self.warnings),
+                time.time() - self.start_time, tuple(self.shard_files)))
+
+    def _save_trace(self):
+        try:
+            self.tracer.save(self.trace_path)
+            self._info(f"🔬 Trace salvo em: {self.trace_path} (abra em chrome://tracing ou ui.perfetto.dev)")
+        except (OSError, TypeError, ValueError) as e:
+            self._log_warning(f"Erro ao salvar trace {self.trace_path}: {e}")
+
+    def iter_report(self, template_path: Optional[str] = None) -> Iterator[ExportRecord]:
+        """
+        generate_report como fluxo de registros: a exportação roda numa thread
+        e cada registro chega aqui na ordem, terminando no ExportStats. Os sinks
+        já registrados continuam recebendo (limpe self.sinks para só iterar).
+        Fechar o gerador antes do fim cancela a exportação.
+        """
+        records: 'queue.Queue' = queue.Queue()
+        done = object()
+        sink = records.put
+        self.sinks.append(sink)
+
+        def run():
+            try: self.generate_report(template_path=template_path)
+            finally: records.put(done)
+
+        worker = threading.Thread(target=run, name="export", daemon=True)
+        worker.start()
+        try:
+            while True:
+                record = records.get()
+                if record is done: return
+                yield record
+        finally:
+            if worker.is_alive(): self.cancelled = True
+            worker.join()
+            self.sinks.remove(sink)
     # --- FIM DO CÓDIGO DA CLASSE ProjectAnalyzer ---    """
 
+#================================================================================
+# BLOCO 1C: MODO WATCH (RELATÓRIO SEMPRE ATUALIZADO)
+#================================================================================
+
+class InotifySource:
+    """
+    Eventos de mudança via inotify (Linux), carregado por ctypes sob demanda.
+    Um watch por pasta percorrida; 'sync' acompanha pastas criadas/removidas.
+    """
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    STRUCTURAL = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        import ctypes, ctypes.util  # só no Linux, e só no modo watch
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self._ctypes = ctypes
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith('linux')
+
+    def sync(self, dirs: List[str]):
+        """Adiciona watches para pastas novas e remove os das que sumiram."""
+        wanted = set(dirs)
+        for path in list(self._dir_to_wd):
+            if path not in wanted:
+                self._libc.inotify_rm_watch(self.fd, self._dir_to_wd.pop(path))
+        for path in dirs:
+            if path in self._dir_to_wd: continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                err = self._ctypes.get_errno()
+                if err == 28:  # ENOSPC: limite de watches do sistema
+                    raise OSError(err, "limite de watches do inotify atingido")
+                continue  # pasta removida entre a travessia e o watch
+            self._wd_to_dir[wd] = path
+            self._dir_to_wd[path] = wd
+
+    def wait(self, timeout: float) -> Iterator[Tuple[str, bool, bool]]:
+        """(caminho completo, é pasta, é estrutural) dos eventos que chegarem até 'timeout'."""
+        import select
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready: return
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos + 16 <= len(data):
+            wd, mask, _, length = struct.unpack_from('iIII', data, pos)
+            name = data[pos + 16:pos + 16 + length].rstrip(b'\0')
+            pos += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                yield '', True, True  # eventos perdidos: refaz tudo
+                continue
+            folder = self._wd_to_dir.get(wd)
+            if folder is None or not name: continue
+            yield os.path.join(folder, os.fsdecode(name)), bool(mask & self.IN_ISDIR), bool(mask & self.STRUCTURAL)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    """
+    Alternativa portátil ao inotify: a cada 'wait' compara (mtime, tamanho) dos
+    arquivos conhecidos e o mtime das pastas com a varredura anterior.
+    """
+    def __init__(self):
+        self._dirs: Dict[str, int] = {}
+        self._files: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def sync(self, dirs: List[str], files: List[str]):
+        self._dirs = {d: self._stat_key(d) for d in dirs}
+        self._files = {f: self._stat_key(f) for f in files}
+
+    def wait(self, timeout: float) -> Iterator[Tuple[str, bool, bool]]:
+        time.sleep(timeout)
+        for path, previous in self._dirs.items():
+            current = self._stat_key(path)
+            if current is None or previous is None or current[0] != previous[0]:
+                self._dirs[path] = current
+                yield path, True, True
+        for path, previous in self._files.items():
+            current = self._stat_key(path)
+            if current != previous:
+                self._files[path] = current
+                yield path, False, current is None
+
+
+class ProjectWatcher:
+    """
+    Mantém o .md de um ProjectAnalyzer atualizado enquanto o projeto muda.
+
+    A exportação inicial guarda em memória as linhas da árvore e a seção de
+    cada arquivo. A cada rajada de mudanças (agrupada até 'debounce_seconds'
+    sem novos eventos) só os arquivos afetados são relidos; a árvore só é
+    refeita quando algo é criado, removido ou renomeado. O .md (e, com
+    shard_max_bytes/shard_max_tokens, as suas partes) é então reescrito a
+    partir das seções em memória. Usa inotify no Linux e, na
+    falta dele, varredura periódica a cada 'poll_interval' segundos.
+    Termina quando analyzer.cancelled vira True ou stop() é chamado.
+    """
+    def __init__(self, analyzer: 'ProjectAnalyzer', debounce_seconds: float = 0.3,
+                 poll_interval: float = 1.0, template_path: Optional[str] = None,
+                 use_inotify: bool = True):
+        self.analyzer = analyzer
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.template_path = template_path
+        self.use_inotify = use_inotify
+        self.tree_lines: List[str] = []
+        self.entries: Dict[str, WalkEntry] = {}  # arquivos visíveis, na ordem da árvore
+        self.sections: Dict[str, str] = {}
+        self.dirs: List[str] = []
+        self.total_files = 0
+        self.updates = 0
+        self._stop = threading.Event()
+        # O próprio relatório (e seus anexos) não pode disparar novas atualizações
+        self._own_files = {os.path.abspath(p) for p in (analyzer.output_filename, analyzer._default_manifest_path(),
+                                                            analyzer.index_path or f"{analyzer.output_filename}.idx.json", template_path) if p}
+
+    def stop(self):
+        self._stop.set()
+
+    def _stopped(self) -> bool:
+        return self._stop.is_set() or self.analyzer.cancelled
+
+    def _rebuild_tree(self):
+        """Refaz árvore, pastas e lista de arquivos (sem ler conteúdo)."""
+        a = self.analyzer
+        a.dirs_walked = a.files_listed = 0
+        lines = [f"{os.path.basename(a.project_path)}/"]
+        dirs = [a.project_path]
+        entries: Dict[str, WalkEntry] = {}
+        total = 0
+        for entry in a._walk():
+            line = a._tree_line(entry)
+            if line is not None: lines.append(line)
+            if entry.kind == 'dir':
+                dirs.append(entry.path)
+                continue
+            total += 1
+            if not entry.ignored:
+                a.files_listed += 1
+                entries[entry.rel_path] = entry
+        self.tree_lines, self.dirs, self.entries, self.total_files = lines, dirs, entries, total
+
+    def _refresh(self, rel_paths):
+        """Relê só os arquivos indicados e atualiza (ou remove) as suas seções."""
+        a = self.analyzer
+        for rel in rel_paths:
+            entry = self.entries.get(rel)
+            section = None
+            if entry is not None:
+                # DirEntry da travessia tem stat em cache (antigo): troca por um stat novo
+                entry = entry._replace(dir_entry=IndexEntry(entry.name, entry.path))
+                section = a._consolidate_entry(entry)
+            if section: self.sections[rel] = section
+            else: self.sections.pop(rel, None)
+
+    def _write(self):
+        a = self.analyzer
+        a.files_processed = len(self.sections)
+        a.files_skipped = self.total_files - a.files_processed
+        a._progress('watch')
+        code = io.StringIO()
+        a._index_records = []
+        if a.sharded:
+            self._write_shards(code)
+        else:
+            write = a._indexed_writer(code)
+            for rel in self.entries:
+                if rel in self.sections: write(self.sections[rel])
+        if code.tell() == 0:
+            code.write("_Nenhum arquivo de código encontrado ou processado._\n")
+        tree = "\n".join(self.tree_lines)
+        if self.template_path:
+            a._write_template(tree, self.template_path)
+        a._write_report_file(io.StringIO(tree), code)
+        if a.write_index:
+            a._save_index()
+
+    def _write_shards(self, code: IO[str]):
+        """Regrava as partes a partir das seções em memória e apaga as que sobraram da rodada anterior."""
+        a = self.analyzer
+        previous = {path for path, *_ in a.shard_files}
+        a._shard_items = []
+        # Spool na pasta temporária do sistema: não gera eventos na pasta observada
+        with tempfile.TemporaryFile('w+b') as spool:
+            write = a._shard_writer(spool)
+            for rel in self.entries:
+                if rel in self.sections: write(self.sections[rel])
+            a._write_shards(spool, code)
+        current = {path for path, *_ in a.shard_files}
+        self._own_files.update(os.path.abspath(path) for path in current)
+        for path in previous - current:
+            try: os.remove(path)
+            except OSError as e: a._log_warning(f"Erro ao remover parte antiga {path}: {e}")
+
+    def _update(self, changed: Set[str], structural: bool):
+        a = self.analyzer
+        # O timeout do analisador vale por atualização, não pela sessão inteira
+        a.start_time = time.time()
+        if a.use_cache:
+            a._cache = FileCache.open(a.cache_path, a.cache_max_bytes, a._log_warning)
+        try:
+            if structural:
+                before = set(self.entries)
+                self._rebuild_tree()
+                changed = (changed & set(self.entries)) | (set(self.entries) - before)
+                for rel in before - set(self.entries):
+                    self.sections.pop(rel, None)
+            self._refresh([rel for rel in self.entries if rel in changed])
+            self._write()
+        finally:
+            if a._cache is not None:
+                a.cache_hits, a.cache_misses = a._cache.hits, a._cache.misses
+                a._cache.close()
+                a._cache = None
+        self.updates += 1
+
+    def _classify(self, events, changed: Set[str], flags: Dict[str, bool]):
+        """Traduz eventos (caminho, é pasta, estrutural) em arquivos a reler e/ou árvore a refazer."""
+        a = self.analyzer
+        for path, is_dir, structural in events:
+            if not path:
+                flags['structural'] = True
+                changed.update(self.entries)
+                continue
+            if path in self._own_files: continue
+            rel = os.path.relpath(path, a.project_path)
+            name = os.path.basename(path)
+            if is_dir:
+                if structural and (path == a.project_path or not a._should_ignore_dir(name, path, IndexEntry(name, path))):
+                    flags['structural'] = True
+                continue
+            if a.use_gitignore and name == '.gitignore':
+                flags['structural'] = True
+                continue
+            if rel in self.entries:
+                changed.add(rel)
+                if structural: flags['structural'] = True
+            elif structural and not a._should_ignore_file(name, rel):
+                flags['structural'] = True
+                changed.add(rel)
+
+    def run(self) -> bool:
+        """
+        As seções são relidas uma a uma e fora de ordem: "idêntico a" poderia
+        apontar para um arquivo posterior, e o orçamento de tokens precisa de
+        todas de uma vez. Por isso deduplicação, quase duplicados e orçamento
+        ficam desligados durante a sessão (com aviso para o orçamento) e voltam
+        ao valor original no fim.
+        """
+        a = self.analyzer
+        a._exclude_own_outputs(self.template_path)
+        saved = (a.dedupe_files, a.near_duplicates, a.token_budget)
+        if a.token_budget:
+            a._log_warning(f"Orçamento de tokens ({a.token_budget}) ignorado no modo watch: o relatório sai completo")
+        a.dedupe_files = a.near_duplicates = False
+        a.token_budget = None
+        try:
+            return self._watch()
+        finally:
+            a.dedupe_files, a.near_duplicates, a.token_budget = saved
+
+    def _watch(self) -> bool:
+        a = self.analyzer
+        a._info("👀 Modo watch: exportação inicial...")
+        self._update(set(), True)
+        a._info(f"✅ Relatório inicial salvo em: {a.output_filename}")
+
+        source = None
+        if self.use_inotify and InotifySource.available():
+            try:
+                source = InotifySource()
+                source.sync(self.dirs)
+                a._info("👀 Observando mudanças (inotify)...")
+            except OSError as e:
+                a._log_warning(f"inotify indisponível, usando varredura periódica: {e}")
+                if source is not None: source.close()
+                source = None
+        if source is None:
+            source = PollingSource()
+            source.sync(self.dirs, [e.path for e in self.entries.values()])
+            a._info(f"👀 Observando mudanças (varredura a cada {self.poll_interval}s)...")
+        polling = isinstance(source, PollingSource)
+
+        try:
+            while not self._stopped():
+                changed: Set[str] = set()
+                flags = {'structural': False}
+                self._classify(source.wait(self.poll_interval if polling else 0.5), changed, flags)
+                if not changed and not flags['structural']: continue
+                # Debounce: junta a rajada até ficar 'debounce_seconds' sem eventos
+                while not self._stopped():
+                    events = list(source.wait(self.debounce_seconds))
+                    if not events: break
+                    self._classify(events, changed, flags)
+                if self._stopped(): break
+                self._update(changed, flags['structural'])
+                if flags['structural']:
+                    if polling: source.sync(self.dirs, [e.path for e in self.entries.values()])
+                    else: source.sync(self.dirs)
+                a._info(f"🔄 [{datetime.now().strftime('%H:%M:%S')}] Atualizado: "
+                      f"{len(changed)} arquivo(s){', árvore refeita' if flags['structural'] else ''}")
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            a._log_error(f"Erro no modo watch: {e}")
+            a._log_error(traceback.format_exc())
+            return False
+        finally:
+            if not polling: source.close()
+        a._info(f"⏹️  Modo watch encerrado após {self.updates - 1} atualização(ões)")
+        return True
+
+
+#================================================================================
+# BLOCO 1D: EXPORTAÇÃO EM LOTE (VÁRIOS PROJETOS EM PROCESSOS)
+#================================================================================
+
+BATCH_SUMMARY_NAME = "resumo_lote.json"
+
+
+class BatchResult(NamedTuple):
+    project: str
+    output: str
+    success: bool
+    files_processed: int
+    files_skipped: int
+    errors: int
+    warnings: int
+    elapsed: float
+    error: Optional[str]  # motivo da falha (None se a exportação concluiu)
+
+
+def expand_project_roots(patterns: List[str]) -> List[str]:
+    """Pastas de projeto a partir de caminhos e globs ('repos/*'), sem repetição, na ordem dada."""
+    roots, seen = [], set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        matches = sorted(glob.glob(pattern)) if any(c in pattern for c in '*?[') else [pattern]
+        for path in matches:
+            path = os.path.abspath(path)
+            if os.path.isdir(path) and path not in seen:
+                seen.add(path)
+                roots.append(path)
+    return roots
+
+
+def batch_output_paths(roots: List[str], output_dir: str, suffix: str = '.md') -> List[str]:
+    """'<destino>/<nome da pasta><suffix>' por projeto; nomes repetidos ganham _2, _3..."""
+    used, outputs = set(), []
+    for root in roots:
+        base = os.path.basename(root) or 'projeto'
+        name, n = base, 2
+        while name.lower() in used:
+            name, n = f"{base}_{n}", n + 1
+        used.add(name.lower())
+        outputs.append(os.path.join(output_dir, name + suffix))
+    return outputs
+
+
+# Regras de perfil compiladas no processo principal e entregues uma vez a cada
+# processo do pool (initializer), em vez de refeitas por projeto
+_batch_rules: Optional[Tuple[Dict[str, Set[str]], Set[str], IgnoreRules]] = None
+
+
+def _batch_init(rules):
+    global _batch_rules
+    _batch_rules = rules
+
+
+def _batch_export(project: str, output: str, options: dict, template_path: Optional[str]) -> BatchResult:
+    """Exporta um projeto dentro do processo do pool. Nunca propaga exceção."""
+    start = time.time()
+    analyzer = None
+    try:
+        analyzer = ProjectAnalyzer(project, output)
+        analyzer.sinks = []  # o processo principal mostra o andamento
+        analyzer.ignore_patterns, analyzer.code_extensions, analyzer.ignore_rules = _batch_rules
+        analyzer.apply_options(options)
+        success = analyzer.generate_report(template_path=template_path)
+        error = None if success else (analyzer.errors[0].split('] ', 1)[-1] if analyzer.errors else "falha na exportação")
+    except Exception as e:
+        success, error = False, f"{type(e).__name__}: {e}"
+    return BatchResult(
+        project, analyzer.output_filename if analyzer else output, success,
+        analyzer.files_processed if analyzer else 0, analyzer.files_skipped if analyzer else 0,
+        len(analyzer.errors) if analyzer else 1, len(analyzer.warnings) if analyzer else 0,
+        time.time() - start, error)
+
+
+def write_batch_summary(results: List[BatchResult], path: str, elapsed: float, workers: int):
+    """Resumo agregado do lote em JSON: totais e uma linha por projeto."""
+    summary = {
+        'version': 1,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed': round(elapsed, 3),
+        'workers': workers,
+        'totals': {
+            'projects': len(results),
+            'succeeded': sum(1 for r in results if r.success),
+            'failed': sum(1 for r in results if not r.success),
+            'files_processed': sum(r.files_processed for r in results),
+            'files_skipped': sum(r.files_skipped for r in results),
+            'errors': sum(r.errors for r in results),
+            'warnings': sum(r.warnings for r in results),
+        },
+        'projects': [dict(r._asdict(), elapsed=round(r.elapsed, 3)) for r in results],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+def _batch_isolated(jobs: list, options: dict, rules, workers: int, finish: Callable):
+    """
+    Reexporta os projetos afetados por um pool quebrado, cada um no seu
+    próprio processo (até 'workers' de uma vez): se o processo morrer de novo,
+    só aquele projeto falha.
+    """
+    pending = deque(jobs)
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            root, output, template_path = job = pending.popleft()
+            pool = ProcessPoolExecutor(max_workers=1, initializer=_batch_init, initargs=(rules,))
+            running[pool.submit(_batch_export, root, output, options, template_path)] = (pool, job)
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            pool, job = running.pop(future)
+            pool.shutdown()
+            finish(job, future)
+
+
+def export_batch(projects: List[str], output_dir: str, profiles: Optional[list] = None,
+                 options: Optional[dict] = None, workers: Optional[int] = None, suffix: str = '.md',
+                 templates: bool = True,
+                 on_result: Optional[Callable[[BatchResult, int, int], None]] = None) -> List[BatchResult]:
+    """
+    Exporta vários projetos (caminhos ou globs) em um pool de processos, um
+    relatório por projeto em 'output_dir' e o resumo em BATCH_SUMMARY_NAME.
+    'options' segue ProjectAnalyzer.apply_options. A falha de um projeto vira
+    um BatchResult com success=False e não interrompe os demais; se um
+    processo do pool morrer, os projetos que ficaram sem resultado são
+    refeitos um por processo (_batch_isolated). 'on_result' recebe cada
+    resultado (e quantos já terminaram de quantos) ao concluir.
+    """
+    start = time.time()
+    roots = expand_project_roots(projects)
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = batch_output_paths(roots, output_dir, suffix)
+    options = dict(options or {})
+
+    rules_source = ProjectAnalyzer(output_dir, 'lote.md')
+    rules_source.sinks = []
+    rules_source.set_profiles(list(profiles or []))
+    rules = (rules_source.ignore_patterns, rules_source.code_extensions, rules_source.ignore_rules)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(roots) or 1))
+    # Template pelo nome da saída ('a_2_template.txt'), não da pasta, para não colidir
+    jobs = [(root, output, default_template_path(output[:-len(suffix)], output) if templates else None)
+            for root, output in zip(roots, outputs)]
+    results: List[BatchResult] = []
+
+    def finish(job, future):
+        root, output, _ = job
+        try:
+            result = future.result()
+        except Exception as e:
+            result = BatchResult(root, output, False, 0, 0, 1, 0, 0.0, f"{type(e).__name__}: {e}")
+        results.append(result)
+        if on_result: on_result(result, len(results), len(roots))
+
+    broken = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init, initargs=(rules,)) as pool:
+            futures = {pool.submit(_batch_export, root, output, options, template_path): (root, output, template_path)
+                       for root, output, template_path in jobs}
+            for future in as_completed(futures):
+                # Um processo do pool que morre (falta de memória, os._exit...) quebra o pool
+                # e leva junto todos os projetos em andamento ou na fila, sem dizer qual foi
+                if isinstance(future.exception(), BrokenProcessPool): broken.append(futures[future])
+                else: finish(futures[future], future)
+    if broken:
+        broken.sort(key=jobs.index)
+        _batch_isolated(broken, options, rules, workers, finish)
+
+    order = {root: i for i, root in enumerate(roots)}
+    results.sort(key=lambda r: order[r.project])
+    write_batch_summary(results, os.path.join(output_dir, BATCH_SUMMARY_NAME), time.time() - start, workers)
+    return results
+
+
 #================================================================================
 # BLOCO 2: LÓGICA DO "ANALISA FOLDER"
 #================================================================================
@@ -596,6 +3265,72 @@ def extrair_estrutura(estrutura_string):
     }
 
 
+def resolver_diretorio_base(estrutura, diretorio_projeto):
+    """
+    Se a raiz do template tem o mesmo nome da pasta escolhida, os caminhos do
+    template partem da pasta-mãe (evita criar 'projeto/projeto/...').
+    """
+    pastas_esperadas = estrutura['pastas']
+    if not pastas_esperadas:
+        return diretorio_projeto
+
+    raiz_estrutura = pastas_esperadas[0].split(os.sep)[0]
+    base_selecionada = os.path.basename(os.path.normpath(diretorio_projeto))
+    if raiz_estrutura and raiz_estrutura == base_selecionada:
+        return os.path.dirname(diretorio_projeto)
+    return diretorio_projeto
+
+
+def verificar_estrutura(estrutura, diretorio_base, log: Optional[Callable[[str], None]] = None):
+    """
+    Compara a estrutura extraída com o disco e devolve os itens faltantes
+    ({'pastas': [...], 'arquivos': [...]}). 'log' recebe uma linha por item.
+    """
+    log = log or (lambda msg: None)
+    faltantes = {'pastas': [], 'arquivos': []}
+
+    for pasta in estrutura['pastas']:
+        if os.path.isdir(os.path.join(diretorio_base, pasta)):
+            log(f"[OK] (Pasta) {pasta}")
+        else:
+            log(f"[FALTANDO] (Pasta) {pasta}")
+            faltantes['pastas'].append(pasta)
+
+    for arquivo in estrutura['arquivos']:
+        if os.path.isfile(os.path.join(diretorio_base, arquivo)):
+            log(f"[OK] (Arquivo) {arquivo}")
+        else:
+            log(f"[FALTANDO] (Arquivo) {arquivo}")
+            faltantes['arquivos'].append(arquivo)
+
+    return faltantes
+
+
+def criar_itens_faltantes(faltantes, diretorio_base, log: Optional[Callable[[str], None]] = None) -> int:
+    """Cria as pastas e os arquivos (vazios) faltantes. Retorna quantos foram criados."""
+    log = log or (lambda msg: None)
+    criados = 0
+
+    for pasta in faltantes['pastas']:
+        p = os.path.join(diretorio_base, pasta)
+        try:
+            os.makedirs(p, exist_ok=True)
+            log(f"[CRIADA] {pasta}")
+            criados += 1
+        except OSError as e: log(f"[ERRO] {pasta}: {e}")
+
+    for arquivo in faltantes['arquivos']:
+        p = os.path.join(diretorio_base, arquivo)
+        try:
+            os.makedirs(os.path.dirname(p), exist_ok=True)
+            with open(p, 'w') as f: pass
+            log(f"[CRIADO] {arquivo}")
+            criados += 1
+        except OSError as e: log(f"[ERRO] {arquivo}: {e}")
+
+    return criados
+
+
 #================================================================================
 # BLOCO 3: LÓGICA DO "FRONTEND SCANNER" (SHERLOCK)
 #================================================================================
@@ -687,507 +3422,210 @@ class FrontendScanner:
 
 
 #================================================================================
-# BLOCO 4: APLICAÇÃO PRINCIPAL (UI CORRIGIDA)
+# BLOCO 4: LINHA DE COMANDO (HEADLESS)
 #================================================================================
+# A GUI vive em project_toolkit_gui.py e só é importada quando nenhum
+# subcomando é informado: export/create/verify/scan rodam sem tkinter.
 
-class App(ctk.CTk):
-    
-    def __init__(self):
-        super().__init__()
+PROFILE_NAMES = ('python', 'react', 'php', 'spring', 'node')
 
-        self.title("ToolKitDev v3 - Suíte de Engenharia")
-        self.geometry("950x700")
-        self.minsize(800, 600)
 
-        ctk.set_appearance_mode("Dark")
-        ctk.set_default_color_theme("blue")
+def default_template_path(project_path: str, output_filename: str) -> str:
+    """'<projeto>_template.txt' ao lado do relatório, com o codec do relatório se comprimido."""
+    template_filename = f"{Path(os.path.abspath(project_path)).name}_template.txt"
+    if compression_codec(output_filename):
+        template_filename += os.path.splitext(output_filename)[1]
+    output_dir = os.path.dirname(output_filename) or os.getcwd()
+    return os.path.join(output_dir, template_filename)
 
-        # --- Variáveis de estado ---
-        self.export_project_path = ctk.StringVar()
-        self.export_output_name = ctk.StringVar(value="projeto_para_ia.md")
-        self.export_analyzer = None
-        self.export_analysis_thread = None
-        self.export_profile_vars = {}
 
-        self.create_itens_faltantes = {'pastas': [], 'arquivos': []}
-        self.create_project_dir = ctk.StringVar(value=os.getcwd())
-        
-        # [NOVO] Variável para o Scanner
-        self.scanner_project_path = ctk.StringVar()
+def _cli_export_options(args) -> dict:
+    """Opções de exportação da linha de comando no formato de ProjectAnalyzer.apply_options."""
+    return {
+        'walk_workers': args.walk_workers,
+        'read_workers': args.read_workers,
+        'use_gitignore': args.gitignore,
+        'use_cache': not args.no_cache,
+        'use_git_index': args.git_index,
+        'delta': args.delta,
+        'near_duplicates': args.near_duplicates,
+        'token_budget': args.token_budget,
+        'shard_max_bytes': args.shard_bytes,
+        'shard_max_tokens': args.shard_tokens,
+    }
 
-        # --- Estrutura Principal ---
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-        
-        # --- Seletor de Modo ---
-        mode_frame = ctk.CTkFrame(self, fg_color="transparent")
-        mode_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
-        mode_frame.grid_columnconfigure(0, weight=1)
-        
-        # [CORREÇÃO] Adicionado "Scanner (Sherlock)" nas opções
-        self.mode_switcher = ctk.CTkSegmentedButton(
-            mode_frame,
-            values=["Exportar Template", "Criar por Template", "Scanner (Sherlock)"],
-            command=self._switch_mode
-        )
-        self.mode_switcher.grid(row=0, column=0, sticky="ew")
-        
-        # --- Frames (Telas) ---
-        self.export_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.export_frame.grid_rowconfigure(2, weight=1)
-        self.export_frame.grid_columnconfigure(0, weight=1)
-
-        self.create_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.create_frame.grid_rowconfigure(2, weight=1)
-        self.create_frame.grid_columnconfigure(0, weight=1)
-        self.create_frame.grid_columnconfigure(1, weight=1)
-
-        # [NOVO] Frame do Scanner
-        self.scanner_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.scanner_frame.grid_columnconfigure(1, weight=1)
-        self.scanner_frame.grid_rowconfigure(2, weight=1)
-
-        # Montar as telas
-        self._create_export_widgets(self.export_frame)
-        self._create_create_widgets(self.create_frame)
-        self._create_scanner_widgets(self.scanner_frame) # [NOVO]
-        
-        # Inicia no modo "Exportar"
-        self.mode_switcher.set("Exportar Template")
-        self._switch_mode("Exportar Template")
-        
-        self._center_window()
-
-    def _center_window(self):
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f'{width}x{height}+{x}+{y}')
-
-    def _switch_mode(self, mode):
-        # Esconde todos primeiro
-        self.export_frame.grid_forget()
-        self.create_frame.grid_forget()
-        self.scanner_frame.grid_forget()
-
-        # Mostra o selecionado
-        if mode == "Exportar Template":
-            self.export_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
-        elif mode == "Criar por Template":
-            self.create_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
-        elif mode == "Scanner (Sherlock)":
-            self.scanner_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
-
-    # ============================================================
-    #  MÉTODOS TELA 1: EXPORTAR
-    # ============================================================
-    def _create_export_widgets(self, tab):
-        config_frame = ctk.CTkFrame(tab, fg_color="transparent")
-        config_frame.grid(row=0, column=0, padx=0, pady=0, sticky="ew")
-        config_frame.grid_columnconfigure(1, weight=1)
-
-        ctk.CTkLabel(config_frame, text="Pasta do Projeto:").grid(row=0, column=0, sticky="w", padx=(0, 10), pady=5)
-        ctk.CTkEntry(config_frame, textvariable=self.export_project_path).grid(row=0, column=1, sticky="ew", pady=5)
-        ctk.CTkButton(config_frame, text="📁 Buscar", width=100, command=self._export_select_folder).grid(row=0, column=2, padx=(10, 0), pady=5)
-
-        ctk.CTkLabel(config_frame, text="Nome do .md (IA):").grid(row=1, column=0, sticky="w", padx=(0, 10), pady=5)
-        ctk.CTkEntry(config_frame, textvariable=self.export_output_name).grid(row=1, column=1, sticky="ew", pady=5)
-        
-        profiles_frame = ctk.CTkFrame(tab)
-        profiles_frame.grid(row=1, column=0, padx=0, pady=10, sticky="ew")
-        ctk.CTkLabel(profiles_frame, text="Perfis para Ignorar:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=5, sticky="w", padx=10, pady=10)
-        profiles = [('Python', 'python'), ('React/Node.js', 'react'), ('PHP/Laravel', 'php'), ('Spring/Java', 'spring'), ('Node.js', 'node')]
-        self.export_profile_vars = {}
-        for i, (label, value) in enumerate(profiles):
-            var = ctk.BooleanVar()
-            self.export_profile_vars[value] = var
-            ctk.CTkCheckBox(profiles_frame, text=label, variable=var).grid(row=1, column=i, sticky="w", padx=10, pady=(0, 10))
-
-        log_frame = ctk.CTkFrame(tab)
-        log_frame.grid(row=2, column=0, padx=0, pady=(0, 10), sticky="nsew")
-        log_frame.grid_rowconfigure(1, weight=1)
-        log_frame.grid_columnconfigure(0, weight=1)
-        ctk.CTkLabel(log_frame, text="Log de Execução:", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(10, 5))
-        self.export_log_text = ctk.CTkTextbox(log_frame, wrap=tk.WORD, state='disabled')
-        self.export_log_text.grid(row=1, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="nsew")
-        self.export_progress_label = ctk.CTkLabel(log_frame, text="Pronto.")
-        self.export_progress_label.grid(row=2, column=0, sticky="w", padx=10, pady=(0, 10))
-        self.export_progress = ctk.CTkProgressBar(log_frame, mode='indeterminate')
-        self.export_progress.grid(row=3, column=0, columnspan=2, sticky="ew", padx=10, pady=(0, 10))
-        self.export_progress.set(0)
-
-        button_frame = ctk.CTkFrame(tab, fg_color="transparent")
-        button_frame.grid(row=3, column=0, padx=0, pady=10, sticky="ew")
-        button_frame.grid_columnconfigure(0, weight=1)
-        button_frame.grid_columnconfigure(1, weight=1)
-        self.export_start_btn = ctk.CTkButton(button_frame, text="▶️ Iniciar Exportação (Gera .txt e .md)", command=self._export_start_analysis, height=35)
-        self.export_start_btn.grid(row=0, column=0, padx=(0, 5), sticky="ew")
-        self.export_cancel_btn = ctk.CTkButton(button_frame, text="⏹️ Cancelar", command=self._export_cancel_analysis, state='disabled', fg_color="tomato", hover_color="darkred", height=35)
-        self.export_cancel_btn.grid(row=0, column=1, padx=(5, 0), sticky="ew")
-
-    def _export_log(self, message: str):
-        self.export_log_text.configure(state='normal')
-        self.export_log_text.insert(tk.END, f"{message}\n")
-        self.export_log_text.see(tk.END)
-        self.export_log_text.configure(state='disabled')
-    
-    def _export_select_folder(self):
-        try:
-            folder = filedialog.askdirectory(title="Selecione a pasta do projeto", mustexist=True)
-            if folder:
-                self.export_project_path.set(folder)
-                self._export_log(f"✅ Pasta selecionada: {folder}")
-        except Exception as e:
-            self._export_log(f"❌ Erro ao selecionar pasta: {e}")
 
-    def _export_validate_inputs(self) -> bool:
-        if not self.export_project_path.get():
-            messagebox.showerror("Erro", "Selecione uma pasta do projeto!")
-            return False
-        if not os.path.isdir(self.export_project_path.get()):
-            messagebox.showerror("Erro", "A pasta selecionada não existe!")
-            return False
-        if not self.export_output_name.get():
-            messagebox.showerror("Erro", "Digite um nome para o arquivo de saída .md!")
-            return False
-        return True
-    
-    def _export_start_analysis(self):
-        if not self._export_validate_inputs():
-            return
-        
-        self.export_start_btn.configure(state='disabled')
-        self.export_cancel_btn.configure(state='normal')
-        self.export_log_text.configure(state='normal')
-        self.export_log_text.delete('1.0', tk.END)
-        self.export_log_text.configure(state='disabled')
-        self.export_progress.start()
-        self.export_progress.set(1)
-        self.export_progress_label.configure(text="⏳ Analisando projeto...")
-        
-        selected_profiles = [key for key, var in self.export_profile_vars.items() if var.get()]
-        
-        self.export_analysis_thread = threading.Thread(
-            target=self._export_run_analysis,
-            args=(self.export_project_path.get(), self.export_output_name.get(), selected_profiles),
-            daemon=True
-        )
-        self.export_analysis_thread.start()
-        self._export_check_thread()
-    
-    def _export_run_analysis(self, project_path: str, output_name_md: str, profiles: list):
-        try:
-            self.export_analyzer = ProjectAnalyzer(project_path, output_name_md)
-            self.export_analyzer.set_profiles(profiles)
-            
-            old_stdout = sys.stdout
-            redirected_output = io.StringIO()
-            sys.stdout = redirected_output
-            
-            print("📂 Gerando árvore de template...")
-            tree_content = self.export_analyzer._generate_tree()
-            
-            project_name = Path(project_path).name
-            template_filename = f"{project_name}_template.txt"
-            
-            output_dir = os.path.dirname(output_name_md)
-            if not output_dir: output_dir = os.getcwd()
-            
-            template_filepath = os.path.join(output_dir, template_filename)
-            
-            try:
-                with open(template_filepath, 'w', encoding='utf-8') as f:
-                    f.write(tree_content)
-                print(f"✅ Template salvo com sucesso em: {template_filepath}")
-            except Exception as e:
-                print(f"❌ Erro ao salvar template .txt: {e}")
-            
-            success = self.export_analyzer.generate_report(tree_content)
-            
-            output = redirected_output.getvalue()
-            sys.stdout = old_stdout
-            
-            self.after(0, self._export_analysis_complete, success, output, template_filepath)
-            
-        except Exception as e:
-            error_msg = f"Erro crítico: {e}\n{traceback.format_exc()}"
-            sys.stdout = old_stdout
-            self.after(0, self._export_analysis_error, error_msg)
-    
-    def _export_check_thread(self):
-        if self.export_analysis_thread and self.export_analysis_thread.is_alive():
-            self.after(100, self._export_check_thread)
-        else:
-            self.export_progress.stop()
-            self.export_progress.set(0)
-    
-    def _export_analysis_complete(self, success: bool, output: str, template_filepath: str):
-        self.export_progress.stop()
-        self.export_progress.set(0)
-        self.export_start_btn.configure(state='normal')
-        self.export_cancel_btn.configure(state='disabled')
-        
-        for line in output.split('\n'):
-            if line.strip(): self._export_log(line)
-        
-        if success:
-            self.export_progress_label.configure(text="✅ Exportação concluída!")
-            messagebox.showinfo("Sucesso", f"Exportação concluída!\n\nTemplate: {template_filepath}\nRelatório: {self.export_output_name.get()}")
+def _cli_export(args) -> int:
+    if not os.path.isdir(args.projeto):
+        print(f"❌ Pasta do projeto não encontrada: {args.projeto}", file=sys.stderr)
+        return 2
+    if args.watch and args.token_budget:
+        print("❌ --token-budget não funciona com --watch (o relatório é refeito por partes)", file=sys.stderr)
+        return 2
+    analyzer = ProjectAnalyzer(args.projeto, args.output)
+    analyzer.set_profiles(args.profiles)
+    analyzer.apply_options(dict(_cli_export_options(args), trace_path=args.trace))
+
+    template_path = None if args.no_template else (args.template or default_template_path(args.projeto, args.output))
+    if args.watch:
+        success = ProjectWatcher(analyzer, template_path=template_path).run()
+    else:
+        success = analyzer.generate_report(template_path=template_path)
+    return 0 if success else 1
+
+
+def _cli_batch(args) -> int:
+    def report(result: BatchResult, done: int, total: int):
+        name = os.path.basename(result.project)
+        if result.success:
+            print(f"✅ [{done}/{total}] {name}: {result.files_processed} arquivos em {result.elapsed:.1f}s")
         else:
-            self.export_progress_label.configure(text="❌ Erro na exportação")
-            messagebox.showwarning("Aviso", "Concluído com erros. Verifique o log.")
-    
-    def _export_analysis_error(self, error_msg: str):
-        self.export_progress.stop()
-        self.export_progress.set(0)
-        self.export_start_btn.configure(state='normal')
-        self.export_cancel_btn.configure(state='disabled')
-        self.export_progress_label.configure(text="❌ Erro crítico")
-        self._export_log(f"\n❌ ERRO CRÍTICO:\n{error_msg}")
-        messagebox.showerror("Erro", error_msg[:200])
-    
-    def _export_cancel_analysis(self):
-        if self.export_analyzer:
-            self.export_analyzer.cancelled = True
-            self._export_log("⏹️ Cancelamento solicitado...")
-            self.export_progress_label.configure(text="⏹️ Cancelando...")
-
-    # ============================================================
-    #  MÉTODOS TELA 2: CRIAR
-    # ============================================================
-    def _create_create_widgets(self, tab):
-        left_frame = ctk.CTkFrame(tab, fg_color="transparent")
-        left_frame.grid(row=0, column=0, rowspan=4, padx=(0, 10), pady=0, sticky="nsew")
-        left_frame.grid_rowconfigure(1, weight=1)
-        left_frame.grid_columnconfigure(0, weight=1)
-
-        ctk.CTkLabel(left_frame, text="Estrutura do Template", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w")
-        self.create_structure_area = ctk.CTkTextbox(left_frame, wrap=tk.WORD, font=('Courier New', 12))
-        self.create_structure_area.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=10)
-        self.create_structure_area.insert(tk.END, "# Cole sua estrutura aqui ou carregue um arquivo...")
-
-        ctk.CTkButton(left_frame, text="Carregar Template (.txt)...", command=self._create_carregar_estrutura).grid(row=2, column=0, sticky="ew", padx=(0, 5))
-        ctk.CTkButton(left_frame, text="Salvar...", command=self._create_exportar_estrutura).grid(row=2, column=1, sticky="ew", padx=(5, 0))
-
-        right_frame = ctk.CTkFrame(tab, fg_color="transparent")
-        right_frame.grid(row=0, column=1, rowspan=4, padx=(10, 0), pady=0, sticky="nsew")
-        right_frame.grid_rowconfigure(2, weight=1)
-        right_frame.grid_columnconfigure(0, weight=1)
-
-        ctk.CTkLabel(right_frame, text="Pasta Base do Novo Projeto", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0, columnspan=2, sticky="w")
-        
-        path_frame = ctk.CTkFrame(right_frame, fg_color="transparent")
-        path_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 10))
-        path_frame.grid_columnconfigure(0, weight=1)
-        
-        self.create_path_entry = ctk.CTkEntry(path_frame, textvariable=self.create_project_dir)
-        self.create_path_entry.grid(row=0, column=0, sticky="ew")
-        self.create_path_entry.configure(state="readonly")
-        ctk.CTkButton(path_frame, text="Selecionar Destino...", width=140, command=self._create_selecionar_pasta_projeto).grid(row=0, column=1, sticky="e", padx=(10,0))
-        
-        self.create_log_area = ctk.CTkTextbox(right_frame, wrap=tk.WORD, font=('Courier New', 12))
-        self.create_log_area.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=10)
-        self.create_log_area.configure(state=tk.DISABLED)
+            print(f"❌ [{done}/{total}] {name}: {result.error}")
 
-        self.create_verify_button = ctk.CTkButton(right_frame, text="Verificar Estrutura", command=self._create_verificar_estrutura, height=35)
-        self.create_verify_button.grid(row=3, column=0, sticky="ew", padx=(0, 5))
+    results = export_batch(args.projetos, args.destino, args.profiles, _cli_export_options(args),
+                           workers=args.workers, suffix=args.suffix, templates=not args.no_template,
+                           on_result=report)
+    if not results:
+        print("❌ Nenhuma pasta de projeto encontrada", file=sys.stderr)
+        return 2
+    failed = sum(1 for r in results if not r.success)
+    print(f"\n📦 Lote: {len(results) - failed} de {len(results)} projetos exportados")
+    print(f"🧾 Resumo salvo em: {os.path.join(args.destino, BATCH_SUMMARY_NAME)}")
+    return 1 if failed else 0
 
-        self.create_create_button = ctk.CTkButton(right_frame, text="Criar Itens Faltantes", command=self._create_criar_estrutura, state=tk.DISABLED, height=35)
-        self.create_create_button.grid(row=3, column=1, sticky="ew", padx=(5, 0))
 
-        self.create_status_label = ctk.CTkLabel(right_frame, text="Pronto.", anchor='w', height=25)
-        self.create_status_label.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 0))
-        
-        self._create_verificar_estrutura()
-
-    def _create_log(self, message):
-        self.create_log_area.configure(state=tk.NORMAL)
-        self.create_log_area.insert(tk.END, message + "\n")
-        self.create_log_area.configure(state=tk.DISABLED)
-        self.create_log_area.see(tk.END)
-
-    def _create_selecionar_pasta_projeto(self):
-        diretorio = filedialog.askdirectory(title="Selecione a pasta raiz", initialdir=self.create_project_dir.get())
-        if diretorio:
-            self.create_project_dir.set(diretorio)
-            self.create_path_entry.configure(state="normal")
-            self.create_path_entry.delete(0, tk.END)
-            self.create_path_entry.insert(0, diretorio)
-            self.create_path_entry.configure(state="readonly")
-            self.create_status_label.configure(text=f"Pasta selecionada.")
-            self._create_verificar_estrutura()
-
-    def _create_carregar_estrutura(self):
-        filepath = filedialog.askopenfilename(title="Selecione um template", filetypes=[("Texto", "*.txt"), ("Markdown", "*.md"), ("Todos", "*.*")])
-        if filepath:
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    self.create_structure_area.delete('1.0', tk.END)
-                    self.create_structure_area.insert('1.0', f.read())
-                self.create_status_label.configure(text=f"Template carregado.")
-                self._create_verificar_estrutura()
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao ler arquivo:\n{e}")
-
-    def _create_exportar_estrutura(self):
-        filepath = filedialog.asksaveasfilename(title="Salvar estrutura", defaultextension=".txt")
-        if filepath:
-            try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(self.create_structure_area.get('1.0', tk.END))
-                messagebox.showinfo("Sucesso", f"Salvo em:\n{filepath}")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao salvar:\n{e}")
-
-    def _create_get_base_dir_and_structure(self):
-        estrutura_atual = self.create_structure_area.get('1.0', tk.END)
-        estrutura = extrair_estrutura(estrutura_atual)
-        pastas_esperadas = estrutura['pastas']
-        current_project_dir = self.create_project_dir.get()
-        
-        if not pastas_esperadas:
-            return current_project_dir, {'pastas': [], 'arquivos': []}
-
-        raiz_estrutura = pastas_esperadas[0].split(os.sep)[0]
-        base_selecionada = os.path.basename(os.path.normpath(current_project_dir))
-        diretorio_base = current_project_dir
-        
-        if raiz_estrutura and raiz_estrutura == base_selecionada:
-            diretorio_base = os.path.dirname(current_project_dir)
-            
-        return diretorio_base, estrutura
-
-    def _create_verificar_estrutura(self):
-        self.create_log_area.configure(state=tk.NORMAL)
-        self.create_log_area.delete('1.0', tk.END)
-        self.create_log_area.configure(state=tk.DISABLED)
-        
-        self.create_itens_faltantes = {'pastas': [], 'arquivos': []}
-        self.create_create_button.configure(state=tk.DISABLED)
-        self.create_status_label.configure(text="Verificando...")
-
-        diretorio_base, estrutura = self._create_get_base_dir_and_structure()
-        pastas_esperadas = estrutura['pastas']
-        arquivos_esperados = estrutura['arquivos']
-
-        if not pastas_esperadas and not arquivos_esperados:
-            self._create_log("Estrutura vazia.")
-            self.create_status_label.configure(text="Estrutura vazia.")
-            return
-
-        self._create_log(f"--- BASE: {diretorio_base} ---")
-        
-        for pasta in pastas_esperadas:
-            path = os.path.join(diretorio_base, pasta)
-            if os.path.isdir(path): self._create_log(f"[OK] (Pasta) {pasta}")
-            else:
-                self._create_log(f"[FALTANDO] (Pasta) {pasta}")
-                self.create_itens_faltantes['pastas'].append(pasta)
-        
-        for arquivo in arquivos_esperados:
-            path = os.path.join(diretorio_base, arquivo)
-            if os.path.isfile(path): self._create_log(f"[OK] (Arquivo) {arquivo}")
-            else:
-                self._create_log(f"[FALTANDO] (Arquivo) {arquivo}")
-                self.create_itens_faltantes['arquivos'].append(arquivo)
-        
-        total = len(self.create_itens_faltantes['pastas']) + len(self.create_itens_faltantes['arquivos'])
-        if total == 0:
-            self._create_log("\n✅ Estrutura completa!")
-            self.create_status_label.configure(text="Tudo ok.")
+def _cli_read_template(path: str) -> Optional[dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return extrair_estrutura(f.read())
+    except OSError as e:
+        print(f"❌ Erro ao ler template: {e}", file=sys.stderr)
+        return None
+
+
+def _cli_verify(args) -> int:
+    estrutura = _cli_read_template(args.template)
+    if estrutura is None: return 2
+    if not estrutura['pastas'] and not estrutura['arquivos']:
+        print("Estrutura vazia.")
+        return 0
+    diretorio_base = resolver_diretorio_base(estrutura, os.path.abspath(args.destino))
+    print(f"--- BASE: {diretorio_base} ---")
+    faltantes = verificar_estrutura(estrutura, diretorio_base, None if args.quiet else print)
+    total = len(faltantes['pastas']) + len(faltantes['arquivos'])
+    if total == 0:
+        print("\n✅ Estrutura completa!")
+        return 0
+    print(f"\n⚠️ {total} itens faltando.")
+    return 1
+
+
+def _cli_create(args) -> int:
+    estrutura = _cli_read_template(args.template)
+    if estrutura is None: return 2
+    diretorio_base = resolver_diretorio_base(estrutura, os.path.abspath(args.destino))
+    faltantes = verificar_estrutura(estrutura, diretorio_base)
+    total = len(faltantes['pastas']) + len(faltantes['arquivos'])
+    if total == 0:
+        print(f"✅ Estrutura completa em: {diretorio_base}")
+        return 0
+    if args.dry_run:
+        for pasta in faltantes['pastas']: print(f"[FALTANDO] (Pasta) {pasta}")
+        for arquivo in faltantes['arquivos']: print(f"[FALTANDO] (Arquivo) {arquivo}")
+        print(f"\n⚠️ {total} itens seriam criados em: {diretorio_base}")
+        return 0
+    print(f"--- CRIANDO EM: {diretorio_base} ---")
+    criados = criar_itens_faltantes(faltantes, diretorio_base, print)
+    print(f"\n✨ {criados} de {total} itens criados.")
+    return 0 if criados == total else 1
+
+
+def _cli_scan(args) -> int:
+    if not os.path.isdir(args.src):
+        print(f"❌ Pasta não encontrada: {args.src}", file=sys.stderr)
+        return 2
+    report = FrontendScanner(args.src).scan()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+        print(f"✅ Relatório salvo em: {args.output}")
+    else:
+        print(report)
+    return 0
+
+
+def _add_export_arguments(p, argparse):
+    """Opções comuns a 'export' e 'batch' (ver _cli_export_options)."""
+    p.add_argument('-p', '--profile', dest='profiles', action='append', choices=PROFILE_NAMES, default=[],
+                   help="Perfil de arquivos a ignorar (pode repetir)")
+    p.add_argument('--no-template', action='store_true', help="Não gera o template .txt")
+    p.add_argument('--walk-workers', type=int, default=1, help="Threads para listar pastas")
+    p.add_argument('--read-workers', type=int, default=1, help="Threads para ler arquivos")
+    p.add_argument('--gitignore', action='store_true', help="Respeita .gitignore")
+    p.add_argument('--git-index', action='store_true', help="Só exporta arquivos rastreados pelo git")
+    p.add_argument('--delta', action='store_true', help="Só mudanças desde a última exportação")
+    p.add_argument('--near-duplicates', action='store_true', help="Agrupa arquivos quase duplicados")
+    p.add_argument('--token-budget', type=int, help="Orçamento de tokens do relatório")
+    p.add_argument('--shard-bytes', type=int, help="Divide o relatório em partes de até N bytes")
+    p.add_argument('--shard-tokens', type=int, help="Divide o relatório em partes de até N tokens")
+    p.add_argument('--no-cache', action='store_true', default=argparse.SUPPRESS, help="Não usa o cache persistente de arquivos")
+
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="ToolKitDev v3 - Suíte de Engenharia. Sem subcomando, abre a interface gráfica.")
+    parser.add_argument('--no-cache', action='store_true', help="Não usa o cache persistente de arquivos na exportação")
+    sub = parser.add_subparsers(dest='command', metavar='{export,batch,create,verify,scan}')
+
+    p = sub.add_parser('export', help="Exporta o projeto para um .md (e o template .txt)")
+    p.add_argument('projeto', help="Pasta do projeto")
+    p.add_argument('-o', '--output', default="projeto_para_ia.md",
+                   help="Relatório de saída (.md, .md.gz, .md.xz ou .md.bz2)")
+    p.add_argument('--template', help="Caminho do template .txt (padrão: <projeto>_template.txt ao lado do relatório)")
+    p.add_argument('--watch', action='store_true', help="Reescreve o relatório a cada mudança (Ctrl+C para sair)")
+    p.add_argument('--trace', metavar='ARQUIVO', help="Mede cada etapa e grava um trace JSON (chrome://tracing)")
+    _add_export_arguments(p, argparse)
+    p.set_defaults(func=_cli_export)
+
+    p = sub.add_parser('batch', help="Exporta vários projetos em paralelo (um processo por projeto)")
+    p.add_argument('projetos', nargs='+', help="Pastas de projeto ou globs (ex.: 'repos/*')")
+    p.add_argument('-d', '--destino', default="exportacoes", help="Pasta dos relatórios e do resumo do lote")
+    p.add_argument('--workers', type=int, help="Processos simultâneos (padrão: núcleos da máquina)")
+    p.add_argument('--suffix', default=".md", help="Extensão dos relatórios (.md, .md.gz, .md.xz ou .md.bz2)")
+    _add_export_arguments(p, argparse)
+    p.set_defaults(func=_cli_batch)
+
+    for name, func, help_text in (
+        ('verify', _cli_verify, "Verifica uma pasta contra um template (código 1 se faltar algo)"),
+        ('create', _cli_create, "Cria os itens do template que faltam na pasta"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('template', help="Arquivo de template (.txt)")
+        p.add_argument('-d', '--destino', default=os.getcwd(), help="Pasta base (padrão: pasta atual)")
+        p.set_defaults(func=func)
+        if name == 'create':
+            p.add_argument('-n', '--dry-run', action='store_true', help="Só lista o que seria criado")
         else:
-            self._create_log(f"\n⚠️ {total} itens faltando.")
-            self.create_status_label.configure(text=f"{total} faltando.")
-            self.create_create_button.configure(state=tk.NORMAL)
+            p.add_argument('-q', '--quiet', action='store_true', help="Só mostra o resumo")
 
-    def _create_criar_estrutura(self):
-        total = len(self.create_itens_faltantes['pastas']) + len(self.create_itens_faltantes['arquivos'])
-        if total == 0: return
+    p = sub.add_parser('scan', help="Scanner (Sherlock) de rotas e modelos do frontend")
+    p.add_argument('src', help="Pasta 'src' do frontend")
+    p.add_argument('-o', '--output', help="Salva o relatório neste arquivo em vez de imprimir")
+    p.set_defaults(func=_cli_scan)
+    return parser
 
-        diretorio_base, _ = self._create_get_base_dir_and_structure()
-        if not messagebox.askyesno("Criar", f"Criar {total} itens em:\n{diretorio_base}?"): return
 
-        self._create_log("\n--- CRIANDO ---")
-        criados = 0
-        
-        for pasta in self.create_itens_faltantes['pastas']:
-            p = os.path.join(diretorio_base, pasta)
-            try:
-                os.makedirs(p, exist_ok=True)
-                self._create_log(f"[CRIADA] {pasta}")
-                criados += 1
-            except OSError as e: self._create_log(f"[ERRO] {pasta}: {e}")
-
-        for arquivo in self.create_itens_faltantes['arquivos']:
-            p = os.path.join(diretorio_base, arquivo)
-            try:
-                os.makedirs(os.path.dirname(p), exist_ok=True)
-                with open(p, 'w') as f: pass
-                self._create_log(f"[CRIADO] {arquivo}")
-                criados += 1
-            except OSError as e: self._create_log(f"[ERRO] {arquivo}: {e}")
-
-        self._create_log("\n✨ Concluído!")
-        self.create_status_label.configure(text=f"{criados} criados.")
-        self.create_create_button.configure(state=tk.DISABLED)
-        self._create_verificar_estrutura()
-
-    # ============================================================
-    #  MÉTODOS TELA 3: SCANNER (SHERLOCK)
-    # ============================================================
-    def _create_scanner_widgets(self, frame):
-        frame.grid_columnconfigure(1, weight=1)
-        frame.grid_rowconfigure(2, weight=1)
-
-        ctk.CTkLabel(frame, text="Analise a pasta 'src' do Frontend para descobrir rotas e modelos.", 
-                     text_color="gray").grid(row=0, column=0, columnspan=3, sticky="w", padx=10, pady=(0, 20))
-
-        ctk.CTkLabel(frame, text="Pasta 'src':").grid(row=1, column=0, padx=10, sticky="w")
-        ctk.CTkEntry(frame, textvariable=self.scanner_project_path).grid(row=1, column=1, padx=10, sticky="ew")
-        ctk.CTkButton(frame, text="📁 Buscar", width=80, command=self._sel_scanner_folder).grid(row=1, column=2, padx=10)
-
-        self.txt_scanner_result = ctk.CTkTextbox(frame, font=("Courier New", 13), fg_color="#1e1e1e", text_color="#00ff00")
-        self.txt_scanner_result.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
-        self.txt_scanner_result.insert("0.0", ">>> Aguardando ordem de análise...\n")
-
-        self.btn_scan = ctk.CTkButton(frame, text="🕵️ Executar Análise Sherlock", 
-                                      command=self._run_scanner, height=40, fg_color="#D4AF37", text_color="#001B3D")
-        self.btn_scan.grid(row=3, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
-
-    def _sel_scanner_folder(self):
-        f = filedialog.askdirectory(title="Selecione a pasta src do frontend")
-        if f: self.scanner_project_path.set(f)
-
-    def _run_scanner(self):
-        path = self.scanner_project_path.get()
-        if not path or not os.path.exists(path):
-            messagebox.showerror("Erro", "Selecione uma pasta válida")
-            return
-        
-        self.txt_scanner_result.delete("1.0", "end")
-        self.txt_scanner_result.insert("end", f"⏳ Iniciando análise em: {path}...\n\n")
-        self.update()
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        # Import tardio: tkinter/customtkinter só carregam quando a GUI abre.
+        # Rodando como script, a GUI reaproveita este módulo em vez de reimportá-lo.
+        sys.modules.setdefault('project_toolkit_v3', sys.modules[__name__])
+        from project_toolkit_gui import run_gui
+        return run_gui(use_cache=not args.no_cache)
+    return args.func(args)
 
-        scanner = FrontendScanner(path)
-        report = scanner.scan()
-        
-        self.txt_scanner_result.delete("1.0", "end")
-        self.txt_scanner_result.insert("end", report)
 
 if __name__ == "__main__":
-    try:
-        app = App()
-        app.mainloop()
-    except Exception as e:
-        print(f"❌ Erro fatal ao iniciar a aplicação: {e}")
-        print(traceback.format_exc())
-        try:
-            root = tk.Tk()
-            root.withdraw()
-            messagebox.showerror("Erro Fatal", f"Ocorreu um erro crítico ao iniciar:\n\n{e}\n\nVeja o console para detalhes.")
-            root.destroy()
-        except Exception:
-            pass
-        sys.exit(1)
\ No newline at end of file
+    sys.exit(main())